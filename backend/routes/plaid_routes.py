@@ -9,10 +9,17 @@ from plaid.model.country_code import CountryCode
 from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
 from plaid.model.transactions_get_request import TransactionsGetRequest
 from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
+from plaid.model.transactions_sync_request import TransactionsSyncRequest
 from plaid import Configuration, ApiClient
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import time
 from plaid.model.accounts_get_request import AccountsGetRequest
 from plaid.model.link_token_create_request_update import LinkTokenCreateRequestUpdate
+from backend.utils.config import Config
+from backend.utils.transaction_sync import CursorStore
+from backend.utils.transaction_store import get_transaction_store
+from backend.utils import parquet_cache
 
 
 load_dotenv()
@@ -31,9 +38,293 @@ api_client = ApiClient(configuration)
 client = plaid_api.PlaidApi(api_client)
 
 ACCESS_TOKENS = {}  # ⚠️ TEMP STORAGE – use session/file/db in production
+ACCOUNT_INSTITUTIONS = {}  # account_id → institution_id, learned when banks are linked
+CURSOR_STORE = CursorStore(Config.get_data_dir() / "plaid_cursors.json")  # /transactions/sync cursors per item
 
 # Configuration
 REDIRECT_URL = os.getenv('REDIRECT_URL', 'http://localhost:8501/?page=add_bank_account')
+MAX_FETCH_WORKERS = int(os.getenv('PLAID_FETCH_WORKERS', '6'))  # Upper bound on parallel institution fetches
+MAX_PAGE_WORKERS = int(os.getenv('PLAID_PAGE_WORKERS', '4'))  # Upper bound on parallel page fetches per institution
+DEFAULT_PAGE_SIZE = int(os.getenv('PLAID_PAGE_SIZE', '500'))  # Plaid allows at most 500 per page
+DEFAULT_MAX_ROWS = int(os.getenv('PLAID_MAX_ROWS', '50000'))  # Safety cap per institution
+PLAID_MAX_PAGE_SIZE = 500
+SYNC_PAGE_SIZE = int(os.getenv('PLAID_SYNC_PAGE_SIZE', '500'))  # Plaid allows at most 500 per sync page
+SYNC_MAX_RESTARTS = 3  # Retries when Plaid reports the item changed mid-pagination
+
+
+def build_transactions_request(access_token, start_date, end_date, account_ids, count, offset):
+    """Build a single page request for Plaid's /transactions/get."""
+    # The SDK rejects account_ids=None, so only pass it when filtering
+    options = {"count": count, "offset": offset}
+    if account_ids:
+        options["account_ids"] = account_ids
+    return TransactionsGetRequest(
+        access_token=access_token,
+        start_date=start_date,
+        end_date=end_date,
+        options=TransactionsGetRequestOptions(**options)
+    )
+
+
+def fetch_institution_transactions(institution_id, access_token, start_date, end_date, account_ids=None,
+                                   page_size=None, max_rows=None):
+    """
+    Fetch every page of one institution's transactions and report how long it took.
+    The first page tells us total_transactions; the remaining pages are then
+    requested concurrently and appended in offset order.
+    """
+    started = time.perf_counter()
+    page_size = max(1, min(int(page_size or DEFAULT_PAGE_SIZE), PLAID_MAX_PAGE_SIZE))
+    max_rows = max(1, int(max_rows or DEFAULT_MAX_ROWS))
+    result = {
+        "institution_id": institution_id,
+        "transactions": [],
+        "accounts": [],
+        "total_available": 0,
+        "pages": 0,
+        "truncated": False,
+        "error": None
+    }
+
+    def fetch_page(offset):
+        count = min(page_size, max_rows - offset)
+        request_data = build_transactions_request(access_token, start_date, end_date, account_ids, count, offset)
+        return client.transactions_get(request_data).to_dict()
+
+    try:
+        # 💸 First page: also tells us how many rows exist in the window
+        first_page = fetch_page(0)
+        transactions = list(first_page.get("transactions", []))
+        total = first_page.get("total_transactions", len(transactions)) or 0
+        target = min(total, max_rows)
+
+        result["accounts"] = first_page.get("accounts", [])
+        result["total_available"] = total
+        result["truncated"] = total > max_rows
+        result["pages"] = 1
+
+        # 📄 Remaining pages, fetched concurrently but merged in offset order
+        offsets = list(range(len(transactions), target, page_size)) if transactions else []
+        if offsets:
+            workers = max(1, min(MAX_PAGE_WORKERS, len(offsets)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for page in executor.map(fetch_page, offsets):
+                    transactions.extend(page.get("transactions", []))
+                    result["pages"] += 1
+
+        transactions = transactions[:max_rows]
+
+        # Add institution_id to each transaction for reference
+        for transaction in transactions:
+            transaction["institution_id"] = institution_id
+
+        result["transactions"] = transactions
+    except Exception as e:
+        print(f"Error fetching transactions for institution {institution_id}: {str(e)}")
+        result["error"] = str(e)
+
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def fetch_all_transactions(user_tokens, start_date, end_date, account_ids=None, page_size=None, max_rows=None,
+                           account_ids_by_institution=None):
+    """
+    Fetch transactions from every linked institution in parallel.
+    Results come back in the same order as user_tokens, regardless of which
+    institution answers first. account_ids_by_institution, when given, overrides
+    account_ids with a per-institution filter.
+    """
+    if not user_tokens:
+        return []
+
+    def account_filter(institution_id):
+        if account_ids_by_institution is not None:
+            return account_ids_by_institution.get(institution_id)
+        return account_ids
+
+    workers = max(1, min(MAX_FETCH_WORKERS, len(user_tokens)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(fetch_institution_transactions, institution_id, access_token,
+                            start_date, end_date, account_filter(institution_id), page_size, max_rows)
+            for institution_id, access_token in user_tokens.items()
+        ]
+        return [future.result() for future in futures]
+
+
+def remember_accounts(institution_id, accounts):
+    """Record which institution each account belongs to."""
+    for account in accounts:
+        account_id = account.get("account_id") or account.get("id")
+        if account_id:
+            ACCOUNT_INSTITUTIONS[account_id] = institution_id
+
+
+def refresh_account_mapping(user_tokens):
+    """
+    Re-learn which accounts each linked item owns with /accounts/get, concurrently.
+    Returns the institutions whose accounts could not be listed.
+    """
+    def refresh(institution_id, access_token):
+        try:
+            accounts = client.accounts_get(AccountsGetRequest(access_token=access_token)).to_dict()["accounts"]
+            remember_accounts(institution_id, accounts)
+            return None
+        except Exception as e:
+            print(f"⚠️ Could not refresh accounts for institution {institution_id}: {str(e)}")
+            return institution_id
+
+    workers = max(1, min(MAX_FETCH_WORKERS, len(user_tokens)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        failed = executor.map(lambda item: refresh(*item), list(user_tokens.items()))
+        return {institution_id for institution_id in failed if institution_id}
+
+
+def unmapped_accounts(account_ids, user_tokens):
+    """Requested accounts not known to belong to any linked institution."""
+    return [account_id for account_id in account_ids if ACCOUNT_INSTITUTIONS.get(account_id) not in user_tokens]
+
+
+def group_accounts_by_institution(account_ids, user_tokens, unverified=()):
+    """
+    Group requested accounts by the institution that owns them, so each institution
+    is queried exactly once. If some accounts are still unknown, institutions we have
+    no account mapping for, and those in unverified (whose account list could not be
+    refreshed), are queried unfiltered, since one of them may own the unknown accounts.
+    """
+    groups = {}
+    unknown = []
+    for account_id in account_ids:
+        institution_id = ACCOUNT_INSTITUTIONS.get(account_id)
+        if institution_id in user_tokens:
+            groups.setdefault(institution_id, []).append(account_id)
+        else:
+            unknown.append(account_id)
+
+    if unknown:
+        mapped_institutions = set(ACCOUNT_INSTITUTIONS.values())
+        for institution_id in user_tokens:
+            if institution_id not in mapped_institutions or institution_id in unverified:
+                groups[institution_id] = None
+
+    return groups
+
+
+def sync_institution_transactions(institution_id, access_token, user_id="demo-user-123", reset=False):
+    """
+    Pull everything added, modified or removed for one item since its stored cursor.
+    The new cursor is returned, not saved: the caller stores it with save_sync_cursors
+    once the rows are persisted, so a failed fetch or store write is simply retried
+    from the previous cursor next time.
+    """
+    started = time.perf_counter()
+    result = {
+        "institution_id": institution_id,
+        "added": [],
+        "modified": [],
+        "removed": [],
+        "cursor": None,
+        "error": None
+    }
+    start_cursor = None if reset else CURSOR_STORE.get(user_id, institution_id)
+
+    try:
+        for attempt in range(SYNC_MAX_RESTARTS):
+            added, modified, removed = [], [], []
+            cursor = start_cursor
+            try:
+                has_more = True
+                while has_more:
+                    # The SDK rejects cursor=None, so the very first sync omits it
+                    request_kwargs = {"access_token": access_token, "count": SYNC_PAGE_SIZE}
+                    if cursor:
+                        request_kwargs["cursor"] = cursor
+                    page = client.transactions_sync(TransactionsSyncRequest(**request_kwargs)).to_dict()
+
+                    added.extend(page.get("added", []))
+                    modified.extend(page.get("modified", []))
+                    removed.extend(tx["transaction_id"] for tx in page.get("removed", []))
+                    cursor = page.get("next_cursor", cursor)
+                    has_more = page.get("has_more", False)
+                break
+            except Exception as e:
+                # Plaid asks clients to restart from the original cursor in this case
+                if "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION" in str(e) and attempt < SYNC_MAX_RESTARTS - 1:
+                    continue
+                raise
+
+        for transaction in added + modified:
+            transaction["institution_id"] = institution_id
+
+        result["cursor"] = cursor
+        result["added"] = added
+        result["modified"] = modified
+        result["removed"] = removed
+    except Exception as e:
+        print(f"Error syncing transactions for institution {institution_id}: {str(e)}")
+        result["error"] = str(e)
+
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def save_sync_cursors(results, user_id="demo-user-123"):
+    """Store the cursor of every institution that synced without error."""
+    for result in results:
+        if result["cursor"] and not result["error"]:
+            CURSOR_STORE.set(user_id, result["institution_id"], result["cursor"])
+
+
+def persist_transactions(upserted=(), removed=()):
+    """
+    Mirror fetched transactions into the transaction store and parquet cache; never fail
+    the request over it. Returns whether the transaction store write succeeded.
+    """
+    upserted = [dict(tx, source=tx.get("source", "plaid")) for tx in upserted]
+    stored = True
+    try:
+        store = get_transaction_store()
+        store.upsert(upserted)
+        store.delete(removed)
+    except Exception as e:
+        print(f"⚠️ Failed to persist transactions: {str(e)}")
+        stored = False
+
+    # Columnar copy for the analytics views
+    try:
+        parquet_cache.write_transactions("demo-user-123", upserted)
+        parquet_cache.remove_transactions("demo-user-123", removed)
+    except Exception as e:
+        print(f"⚠️ Failed to update the parquet cache: {str(e)}")
+    return stored
+
+
+def merge_institution_results(results):
+    """Merge per-institution results into a single response payload."""
+    all_transactions = []
+    all_accounts = []
+    institutions = []
+
+    for result in results:
+        all_transactions.extend(result["transactions"])
+        all_accounts.extend(result["accounts"])
+        institutions.append({
+            "institution_id": result["institution_id"],
+            "transaction_count": len(result["transactions"]),
+            "total_available": result.get("total_available", len(result["transactions"])),
+            "pages": result.get("pages", 0),
+            "truncated": result.get("truncated", False),
+            "elapsed_ms": result["elapsed_ms"],
+            "error": result["error"]
+        })
+
+    return {
+        "transactions": all_transactions,
+        "accounts": all_accounts,
+        "total_transactions": len(all_transactions),
+        "institutions": institutions
+    }
 
 # 1️⃣ Create Link Token
 @plaid_bp.route("/api/plaid/create_link_token", methods=["POST"])
@@ -82,6 +373,7 @@ def exchange_public_token():
         accounts_request = AccountsGetRequest(access_token=access_token)
         accounts_response = client.accounts_get(accounts_request)
         accounts = accounts_response.to_dict()["accounts"]
+        remember_accounts(institution_id, accounts)
 
         return jsonify({
             "access_token": access_token,
@@ -108,51 +400,25 @@ def get_transactions():
         start_date_str = data.get("start_date")
         end_date_str = data.get("end_date")
         selected_accounts = data.get("account_ids", [])  # Optional account filtering
+        page_size = data.get("page_size")  # Optional, defaults to PLAID_PAGE_SIZE
+        max_rows = data.get("max_rows")  # Optional, defaults to PLAID_MAX_ROWS
 
         # ✅ Convert string to datetime.date
         start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
         end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
 
-        all_transactions = []
-        all_accounts = []
-
         # If user_tokens is a single token (string), convert to dict format
         if isinstance(user_tokens, str):
             user_tokens = {"default": user_tokens}
 
-        # Fetch transactions from all linked banks
-        for institution_id, access_token in user_tokens.items():
-            try:
-                # 💸 Build request for Plaid
-                request_data = TransactionsGetRequest(
-                    access_token=access_token,
-                    start_date=start_date,
-                    end_date=end_date,
-                    options=TransactionsGetRequestOptions(
-                        count=100,  # Increased count
-                        account_ids=selected_accounts if selected_accounts else None
-                    )
-                )
-
-                response = client.transactions_get(request_data)
-                transactions = response.to_dict()
-
-                # Add institution_id to each transaction for reference
-                for transaction in transactions.get("transactions", []):
-                    transaction["institution_id"] = institution_id
-
-                all_transactions.extend(transactions.get("transactions", []))
-                all_accounts.extend(transactions.get("accounts", []))
-
-            except Exception as e:
-                print(f"Error fetching transactions for institution {institution_id}: {str(e)}")
-                continue
+        # Fetch transactions from all linked banks concurrently
+        started = time.perf_counter()
+        results = fetch_all_transactions(user_tokens, start_date, end_date, selected_accounts, page_size, max_rows)
 
-        return jsonify({
-            "transactions": all_transactions,
-            "accounts": all_accounts,
-            "total_transactions": len(all_transactions)
-        })
+        payload = merge_institution_results(results)
+        persist_transactions(payload["transactions"])
+        payload["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return jsonify(payload)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -264,6 +530,7 @@ def handle_plaid_success():
         if "demo-user-123" not in ACCESS_TOKENS:
             ACCESS_TOKENS["demo-user-123"] = {}
         ACCESS_TOKENS["demo-user-123"][institution_id] = access_token
+        remember_accounts(institution_id, metadata.get("accounts", []))
 
         print(f"✅ Successfully stored access token for institution {institution_id}")
         
@@ -277,3 +544,123 @@ def handle_plaid_success():
         print("Error handling Plaid success:", str(e))
         return jsonify({"error": str(e)}), 500
 
+# 9️⃣ Incremental Sync (only what changed since the last cursor)
+@plaid_bp.route("/api/plaid/sync_transactions", methods=["POST"])
+def sync_transactions():
+    try:
+        user_tokens = ACCESS_TOKENS.get("demo-user-123")
+        if not user_tokens:
+            return jsonify({"error": "No access tokens"}), 400
+
+        data = request.json or {}
+        reset = bool(data.get("reset", False))  # Start over from the full history
+
+        # If user_tokens is a single token (string), convert to dict format
+        if isinstance(user_tokens, str):
+            user_tokens = {"default": user_tokens}
+
+        started = time.perf_counter()
+        workers = max(1, min(MAX_FETCH_WORKERS, len(user_tokens)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(sync_institution_transactions, institution_id, access_token, "demo-user-123", reset)
+                for institution_id, access_token in user_tokens.items()
+            ]
+            results = [future.result() for future in futures]
+
+        added, modified, removed, institutions = [], [], [], []
+        for result in results:
+            added.extend(result["added"])
+            modified.extend(result["modified"])
+            removed.extend(result["removed"])
+            institutions.append({
+                "institution_id": result["institution_id"],
+                "added": len(result["added"]),
+                "modified": len(result["modified"]),
+                "removed": len(result["removed"]),
+                "elapsed_ms": result["elapsed_ms"],
+                "error": result["error"]
+            })
+
+        # Advance the cursors only once the rows are stored, or the next sync would skip them
+        persisted = persist_transactions(added + modified, removed)
+        if persisted:
+            save_sync_cursors(results)
+
+        return jsonify({
+            "added": added,
+            "modified": modified,
+            "removed": removed,
+            "persisted": persisted,
+            "institutions": institutions,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 🔟 Fetch Transactions for Many Accounts in One Request
+@plaid_bp.route("/api/plaid/get_transactions_batch", methods=["POST"])
+def get_transactions_batch():
+    try:
+        user_tokens = ACCESS_TOKENS.get("demo-user-123")
+        if not user_tokens:
+            return jsonify({"error": "No access tokens"}), 400
+
+        data = request.json
+        account_ids = data.get("account_ids", [])
+        if not account_ids:
+            return jsonify({"error": "No accounts selected"}), 400
+
+        start_date = datetime.strptime(data.get("start_date"), "%Y-%m-%d").date()
+        end_date = datetime.strptime(data.get("end_date"), "%Y-%m-%d").date()
+
+        # If user_tokens is a single token (string), convert to dict format
+        if isinstance(user_tokens, str):
+            user_tokens = {"default": user_tokens}
+
+        # 🧭 Query each institution once, only for the accounts it owns. Accounts we can't
+        # place (e.g. newly added at an already linked bank) trigger one /accounts/get refresh
+        unverified = refresh_account_mapping(user_tokens) if unmapped_accounts(account_ids, user_tokens) else set()
+        groups = group_accounts_by_institution(account_ids, user_tokens, unverified)
+        tokens_to_query = {
+            institution_id: access_token
+            for institution_id, access_token in user_tokens.items()
+            if institution_id in groups
+        }
+
+        started = time.perf_counter()
+        results = fetch_all_transactions(
+            tokens_to_query, start_date, end_date,
+            page_size=data.get("page_size"),
+            max_rows=data.get("max_rows"),
+            account_ids_by_institution=groups
+        )
+        for result in results:
+            remember_accounts(result["institution_id"], result["accounts"])
+
+        payload = merge_institution_results(results)
+
+        # ✂️ Split back out by account (unfiltered institutions may return extra accounts)
+        requested = set(account_ids)
+        transactions_by_account = {account_id: [] for account_id in account_ids}
+        for transaction in payload["transactions"]:
+            if transaction.get("account_id") in requested:
+                transactions_by_account[transaction["account_id"]].append(transaction)
+
+        payload["transactions"] = [
+            transaction for transaction in payload["transactions"]
+            if transaction.get("account_id") in requested
+        ]
+        payload["total_transactions"] = len(payload["transactions"])
+        payload["transactions_by_account"] = transactions_by_account
+        # Accounts no linked institution claims, even after the refresh and the fetch
+        payload["unresolved_account_ids"] = unmapped_accounts(account_ids, user_tokens)
+        if payload["unresolved_account_ids"]:
+            print(f"⚠️ Accounts not found at any linked institution: {payload['unresolved_account_ids']}")
+        persist_transactions(payload["transactions"])
+        payload["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return jsonify(payload)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,527 @@
+import json
+import re
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+from backend.utils.config import Config
+from backend.utils.files import atomic_write, write_json
+
+# Categories match the names categorize_transaction asks the LLM for, so BudgetTracker's
+# standardize_category maps local and LLM results the same way.
+# Keywords match whole words anywhere in a name, so generic words ("market", "bar",
+# "rent", "delta"...) only appear inside a longer phrase that pins them down.
+UNCATEGORIZED = "Uncategorized"
+
+# Rule results at or above this confidence skip the LLM
+CONFIDENCE_THRESHOLD = 0.75
+
+# The learned model is trusted only once it has seen some history, and only when it is sure
+MODEL_CONFIDENCE_THRESHOLD = 0.9
+MODEL_MIN_EXAMPLES = 20
+
+OVERRIDE_CONFIDENCE = 1.0
+KEYWORD_CONFIDENCE = 0.9
+MCC_CONFIDENCE = 0.85
+PLAID_CONFIDENCE = 0.8
+
+MERCHANT_KEYWORDS = {
+    "Food and Drink": [
+        "starbucks", "dunkin", "mcdonalds", "burger king", "wendys", "taco bell", "chipotle", "subway",
+        "kfc", "chick fil a", "panera", "dominos", "pizza hut", "papa johns", "five guys", "shake shack",
+        "tim hortons", "peets", "blue bottle", "doordash", "grubhub", "uber eats", "postmates", "seamless",
+        "cafe", "coffee", "restaurant", "pizza", "bakery", "diner", "grill", "sushi", "pub", "brewery",
+        "bar grill", "wine bar", "sports bar",
+    ],
+    "Groceries": [
+        "whole foods", "trader joe", "trader joes", "kroger", "safeway", "publix", "aldi", "wegmans",
+        "albertsons", "heb", "food lion", "giant eagle", "stop shop", "sprouts", "instacart", "costco",
+        "sams club", "grocery", "groceries", "supermarket", "farmers market", "food market",
+    ],
+    "Health": [
+        "cvs", "walgreens", "rite aid", "pharmacy", "kaiser", "clinic", "hospital", "dental", "dentist",
+        "medical", "urgent care", "optometry", "labcorp", "quest diagnostics", "planet fitness", "gym",
+    ],
+    "Shopping": [
+        "amazon", "amzn", "walmart", "target com", "target store", "best buy", "ikea", "home depot", "lowes", "macys",
+        "nordstrom", "kohls", "tj maxx", "marshalls", "etsy", "ebay", "apple store", "nike", "zara",
+        "h m", "sephora", "ulta", "wayfair", "shein",
+    ],
+    "Bills and Utilities": [
+        "comcast", "xfinity", "verizon", "att", "t mobile", "sprint", "spectrum", "cox", "pg e",
+        "con edison", "duke energy", "electric", "utility", "utilities", "water utility", "water district",
+        "water dept", "water company", "internet", "insurance",
+        "geico", "state farm", "progressive", "allstate",
+    ],
+    "Transportation": [
+        "uber", "lyft", "shell", "chevron", "exxon", "mobil", "bp", "arco", "valero", "sunoco", "speedway",
+        "wawa", "gas station", "fuel", "parking", "toll", "metro", "transit", "mta", "bart", "amtrak",
+        "greyhound", "zipcar",
+    ],
+    "Travel": [
+        "airbnb", "expedia", "booking com", "hotels com", "marriott", "hilton", "hyatt", "delta air", "delta airlines",
+        "united airlines", "american airlines", "southwest", "jetblue", "alaska air", "airlines", "hotel",
+    ],
+    "Rent": ["rent payment", "monthly rent", "apartments", "property management", "landlord", "zillow rent"],
+    "Entertainment": [
+        "netflix", "spotify", "hulu", "disney plus", "hbo", "max com", "youtube premium", "apple music",
+        "amc", "regal", "cinema", "theatre", "theater", "ticketmaster", "stubhub", "steam", "playstation",
+        "xbox", "nintendo", "audible",
+    ],
+}
+
+# Merchant category code ranges (ISO 18245) → category
+MCC_RANGES = [
+    ((3000, 3350), "Travel"), ((3351, 3500), "Transportation"), ((3501, 3999), "Travel"),
+    ((4011, 4131), "Transportation"), ((4411, 4411), "Travel"), ((4511, 4582), "Travel"),
+    ((4722, 4722), "Travel"), ((4784, 4784), "Transportation"), ((4812, 4816), "Bills and Utilities"),
+    ((4899, 4900), "Bills and Utilities"), ((5411, 5422), "Groceries"), ((5441, 5499), "Groceries"),
+    ((5541, 5542), "Transportation"), ((5811, 5814), "Food and Drink"), ((5912, 5912), "Health"),
+    ((5200, 5399), "Shopping"), ((5600, 5699), "Shopping"), ((5700, 5735), "Shopping"),
+    ((5900, 5999), "Shopping"), ((6513, 6513), "Rent"), ((7011, 7012), "Travel"),
+    ((7512, 7523), "Transportation"), ((7829, 7841), "Entertainment"), ((7911, 7999), "Entertainment"),
+    ((8011, 8099), "Health"), ((6300, 6399), "Bills and Utilities"),
+]
+
+# Plaid's category hierarchy → category; the most specific level that maps wins
+PLAID_CATEGORIES = {
+    "food and drink": "Food and Drink",
+    "restaurants": "Food and Drink",
+    "coffee shop": "Food and Drink",
+    "supermarkets and groceries": "Groceries",
+    "groceries": "Groceries",
+    "healthcare": "Health",
+    "pharmacies": "Health",
+    "health": "Health",
+    "shops": "Shopping",
+    "shopping": "Shopping",
+    "utilities": "Bills and Utilities",
+    "telecommunication services": "Bills and Utilities",
+    "cable": "Bills and Utilities",
+    "insurance": "Bills and Utilities",
+    "bills and utilities": "Bills and Utilities",
+    "transportation": "Transportation",
+    "taxi": "Transportation",
+    "gas stations": "Transportation",
+    "public transportation services": "Transportation",
+    "travel": "Travel",
+    "airlines and aviation services": "Travel",
+    "lodging": "Travel",
+    "rent": "Rent",
+    "recreation": "Entertainment",
+    "entertainment": "Entertainment",
+    "arts and entertainment": "Entertainment",
+}
+
+
+def normalize_text(text):
+    """Lowercase, punctuation/digits → single spaces, padded so keywords match whole words."""
+    return " " + " ".join(re.sub(r"[^a-z]+", " ", str(text).lower().replace("'", "")).split()) + " "
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over whole-word keywords. One pass over a merchant name
+    finds every keyword it contains; the longest match wins, so "uber eats" beats "uber".
+    """
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]  # (length, value) of the longest keyword ending at each state
+        for keyword, value in keywords.items():
+            self._insert(normalize_text(keyword), value)
+        self._build_failure_links()
+
+    def _insert(self, pattern, value):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            state = next_state
+        if self._output[state] is None or self._output[state][0] < len(pattern):
+            self._output[state] = (len(pattern), value)
+
+    def _build_failure_links(self):
+        # Breadth-first, so a state's failure target (always shallower) is complete first
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # A state also reports the best keyword of its failure state (a suffix of it)
+                inherited = self._output[self._fail[child]]
+                if inherited and (self._output[child] is None or self._output[child][0] < inherited[0]):
+                    self._output[child] = inherited
+
+    def search(self, normalized):
+        """Value of the longest keyword in an already normalized string, or None."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state, best = 0, None
+        for char in normalized:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = output[state]
+            if found and (best is None or found[0] > best[0]):
+                best = found
+        return best[1] if best else None
+
+    def __len__(self):
+        return len(self._goto)
+
+
+def mcc_category(mcc):
+    """Category for a merchant category code, or None."""
+    try:
+        code = int(mcc)
+    except (TypeError, ValueError):
+        return None
+    for (low, high), category in MCC_RANGES:
+        if low <= code <= high:
+            return category
+    return None
+
+
+def plaid_category(category):
+    """Map Plaid's category list (or a single category string) to a category, or None."""
+    levels = category if isinstance(category, list) else [category]
+    for level in reversed(levels):
+        if isinstance(level, str):
+            mapped = PLAID_CATEGORIES.get(level.strip().lower())
+            if mapped:
+                return mapped
+    return None
+
+
+class RuleCategorizer:
+    """
+    Local, offline categorizer tried before the LLM. In priority order: user
+    overrides for the exact merchant, merchant keywords, the MCC, then Plaid's own
+    category. Each result carries a confidence; only results below
+    CONFIDENCE_THRESHOLD need the LLM.
+    """
+
+    def __init__(self, keywords=None, overrides=None):
+        keywords = keywords if keywords is not None else MERCHANT_KEYWORDS
+        self._automaton = KeywordAutomaton({
+            keyword: category for category, words in keywords.items() for keyword in words
+        })
+        self._overrides = {}
+        for name, category in (overrides or {}).items():
+            self.add_override(name, category)
+
+    def add_override(self, name, category):
+        """Always file this merchant under category (e.g. after a user correction)."""
+        self._overrides[normalize_text(name)] = category
+
+    @property
+    def overrides(self):
+        """{normalized merchant name: category}, as passed back to __init__ to restore them."""
+        return dict(self._overrides)
+
+    def save_overrides(self, path):
+        """Write the overrides as JSON (atomically)."""
+        write_json(path, self._overrides)
+
+    def categorize(self, name, category=None, mcc=None):
+        """(category, confidence, source) for one transaction; source is None when nothing matched."""
+        normalized = normalize_text(name or "")
+        if normalized in self._overrides:
+            return self._overrides[normalized], OVERRIDE_CONFIDENCE, "override"
+        matched = self._automaton.search(normalized)
+        if matched:
+            return matched, KEYWORD_CONFIDENCE, "keyword"
+        matched = mcc_category(mcc)
+        if matched:
+            return matched, MCC_CONFIDENCE, "mcc"
+        matched = plaid_category(category)
+        if matched:
+            return matched, PLAID_CONFIDENCE, "plaid"
+        return UNCATEGORIZED, 0.0, None
+
+    def categorize_many(self, transactions):
+        """
+        Categorize transaction dicts in bulk. Returns a DataFrame with category,
+        confidence and source per row, in input order.
+        """
+        return self.categorize_columns(
+            [tx.get("name") for tx in transactions],
+            ["|".join(c) if isinstance(c, list) else c for c in (tx.get("category") for tx in transactions)],
+            [tx.get("merchant_category_code") or tx.get("mcc") for tx in transactions],
+        )
+
+    def categorize_columns(self, names, categories=None, mccs=None):
+        """
+        Column form of categorize_many; categories may be '|'-joined Plaid levels.
+        Rules run once per distinct (name, category, mcc) and are broadcast back,
+        since histories repeat the same merchants over and over.
+        """
+        codes, uniques = [], []
+        for column in (names, categories, mccs):
+            if column is None:
+                codes.append(np.zeros(len(names), dtype=np.int64))
+                uniques.append(np.array([None], dtype=object))
+                continue
+            column_codes, column_uniques = pd.factorize(pd.Series(column, dtype=object), use_na_sentinel=False)
+            codes.append(column_codes.astype(np.int64))
+            uniques.append(np.asarray(column_uniques, dtype=object))
+
+        # One integer key per row from the per-column codes, then each distinct key is categorized once
+        name_codes, category_codes, mcc_codes = codes
+        combined = (name_codes * len(uniques[1]) + category_codes) * len(uniques[2]) + mcc_codes
+        row_keys, distinct = pd.factorize(combined)
+
+        results = []
+        for key in distinct:
+            rest, mcc_code = divmod(int(key), len(uniques[2]))
+            name_code, category_code = divmod(rest, len(uniques[1]))
+            name, plaid, mcc = uniques[0][name_code], uniques[1][category_code], uniques[2][mcc_code]
+            results.append(self.categorize(
+                name if isinstance(name, str) else "",
+                plaid.split("|") if isinstance(plaid, str) and plaid else None,
+                mcc,
+            ))
+
+        category, confidence, source = zip(*results) if results else ((), (), ())
+        return pd.DataFrame({
+            "category": np.asarray(category, dtype=object)[row_keys],
+            "confidence": np.asarray(confidence, dtype=np.float64)[row_keys],
+            "source": np.asarray(source, dtype=object)[row_keys],
+        })
+
+
+# Hashed character n-grams of the normalized merchant name
+NGRAM_SIZES = (3, 4, 5)
+HASH_BITS = 16
+MAX_NAME_CHARS = 40
+PREDICT_CHUNK_ROWS = 4096
+_HASH_MULTIPLIER = np.uint64(1_000_003)
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hashed_ngrams(names, hash_bits=HASH_BITS):
+    """
+    Feature buckets for a batch of names: (buckets, valid), both shaped
+    (len(names), features). Names are normalized and truncated to MAX_NAME_CHARS,
+    then every n-gram is hashed at once with NumPy; valid masks out n-grams that
+    would run past the end of a shorter name.
+    """
+    # Same normalization as normalize_text, without the padding, using vectorized string ops
+    normalized = (
+        pd.Series(list(names), dtype=object).fillna("").astype(str).str.lower()
+        .str.replace("'", "", regex=False).str.replace(r"[^a-z]+", " ", regex=True).str.strip()
+    )
+    encoded = normalized.str.slice(0, MAX_NAME_CHARS).to_numpy().astype(f"S{MAX_NAME_CHARS}")
+    chars = encoded.view(np.uint8).reshape(len(encoded), MAX_NAME_CHARS).astype(np.uint64)
+    lengths = np.char.str_len(encoded)
+
+    buckets, valid = [], []
+    with np.errstate(over="ignore"):
+        for n in NGRAM_SIZES:
+            width = MAX_NAME_CHARS - n + 1
+            h = np.full((len(encoded), width), n, dtype=np.uint64)
+            for k in range(n):
+                h = h * _HASH_MULTIPLIER + chars[:, k:k + width]
+            buckets.append((h * _HASH_MIX) >> np.uint64(64 - hash_bits))
+            valid.append(np.arange(width) + n <= lengths[:, None])
+    return np.hstack(buckets).astype(np.int64), np.hstack(valid)
+
+
+class NaiveBayesCategorizer:
+    """
+    Multinomial naive Bayes over hashed character n-grams of merchant names, trained
+    on the user's own categorized history. partial_fit adds counts, so corrections
+    are learned incrementally; predictions come with a probability as confidence.
+    """
+
+    def __init__(self, hash_bits=HASH_BITS, alpha=0.5):
+        self.hash_bits = hash_bits
+        self.alpha = alpha
+        self.classes = []
+        self._counts = np.zeros((0, 1 << hash_bits), dtype=np.float32)
+        self._class_counts = np.zeros(0, dtype=np.float64)
+        self._log_likelihood = None
+
+    def partial_fit(self, names, categories):
+        """Add labelled examples; unseen categories become new classes. Returns self."""
+        names, categories = list(names), list(categories)
+        if not names:
+            return self
+        for category in dict.fromkeys(categories):
+            if category not in self.classes:
+                self.classes.append(category)
+        if len(self.classes) > len(self._counts):
+            grow = len(self.classes) - len(self._counts)
+            self._counts = np.vstack([self._counts, np.zeros((grow, self._counts.shape[1]), dtype=np.float32)])
+            self._class_counts = np.concatenate([self._class_counts, np.zeros(grow)])
+
+        index = {category: i for i, category in enumerate(self.classes)}
+        labels = np.array([index[category] for category in categories], dtype=np.int64)
+        buckets, valid = hashed_ngrams(names, self.hash_bits)
+        rows = np.broadcast_to(labels[:, None], buckets.shape)[valid]
+        width = self._counts.shape[1]
+        self._counts += np.bincount(rows * width + buckets[valid], minlength=self._counts.size).reshape(self._counts.shape)
+        self._class_counts += np.bincount(labels, minlength=len(self.classes))
+        self._log_likelihood = None
+        return self
+
+    def _weights(self):
+        if self._log_likelihood is None:
+            smoothed = self._counts + self.alpha
+            self._log_likelihood = np.ascontiguousarray(
+                (np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))).T, dtype=np.float32
+            )
+            self._log_prior = np.log(self._class_counts / self._class_counts.sum())
+        return self._log_likelihood, self._log_prior
+
+    def predict_proba(self, names):
+        """Class probabilities, shaped (len(names), len(classes)); columns follow self.classes."""
+        names = list(names)
+        if not self.classes:
+            return np.zeros((len(names), 0))
+        log_likelihood, log_prior = self._weights()
+        proba = np.empty((len(names), len(self.classes)))
+        for start in range(0, len(names), PREDICT_CHUNK_ROWS):
+            buckets, valid = hashed_ngrams(names[start:start + PREDICT_CHUNK_ROWS], self.hash_bits)
+            # Sum the weights of each row's valid n-grams: gather only those, then reduce per row
+            per_row = valid.sum(axis=1)
+            scores = np.zeros((len(buckets), len(self.classes)))
+            has_features = per_row > 0
+            if has_features.any():
+                offsets = np.concatenate([[0], np.cumsum(per_row[has_features])[:-1]])
+                scores[has_features] = np.add.reduceat(log_likelihood[buckets[valid]], offsets, axis=0)
+            scores += log_prior
+            scores -= scores.max(axis=1, keepdims=True)
+            np.exp(scores, out=scores)
+            proba[start:start + len(scores)] = scores / scores.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, names):
+        """DataFrame with category and confidence per name. Repeated names are scored once."""
+        codes, uniques = pd.factorize(pd.Series(list(names), dtype=object).fillna(""))
+        if not self.classes:
+            return pd.DataFrame({"category": [UNCATEGORIZED] * len(codes), "confidence": np.zeros(len(codes))})
+        proba = self.predict_proba(uniques)
+        best = proba.argmax(axis=1)
+        return pd.DataFrame({
+            "category": np.asarray(self.classes, dtype=object)[best][codes],
+            "confidence": proba[np.arange(len(best)), best][codes],
+        })
+
+    def save(self, path):
+        """Write the model as .npz (atomically)."""
+        atomic_write(path, lambda tmp_path: np.savez_compressed(
+            tmp_path,
+            counts=self._counts,
+            class_counts=self._class_counts,
+            classes=np.array(self.classes, dtype=str),
+            params=np.array([self.hash_bits, self.alpha]),
+        ), suffix=".tmp.npz")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            hash_bits, alpha = data["params"]
+            model = cls(hash_bits=int(hash_bits), alpha=float(alpha))
+            model.classes = data["classes"].tolist()
+            model._counts = data["counts"]
+            model._class_counts = data["class_counts"]
+        return model
+
+    def __len__(self):
+        """Number of training examples seen."""
+        return int(self._class_counts.sum())
+
+
+def training_examples(transactions):
+    """(names, categories) from categorized transactions; Plaid categories are mapped first."""
+    names, categories = [], []
+    for tx in transactions:
+        category = tx.get("category")
+        label = plaid_category(category) if isinstance(category, list) else category
+        if tx.get("name") and isinstance(label, str) and label and label != UNCATEGORIZED:
+            names.append(tx["name"])
+            categories.append(label)
+    return names, categories
+
+
+_categorizer = None
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_category_model_path():
+    return Config.get_data_dir() / "category_model.npz"
+
+
+def get_category_model():
+    """
+    Process-wide NaiveBayesCategorizer. Loaded from <data dir>/category_model.npz,
+    or trained once from the categorized rows in the transaction store.
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            path = get_category_model_path()
+            try:
+                _model = NaiveBayesCategorizer.load(path) if path.exists() else None
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Could not read category model {path}: {e}")
+            if _model is None:
+                from backend.utils.transaction_store import get_transaction_store
+                _model = NaiveBayesCategorizer().partial_fit(*training_examples(get_transaction_store().query()))
+                if len(_model):
+                    _model.save(path)
+        return _model
+
+
+def get_category_overrides_path():
+    return Config.get_data_dir() / "category_overrides.json"
+
+
+def learn_categories(names, categories):
+    """
+    Apply user-chosen categories (e.g. edits in the pending-receipts table): each
+    merchant becomes a rule override, and the shared model learns the examples.
+    Both are saved to the data dir.
+    """
+    names, categories = list(names), list(categories)
+    categorizer = get_rule_categorizer()
+    model = get_category_model()
+    with _model_lock:
+        for name, category in zip(names, categories):
+            categorizer.add_override(name, category)
+        categorizer.save_overrides(get_category_overrides_path())
+        model.partial_fit(names, categories)
+        model.save(get_category_model_path())
+
+
+def _load_overrides(path):
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Could not read category overrides {path}: {e}")
+        return {}
+
+
+def get_rule_categorizer():
+    """Shared RuleCategorizer: the built-in keyword table plus the user's saved overrides."""
+    global _categorizer
+    with _model_lock:
+        if _categorizer is None:
+            _categorizer = RuleCategorizer(overrides=_load_overrides(get_category_overrides_path()))
+        return _categorizer
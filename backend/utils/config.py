@@ -18,3 +18,8 @@ class Config:
         if not api_key:
             raise ValueError("OpenAI API key not found in environment variables")
         return api_key
+
+    @staticmethod
+    def get_data_dir() -> Path:
+        """Get the directory used for locally persisted app data"""
+        return Path(os.getenv("FINANCE_DATA_DIR", project_root / "data"))
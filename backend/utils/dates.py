@@ -0,0 +1,104 @@
+from datetime import date, datetime
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from dateutil import parser as date_parser
+
+# Plaid dates come back from Flask's jsonify in RFC 1123 form; receipts use it too
+GMT_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
+
+# Formats tried in order, each over all still-unparsed values in one vectorized call:
+# Plaid/GMT, receipts without the zone, receipts saved to state, plain ISO dates
+KNOWN_FORMATS = (GMT_FORMAT, "%a, %d %b %Y %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+
+def parse_dates(values, accept_datetimes=True):
+    """
+    Parse a column of mixed date values to a naive datetime64[ns] Series (NaT where
+    unparseable), aligned with values' index when it is a Series. Each distinct value
+    is parsed once: the known formats and any ISO 8601 variant are vectorized, and
+    only leftovers (e.g. "Jan 5, 2024") go through dateutil one by one. Timezones are
+    dropped, keeping local wall time. date/datetime objects pass through unless
+    accept_datetimes is False.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series.dt.tz_localize(None) if series.dt.tz is not None else series
+        return parsed.astype("datetime64[ns]")
+
+    codes, uniques = pd.factorize(series.astype(object), sort=False)
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype="datetime64[ns]")
+
+    is_text = uniques.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+    text = uniques[is_text].str.strip()
+    for fmt in KNOWN_FORMATS:
+        pending = text[parsed[text.index].isna().to_numpy()]
+        if pending.empty:
+            break
+        parsed[pending.index] = pd.to_datetime(pending, format=fmt, errors="coerce")
+
+    pending = text[parsed[text.index].isna().to_numpy()]
+    if not pending.empty:
+        # Offsets are dropped rather than applied: the local calendar date is what counts
+        local = pending.str.replace(r"(?:Z|[+-]\d{2}:?\d{2})$", "", regex=True)
+        parsed[pending.index] = pd.to_datetime(local, format="ISO8601", errors="coerce")
+
+    for i in np.flatnonzero(parsed.isna().to_numpy()):
+        value = uniques.iloc[i]
+        try:
+            if isinstance(value, str):
+                value = date_parser.parse(value)
+            elif not (accept_datetimes and isinstance(value, (date, datetime, np.datetime64))):
+                continue
+            timestamp = pd.Timestamp(value)
+            parsed.iloc[i] = timestamp.tz_localize(None) if timestamp.tzinfo else timestamp
+        except (ValueError, OverflowError, TypeError):
+            continue
+
+    result = parsed.to_numpy()[codes]
+    result[codes < 0] = np.datetime64("NaT")
+    return pd.Series(result, index=series.index, dtype="datetime64[ns]")
+
+
+@lru_cache(maxsize=8192)
+def _parse_text_date(text):
+    for fmt in KNOWN_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    try:
+        return date_parser.parse(text).date()
+    except (ValueError, OverflowError):
+        return None
+
+
+def parse_date(value):
+    """
+    Single-value parse_dates for row-at-a-time callers: a datetime.date (local wall
+    date, timezone dropped) or None when unparseable. Repeated strings hit a cache.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value.strip():
+        return _parse_text_date(value.strip())
+    return None
+
+
+def year_months(dates):
+    """Monthly period column ('2024-03') for a datetime64 Series; NaT stays NaT."""
+    return dates.dt.to_period("M")
+
+
+def with_dates(df, column="date"):
+    """
+    Copy of df with column parsed by parse_dates and a year_month period column added.
+    Rows with unparseable dates are kept (as NaT) so callers decide whether to drop them.
+    """
+    df = df.copy()
+    df[column] = parse_dates(df[column]) if column in df.columns else pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    df["year_month"] = year_months(df[column])
+    return df
@@ -0,0 +1,24 @@
+import json
+import os
+from pathlib import Path
+
+
+def atomic_write(path, write, suffix=".tmp"):
+    """
+    Call write(tmp_path) on a temp file beside path, then swap it in with os.replace,
+    so a crash never leaves a half-written file and readers see the old or the new one.
+    suffix must keep any extension the writer insists on (np.savez adds ".npz").
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + suffix)
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_json(path, data):
+    """Atomically write data as JSON."""
+    def dump(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    atomic_write(path, dump)
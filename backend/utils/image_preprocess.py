@@ -0,0 +1,121 @@
+import os
+import time
+from io import BytesIO
+import numpy as np
+from PIL import Image, ImageOps
+
+# Defaults for the image sent to the vision model; receipt text stays legible well below 12 MP
+MAX_EDGE = int(os.getenv("RECEIPT_MAX_EDGE", "1600"))
+IMAGE_FORMAT = os.getenv("RECEIPT_IMAGE_FORMAT", "JPEG").upper()
+IMAGE_QUALITY = int(os.getenv("RECEIPT_IMAGE_QUALITY", "80"))
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+# Auto-crop works on a small preview; the paper must cover a sensible share of the photo
+CROP_PREVIEW_EDGE = 256
+CROP_MARGIN = 0.02
+CROP_MIN_AREA = 0.15
+CROP_MAX_AREA = 0.92
+CROP_LINE_SHARE = 0.5
+
+
+def _otsu_threshold(gray):
+    """Brightness threshold that best separates paper from background (Otsu's method)."""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_dark = np.cumsum(hist)
+    weight_light = weight_dark[-1] - weight_dark
+    sum_dark = np.cumsum(hist * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+    between = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    return int(np.argmax(between))
+
+
+def find_receipt_box(img):
+    """
+    Bounding box (left, top, right, bottom) of the bright paper region, or None when
+    the photo is already mostly receipt or no clear paper region stands out.
+    """
+    preview = img.convert("L")
+    preview.thumbnail((CROP_PREVIEW_EDGE, CROP_PREVIEW_EDGE))
+    gray = np.asarray(preview)
+    paper = gray > _otsu_threshold(gray)
+
+    # Paper rows/columns are those at least half as bright as the brightest one, so a
+    # narrow receipt counts as much as a wide one; the outermost ones bound the crop
+    row_share, col_share = paper.mean(axis=1), paper.mean(axis=0)
+    if row_share.max() == 0:
+        return None
+    rows = np.flatnonzero(row_share >= CROP_LINE_SHARE * row_share.max())
+    cols = np.flatnonzero(col_share >= CROP_LINE_SHARE * col_share.max())
+
+    height, width = gray.shape
+    area = (rows[-1] - rows[0] + 1) * (cols[-1] - cols[0] + 1) / (height * width)
+    if not CROP_MIN_AREA <= area <= CROP_MAX_AREA:
+        return None
+
+    # Scale back to full resolution with a small margin so edge text is not clipped
+    sx, sy = img.width / width, img.height / height
+    mx, my = CROP_MARGIN * img.width, CROP_MARGIN * img.height
+    return (
+        max(0, int(cols[0] * sx - mx)),
+        max(0, int(rows[0] * sy - my)),
+        min(img.width, int((cols[-1] + 1) * sx + mx)),
+        min(img.height, int((rows[-1] + 1) * sy + my)),
+    )
+
+
+def preprocess_receipt(image, max_edge=MAX_EDGE, fmt=IMAGE_FORMAT, quality=IMAGE_QUALITY, grayscale=True, crop=True):
+    """
+    Shrink a receipt photo for the vision API: auto-crop to the paper, downscale to
+    max_edge on the long side, convert to grayscale and encode as JPEG/WebP.
+    Returns (payload bytes, mime type, stats) where stats has per-stage timings in ms
+    and the byte/pixel counts before and after.
+    """
+    fmt = fmt.upper()
+    stats = {}
+    started = time.perf_counter()
+
+    def lap(stage):
+        nonlocal started
+        now = time.perf_counter()
+        stats[f"{stage}_ms"] = (now - started) * 1000
+        started = now
+
+    if hasattr(image, "getbuffer"):
+        stats["input_bytes"] = image.getbuffer().nbytes
+    elif isinstance(image, (str, os.PathLike)):
+        stats["input_bytes"] = os.path.getsize(image)
+    img = Image.open(image)
+    img = ImageOps.exif_transpose(img)  # Phone photos are often stored sideways
+    img = img.convert("RGB")
+    stats["input_size"] = img.size
+    lap("decode")
+
+    box = find_receipt_box(img) if crop else None
+    if box:
+        img = img.crop(box)
+    stats["cropped"] = box is not None
+    lap("crop")
+
+    if max(img.size) > max_edge:
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    lap("resize")
+
+    if grayscale:
+        img = img.convert("L")
+    lap("grayscale")
+
+    buffered = BytesIO()
+    if fmt == "PNG":
+        img.save(buffered, format="PNG")
+    else:
+        img.save(buffered, format=fmt, quality=quality)
+    payload = buffered.getvalue()
+    lap("encode")
+
+    stats["output_size"] = img.size
+    stats["output_bytes"] = len(payload)
+    stats["total_ms"] = sum(value for key, value in stats.items() if key.endswith("_ms"))
+    return payload, MIME_TYPES[fmt], stats
@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from backend.utils.config import Config
+from backend.utils.files import write_json
+
+DEFAULT_TTL_SECONDS = int(os.getenv("MERCHANT_CACHE_TTL_DAYS", "180")) * 24 * 3600
+DEFAULT_MAX_ENTRIES = int(os.getenv("MERCHANT_CACHE_MAX_ENTRIES", "5000"))
+
+
+class MerchantCache:
+    """
+    Persistent merchant → classification cache (e.g. "is this an important bill?").
+    Keys are normalized merchant names chosen by the caller. Entries expire after
+    ttl_seconds and the least recently used ones are evicted beyond max_entries.
+    Stored as JSON in LRU order: {"merchant": {"value": ..., "stored_at": epoch}, ...}
+    """
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        if not self.path.exists():
+            return OrderedDict()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return OrderedDict(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not read merchant cache {self.path}: {e}")
+            return OrderedDict()
+
+    def _save(self):
+        write_json(self.path, self._entries)
+
+    def _fresh(self, entry, now):
+        return now - entry["stored_at"] < self.ttl_seconds
+
+    def get(self, merchant, default=None):
+        """Cached value for a merchant, or default if unknown or expired. Marks it recently used."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(merchant)
+            if entry is None or not self._fresh(entry, now):
+                self.misses += 1
+                return default
+            self._entries.move_to_end(merchant)
+            self.hits += 1
+            return entry["value"]
+
+    def set_many(self, values):
+        """Store {merchant: value} in one write, evicting expired and least recently used entries."""
+        now = time.time()
+        with self._lock:
+            for merchant, value in values.items():
+                self._entries[merchant] = {"value": value, "stored_at": now}
+                self._entries.move_to_end(merchant)
+            for merchant in [m for m, entry in self._entries.items() if not self._fresh(entry, now)]:
+                del self._entries[merchant]
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def set(self, merchant, value):
+        self.set_many({merchant: value})
+
+    def save(self):
+        """Persist the current LRU order now (reads only reorder in memory; the next set_many writes it)."""
+        with self._lock:
+            self._save()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_merchant_cache(name):
+    """Process-wide cache stored at <data dir>/<name>.json, created on first use."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = MerchantCache(Config.get_data_dir() / f"{name}.json")
+        return _caches[name]
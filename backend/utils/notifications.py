@@ -1,84 +1,421 @@
 from collections import defaultdict
-from datetime import datetime, timedelta, date
+from datetime import timedelta, date
 from calendar import monthrange
-from dateutil import parser as date_parser
+from pathlib import Path
+import json
+import os
 import re
+import threading
+import numpy as np
+import pandas as pd
+from backend.utils.config import Config
+from backend.utils.dates import parse_dates
+from backend.utils.files import write_json
 
 
 # --- STEP 1: Budget Overspending Alerts ---
-def generate_notifications(overspending_summary, year_month):
-    seen_messages = set()
-    notifications = []
+OVERSPENDING = "overspending"
 
-    for category, exceeded_amount in overspending_summary.items():
-        message = f"⚠️ You exceeded your budget for {category} by ${exceeded_amount:.2f} in {year_month}."
-        if message not in seen_messages:
-            notifications.append({
-                "month": year_month,
-                "category": category,
-                "message": message
-            })
-            seen_messages.add(message)
 
-    return notifications
+def generate_notifications(overspending_summary, year_month):
+    # One alert per category: the summary is already keyed by category, so no de-duplication needed
+    return [
+        {
+            "month": year_month,
+            "category": category,
+            "kind": OVERSPENDING,
+            "message": f"⚠️ You exceeded your budget for {category} by ${exceeded_amount:.2f} in {year_month}."
+        }
+        for category, exceeded_amount in overspending_summary.items()
+    ]
+
+
+class NotificationStore:
+    """
+    Persistent alerts keyed by (month, category, kind). Upserting replaces the alert
+    for its key; replace_month swaps in a month's full set of alerts of one kind, so
+    re-analysing a month also drops the alerts that no longer apply. Only the newest
+    max_months months (NOTIFICATION_MAX_MONTHS, default 12) are kept.
+    Stored as JSON: {"YYYY-MM": {"kind|category": notification, ...}, ...}
+    """
+
+    def __init__(self, path, max_months=None):
+        self.path = Path(path)
+        self.max_months = max_months if max_months is not None else int(os.getenv("NOTIFICATION_MAX_MONTHS", "12"))
+        self._lock = threading.Lock()
+        self._months = self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not read notification store {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        write_json(self.path, self._months)
+
+    @staticmethod
+    def _key(note):
+        return f"{note.get('kind', OVERSPENDING)}|{note['category']}"
+
+    def _upsert(self, notifications):
+        changed = 0
+        for note in notifications:
+            key = self._key(note)
+            month = self._months.setdefault(note["month"], {})
+            if month.get(key) != note:
+                month[key] = dict(note)
+                changed += 1
+        return changed
+
+    def _commit(self, changed):
+        # Retention: drop the oldest months beyond the cap (at most max_months + a few keys to sort)
+        while len(self._months) > self.max_months:
+            del self._months[min(self._months)]
+        if changed:
+            self._save()
+        return changed
+
+    def upsert_many(self, notifications):
+        """Insert or replace alerts by key; returns how many were new or changed."""
+        with self._lock:
+            return self._commit(self._upsert(notifications))
+
+    def replace_month(self, year_month, notifications, kind=OVERSPENDING):
+        """
+        Make notifications the month's complete set of `kind` alerts: alerts of that kind
+        missing from it (e.g. a category back under budget) are removed, other kinds are
+        kept. Returns how many alerts were added, changed or removed.
+        """
+        with self._lock:
+            keep = {self._key(note) for note in notifications}
+            month = self._months.get(year_month, {})
+            resolved = [key for key, note in month.items() if note.get("kind", OVERSPENDING) == kind and key not in keep]
+            for key in resolved:
+                del month[key]
+            changed = len(resolved) + self._upsert(notifications)
+            if not self._months.get(year_month, True):
+                del self._months[year_month]  # Nothing left to report for the month
+            return self._commit(changed)
+
+    def upsert(self, notification):
+        return self.upsert_many([notification]) > 0
+
+    def for_month(self, year_month):
+        with self._lock:
+            return list(self._months.get(year_month, {}).values())
+
+    def recent(self):
+        """All retained alerts, newest month first."""
+        with self._lock:
+            return [note for month in sorted(self._months, reverse=True) for note in self._months[month].values()]
+
+    def clear(self, year_month=None):
+        with self._lock:
+            if year_month is None:
+                self._months = {}
+            else:
+                self._months.pop(year_month, None)
+            self._save()
+
+
+_notification_store = None
+_notification_store_lock = threading.Lock()
+
+
+def get_notification_store():
+    """Return the process-wide store at <data dir>/notifications.json, creating it on first use."""
+    global _notification_store
+    with _notification_store_lock:
+        if _notification_store is None:
+            _notification_store = NotificationStore(Config.get_data_dir() / "notifications.json")
+        return _notification_store
 
 
 def normalize_name(name):
     return re.sub(r'[^a-z]', '', name.lower())
 
-def detect_recurring_transactions(transactions):
-    recurring = []
-    grouped = defaultdict(list)
 
-    for tx in transactions:
-        try:
-            norm_name = normalize_name(tx["name"])
-            amount = round(float(tx["amount"]), 2)
+def _next_due(last_date, avg_day):
+    """Billing day in the month after last_date, clamped to that month's length."""
+    next_month = last_date.month + 1
+    next_year = last_date.year + (1 if next_month > 12 else 0)
+    next_month = 1 if next_month > 12 else next_month
+    max_day = monthrange(next_year, next_month)[1]
+    return date(next_year, next_month, min(round(avg_day), max_day))
 
-            # ❌ Skip negative or zero transactions (credits/refunds)
-            if amount <= 0:
-                continue
 
-            tx_date = date_parser.parse(tx["date"]).date()
-            key = (norm_name, amount)
-            grouped[key].append((tx_date, tx))
-        except:
-            continue
+def _parse_dates(values):
+    """
+    Parse a column of date values to datetime64[D], NaT where date_parser.parse fails.
+    Delegates to dates.parse_dates, rejecting non-strings like the row-wise code.
+    """
+    return parse_dates(values, accept_datetimes=False).to_numpy().astype("datetime64[D]")
+
 
-    for (norm_name, amount), entries in grouped.items():
-        if len(entries) < 3:
+def _parse_amounts(values):
+    """round(float(amount), 2) per row with NaN where float() fails, computed once per distinct value."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=False)
+    rounded = np.full(len(uniques) + 1, np.nan)  # trailing slot is the NaN for missing (-1) codes
+    for i, value in enumerate(uniques):
+        try:
+            rounded[i] = round(float(value), 2)
+        except (TypeError, ValueError):
             continue
+    return rounded[codes]
 
-        entries.sort(key=lambda x: x[0])
-        dates = [entry[0] for entry in entries]
-        months_seen = set((d.year, d.month) for d in dates)
 
-        # Require recurrence in at least 3 different months
-        if len(months_seen) < 3:
-            continue
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _normalize_names(values):
+    """Vectorized normalize_name, once per distinct name; None where the name isn't a string."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=False)
+    names = pd.Series(uniques, dtype=object)
+    is_text = names.map(lambda value: isinstance(value, str))
+    normalized = names.where(is_text).str.lower().str.replace(r'[^a-z]', '', regex=True)
+    normalized = np.append(normalized.where(is_text, None).to_numpy(dtype=object), None)  # slot for -1 codes
+    return pd.Series(normalized[codes], dtype=object)
+
+
+def _as_frame(transactions):
+    """
+    DataFrame view of the input plus a row → transaction dict lookup. For a list the
+    lookup returns the original dicts; for a DataFrame, name/category with NaN dropped.
+    """
+    if isinstance(transactions, pd.DataFrame):
+        columns = {key: transactions[key].to_numpy(dtype=object) for key in ("name", "category") if key in transactions}
+        return transactions, lambda row: {
+            key: values[row] for key, values in columns.items() if not _is_missing(values[row])
+        }
+    records = list(transactions)
+    return pd.DataFrame(records), records.__getitem__
+
+
+def _bill_columns(df):
+    """
+    (rows, name_codes, amounts, dates) for the rows the row-wise loop keeps: a string
+    name, a positive parseable amount and a parseable date. None if there are none.
+    """
+    if df.empty or not {"name", "amount", "date"} <= set(df.columns):
+        return None
+
+    names = _normalize_names(df["name"])
+    amounts = _parse_amounts(df["amount"])
+    dates = _parse_dates(df["date"])
+
+    valid = names.notna().to_numpy() & ~np.isnan(amounts) & (amounts > 0) & ~np.isnat(dates)
+    rows = np.flatnonzero(valid)
+    if len(rows) == 0:
+        return None
+    name_codes, _ = pd.factorize(names.to_numpy()[rows], sort=False)
+    return rows, name_codes, amounts[rows], dates[rows]
+
+
+def detect_recurring_transactions(transactions):
+    """
+    Find bills that repeat with the same normalized name and amount in at least
+    three months, on a billing day within ±3 days of the group's average.
+    One factorize per column, then all grouping is done with bincount aggregates.
+    Accepts a list of transaction dicts or a DataFrame.
+    """
+    df, lookup = _as_frame(transactions)
+    columns = _bill_columns(df)
+    if columns is None:
+        return []
+    rows, name_codes, amounts, dates = columns
+
+    # Group on (normalized name, amount) in first-seen order, like the dict the loop builds
+    amount_codes, _ = pd.factorize(amounts, sort=False)
+    groups, _ = pd.factorize(name_codes.astype(np.int64) * (amount_codes.max() + 1) + amount_codes, sort=False)
+    n_groups = groups.max() + 1
+
+    counts = np.bincount(groups, minlength=n_groups)
+
+    # Distinct (year, month) per group
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    month_pairs = pd.unique(groups.astype(np.int64) * (months.max() + 1) + months)
+    months_seen = np.bincount(month_pairs // (months.max() + 1), minlength=n_groups)
+
+    # Day-of-month spread: every day within ±3 of the mean ⇔ min and max are
+    days = (dates - dates.astype("datetime64[M]")).astype(np.int64) + 1
+    avg_day = np.bincount(groups, weights=days, minlength=n_groups) / np.maximum(counts, 1)
+    min_day = np.full(n_groups, 32)
+    max_day = np.zeros(n_groups, dtype=np.int64)
+    np.minimum.at(min_day, groups, days)
+    np.maximum.at(max_day, groups, days)
+
+    keep = (counts >= 3) & (months_seen >= 3) & (max_day - avg_day <= 3) & (avg_day - min_day <= 3)
+    if not keep.any():
+        return []
+
+    # Representative row: latest date, and the last such row in input order (stable sort)
+    day_numbers = dates.astype(np.int64)
+    last_date = np.full(n_groups, np.iinfo(np.int64).min)
+    np.maximum.at(last_date, groups, day_numbers)
+    last_row = np.full(n_groups, -1)
+    on_last_date = np.flatnonzero(day_numbers == last_date[groups])
+    np.maximum.at(last_row, groups[on_last_date], on_last_date)
+
+    recurring = []
+    for group in np.flatnonzero(keep):
+        tx = lookup(rows[last_row[group]])
+        recurring.append({
+            "name": tx["name"],
+            "category": tx.get("category", ["Other"])[0],
+            "amount": float(amounts[last_row[group]]),
+            "next_due": _next_due(pd.Timestamp(dates[last_row[group]]).date(), float(avg_day[group]))
+        })
+
+    return recurring
+
+
+# Cadences detect_recurring_series recognizes: name → (period in days, ± days, minimum occurrences)
+CADENCES = {
+    "weekly": (7, 1, 4),
+    "biweekly": (14, 2, 3),
+    "monthly": (30, 5, 3),
+    "annual": (365, 7, 2),
+}
+CADENCE_SHARE = 0.75  # share of a series' gaps that must match its cadence
+DEFAULT_AMOUNT_TOLERANCE = 0.15  # amounts within ±15% of a cluster's centre belong together
+
+
+def cluster_amounts(name_codes, amounts, tolerance=DEFAULT_AMOUNT_TOLERANCE):
+    """
+    Label each row with an amount cluster per merchant, in O(n log n): sort by
+    (merchant, amount) and start a new cluster wherever the merchant changes or the
+    amount no longer fits within ±tolerance of a shared centre, i.e. exceeds the
+    cluster's smallest amount × (1 + tolerance) / (1 - tolerance).
+    """
+    n = len(amounts)
+    spread = (1 + tolerance) / (1 - tolerance)
+    order = np.lexsort((amounts, name_codes))
+    sorted_names = name_codes[order]
+    sorted_amounts = amounts[order]
+
+    # Vectorized first pass: break on merchant change or a single step above tolerance
+    new_cluster = np.ones(n, dtype=bool)
+    new_cluster[1:] = (sorted_names[1:] != sorted_names[:-1]) | (sorted_amounts[1:] > sorted_amounts[:-1] * spread)
+
+    # Many small steps can still drift past the tolerance; sweep just those chains from their anchor
+    starts = np.flatnonzero(new_cluster)
+    ends = np.append(starts[1:], n)
+    drifting = np.flatnonzero(np.maximum.reduceat(sorted_amounts, starts) > sorted_amounts[starts] * spread)
+    for chain in drifting:
+        anchor = sorted_amounts[starts[chain]]
+        for i in range(starts[chain] + 1, ends[chain]):
+            if sorted_amounts[i] > anchor * spread:
+                new_cluster[i] = True
+                anchor = sorted_amounts[i]
+
+    labels = np.empty(n, dtype=np.int64)
+    labels[order] = np.cumsum(new_cluster) - 1
+    return labels
+
+
+def _first_category(tx):
+    category = tx.get("category")
+    if isinstance(category, list):
+        return category[0] if category else "Other"
+    return category if isinstance(category, str) else "Other"
+
+
+def _next_occurrence(cadence, last_date, avg_day):
+    if cadence == "monthly":
+        return _next_due(last_date, avg_day)
+    if cadence == "annual":
+        try:
+            return last_date.replace(year=last_date.year + 1)
+        except ValueError:  # Feb 29
+            return last_date.replace(year=last_date.year + 1, day=28)
+    return last_date + timedelta(days=CADENCES[cadence][0])
+
+
+def detect_recurring_series(transactions, amount_tolerance=DEFAULT_AMOUNT_TOLERANCE):
+    """
+    Find recurring payments whose amount varies (utilities, metered plans) and that
+    repeat weekly, biweekly, monthly or annually. Amounts are grouped per merchant with
+    cluster_amounts; a cluster is recurring when at least CADENCE_SHARE of the gaps
+    between its dates match one cadence. Returns candidates shaped like
+    detect_recurring_transactions (amount is the cluster's mean) plus cadence,
+    occurrences and billing_day (the unclamped day of month it is billed on).
+    """
+    df, lookup = _as_frame(transactions)
+    columns = _bill_columns(df)
+    if columns is None:
+        return []
+    rows, name_codes, amounts, dates = columns
+
+    clusters = cluster_amounts(name_codes, amounts, amount_tolerance)
+    n_clusters = clusters.max() + 1
+    counts = np.bincount(clusters, minlength=n_clusters)
+
+    # Date order within each cluster (input order breaks ties), then gaps between neighbours
+    day_numbers = dates.astype(np.int64)
+    order = np.lexsort((np.arange(len(rows)), day_numbers, clusters))
+    sorted_clusters = clusters[order]
+    sorted_days = day_numbers[order]
+    same_cluster = sorted_clusters[1:] == sorted_clusters[:-1]
+    gaps = (sorted_days[1:] - sorted_days[:-1])[same_cluster]
+    gap_clusters = sorted_clusters[1:][same_cluster]
+
+    # Tally gaps per (cluster, cadence) and keep each cluster's best cadence
+    cadence_names = list(CADENCES)
+    gap_cadence = np.full(len(gaps), -1)
+    for i, (period, tolerance, _) in enumerate(CADENCES.values()):
+        gap_cadence[(gap_cadence < 0) & (np.abs(gaps - period) <= tolerance)] = i
+    matched = gap_cadence >= 0
+    hits = np.bincount(
+        gap_clusters[matched] * len(cadence_names) + gap_cadence[matched],
+        minlength=n_clusters * len(cadence_names)
+    ).reshape(n_clusters, len(cadence_names))
+    best = hits.argmax(axis=1)
+    best_hits = hits[np.arange(n_clusters), best]
+    min_counts = np.array([minimum for _, _, minimum in CADENCES.values()])
+    keep = (best_hits > 0) & (counts >= min_counts[best]) & (best_hits >= CADENCE_SHARE * (counts - 1))
+
+    # Latest row per cluster is the last one in the sorted order
+    last_positions = np.flatnonzero(np.append(~same_cluster, True))
+    last_row = order[last_positions]
+    mean_amount = np.bincount(clusters, weights=amounts, minlength=n_clusters) / counts
+    days_of_month = (dates - dates.astype("datetime64[M]")).astype(np.int64) + 1
+    avg_day = np.bincount(clusters, weights=days_of_month, minlength=n_clusters) / counts
 
-        avg_day = sum(d.day for d in dates) / len(dates)
-
-        # Allow ±3 day tolerance around the average billing day
-        if all(abs(d.day - avg_day) <= 3 for d in dates):
-            last_date = dates[-1]
-            next_month = last_date.month + 1
-            next_year = last_date.year + (1 if next_month > 12 else 0)
-            next_month = 1 if next_month > 12 else next_month
-            max_day = monthrange(next_year, next_month)[1]
-            next_day = min(round(avg_day), max_day)
-            next_due = date(next_year, next_month, next_day)
-
-            recurring.append({
-                "name": entries[-1][1]["name"],
-                "category": entries[-1][1].get("category", ["Other"])[0],
-                "amount": amount,
-                "next_due": next_due
-            })
+    recurring = []
+    for cluster in np.flatnonzero(keep):
+        tx = lookup(rows[last_row[cluster]])
+        cadence = cadence_names[best[cluster]]
+        last_date = pd.Timestamp(dates[last_row[cluster]]).date()
+        billing_day = round(float(avg_day[cluster])) if cadence == "monthly" else last_date.day
+        recurring.append({
+            "name": tx["name"],
+            "category": _first_category(tx),
+            "amount": round(float(mean_amount[cluster]), 2),
+            "cadence": cadence,
+            "occurrences": int(counts[cluster]),
+            "billing_day": billing_day,
+            "next_due": _next_occurrence(cadence, last_date, float(avg_day[cluster]))
+        })
 
     return recurring
 
+
 # --- STEP 3: Generate Sorted, Multi-Month Reminders ---
+def _reminder(item, due_date):
+    return {
+        "name": item["name"],
+        "category": item["category"],
+        "amount": item["amount"],
+        "due_date": due_date.isoformat(),
+        "message": f"📅 Recurring payment: **{item['name']}** (${item['amount']}) is due on {due_date}."
+    }
+
 def generate_bill_reminders(recurring_candidates, days_ahead=5):
     today = date.today()
     end_date = today + timedelta(days=days_ahead)
@@ -89,24 +426,158 @@ def generate_bill_reminders(recurring_candidates, days_ahead=5):
 
         # Only include if due within range
         if today <= due_date <= end_date:
-            reminders.append({
-                "name": item["name"],
-                "category": item["category"],
-                "amount": item["amount"],
-                "due_date": due_date.isoformat(),
-                "message": f"📅 Recurring payment: **{item['name']}** (${item['amount']}) is due on {due_date}."
-            })
+            reminders.append(_reminder(item, due_date))
 
     # Sort reminders by due date
     reminders.sort(key=lambda r: r["due_date"])
     return reminders   
 
+
+def _lapsed(item, as_of):
+    """True when a series missed a whole period: its next_due is more than one cadence period before as_of."""
+    period = CADENCES[item.get("cadence", "monthly")][0]
+    return (as_of - item["next_due"]).days > period
+
+
+class ReminderSchedule:
+    """
+    Sorted occurrence index over recurring series, for "what is due between A and B"
+    across long horizons. Each candidate (as returned by the detectors) is projected
+    forward from its next_due by its cadence (monthly when it has none) on its
+    billing_day (next_due's day when it has none), clamped to each short month
+    separately, so a bill on the 31st is due Feb 28 and then Mar 31 again. Series
+    whose next_due is more than one period before as_of (default today) have lapsed,
+    e.g. a cancelled subscription, and are left out. Occurrences are generated with numpy
+    up to a horizon that doubles on demand, so a window query is two binary searches
+    plus the rows it returns.
+    """
+
+    def __init__(self, recurring_candidates, horizon_days=365, as_of=None):
+        as_of = as_of or date.today()
+        self.series = [item for item in recurring_candidates if not _lapsed(item, as_of)]
+        self._names = np.array([item["name"] for item in self.series], dtype=object)
+        self._categories = np.array([item["category"] for item in self.series], dtype=object)
+        self._amounts = np.array([item["amount"] for item in self.series], dtype=float)
+        self._start = min((item["next_due"] for item in self.series), default=date.today())
+        self._horizon = None
+        self._dates = np.array([], dtype="datetime64[D]")
+        self._series_ids = np.array([], dtype=np.int64)
+        self._extend(np.datetime64(self._start, "D") + np.timedelta64(horizon_days, "D"))
+
+    def _project(self, cadence, ids, horizon):
+        """(dates, series ids) for every occurrence of the given series up to horizon."""
+        anchors = np.array([self.series[i]["next_due"] for i in ids], dtype="datetime64[D]")
+        if cadence in ("weekly", "biweekly"):
+            period = CADENCES[cadence][0]
+            steps = np.arange((horizon - anchors.min()).astype(np.int64) // period + 1)
+            dates = anchors[:, None] + (steps * period).astype("timedelta64[D]")[None, :]
+        else:
+            months_per_step = 12 if cadence == "annual" else 1
+            first_months = anchors.astype("datetime64[M]")
+            # next_due may already be clamped (Feb 28), so project from the series' own billing day
+            billing_days = np.array([self.series[i].get("billing_day") or self.series[i]["next_due"].day for i in ids])
+            n_steps = (horizon.astype("datetime64[M]") - first_months.min()).astype(np.int64) // months_per_step + 1
+            months = first_months[:, None] + (np.arange(n_steps) * months_per_step).astype("timedelta64[M]")[None, :]
+            month_starts = months.astype("datetime64[D]")
+            month_lengths = ((months + 1).astype("datetime64[D]") - month_starts).astype(np.int64)
+            dates = month_starts + (np.minimum(billing_days[:, None], month_lengths) - 1).astype("timedelta64[D]")
+
+        ids = np.broadcast_to(np.asarray(ids)[:, None], dates.shape)
+        within = (dates >= anchors[:, None]) & (dates <= horizon)
+        return dates[within], ids[within]
+
+    def _extend(self, horizon):
+        """Regenerate the index to cover everything due up to horizon."""
+        by_cadence = defaultdict(list)
+        for i, item in enumerate(self.series):
+            by_cadence[item.get("cadence", "monthly")].append(i)
+
+        parts = [self._project(cadence, ids, horizon) for cadence, ids in by_cadence.items()]
+        dates = np.concatenate([d for d, _ in parts]) if parts else np.array([], dtype="datetime64[D]")
+        series_ids = np.concatenate([i for _, i in parts]) if parts else np.array([], dtype=np.int64)
+        order = np.lexsort((series_ids, dates))
+        self._dates = dates[order]
+        self._series_ids = series_ids[order]
+        self._horizon = horizon
+
+    def due_between(self, start, end):
+        """Reminder dicts (same shape as generate_bill_reminders) for every occurrence in [start, end]."""
+        lo, hi = self._window(start, end)
+        return [
+            _reminder(self.series[series_id], due)
+            for due, series_id in zip(self._dates[lo:hi].tolist(), self._series_ids[lo:hi].tolist())
+        ]
+
+    def due_frame(self, start, end):
+        """The same occurrences as a DataFrame (due_date, name, category, amount), built without a Python loop."""
+        lo, hi = self._window(start, end)
+        series_ids = self._series_ids[lo:hi]
+        return pd.DataFrame({
+            "due_date": self._dates[lo:hi],
+            "name": self._names[series_ids],
+            "category": self._categories[series_ids],
+            "amount": self._amounts[series_ids],
+        })
+
+    def count_between(self, start, end):
+        lo, hi = self._window(start, end)
+        return hi - lo
+
+    def _window(self, start, end):
+        start, end = np.datetime64(start, "D"), np.datetime64(end, "D")
+        if end > self._horizon:
+            # Double the horizon past the request so scrolling further doesn't rebuild every time
+            self._extend(end + (end - np.datetime64(self._start, "D")))
+        return (int(np.searchsorted(self._dates, start, side="left")),
+                int(np.searchsorted(self._dates, end, side="right")))
+
 from openai import OpenAI
-from backend.utils.config import Config
+from backend.utils.merchant_cache import get_merchant_cache
+
+IMPORTANCE_CACHE = "merchant_importance"
+
+
+def _merchant_key(name):
+    # Names made only of digits/symbols normalize to "", so fall back to the raw name
+    return normalize_name(name) or name.strip().lower()
 
-def filter_important_recurring(recurring_candidates):
-    client = OpenAI(api_key=Config.get_openai_api_key())
 
+def filter_important_recurring(recurring_candidates, cache=None):
+    """
+    Keep the recurring candidates that are real obligations (rent, utilities,
+    subscriptions...). Answers are cached per normalized merchant name, so only
+    merchants never seen before go to the model, all in one prompt.
+    """
+    cache = cache if cache is not None else get_merchant_cache(IMPORTANCE_CACHE)
+
+    importance = {}
+    unseen = []
+    for r in recurring_candidates:
+        merchant = _merchant_key(r["name"])
+        if merchant in importance:
+            continue
+        known = cache.get(merchant)
+        if known is None:
+            unseen.append(r)
+            importance[merchant] = None
+        else:
+            importance[merchant] = known
+
+    if unseen:
+        asked = _ask_important_names(unseen)
+        if asked is None:
+            # fallback if error: keep unseen merchants, but don't remember the guess
+            importance.update({_merchant_key(r["name"]): True for r in unseen})
+        else:
+            learned = {_merchant_key(r["name"]): r["name"].lower() in asked for r in unseen}
+            importance.update(learned)
+            cache.set_many(learned)  # The only write: all-hit visits leave the file alone
+
+    return [tx for tx in recurring_candidates if importance[_merchant_key(tx["name"])]]
+
+
+def _ask_important_names(recurring_candidates):
+    """One model call for a batch of merchants; returns the lower-cased important names, or None on failure."""
     # Format the recurring transactions as plain text
     formatted_list = "\n".join(
         f"- {r['name']} | ${r['amount']} | Due: {r['next_due']}"
@@ -134,6 +605,7 @@ Here is the list to review:
 """
 
     try:
+        client = OpenAI(api_key=Config.get_openai_api_key())
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
@@ -150,13 +622,8 @@ Here is the list to review:
                 name = line[2:].strip()
                 if name:
                     important_names.add(name.lower())
-
-        # Match back against original recurring candidates
-        return [
-            tx for tx in recurring_candidates
-            if tx["name"].lower() in important_names
-        ]
+        return important_names
 
     except Exception as e:
         print("⚠️ AI filtering failed:", e)
-        return recurring_candidates  # fallback if error
+        return None
@@ -0,0 +1,146 @@
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from backend.utils.config import Config
+from backend.utils.files import atomic_write
+from backend.utils.transaction import UNCATEGORIZED, to_transactions
+
+# Columns kept in the cache; category is flattened to its first entry
+SCHEMA = pa.schema([
+    ("transaction_id", pa.string()),
+    ("date", pa.timestamp("ms")),
+    ("amount", pa.float64()),
+    ("category", pa.string()),
+    ("account_id", pa.string()),
+    ("name", pa.string()),
+    ("source", pa.string()),
+])
+PARTITION_PREFIX = "year_month="
+PARTITION_FILE = "part-0.parquet"
+
+_write_lock = threading.Lock()
+
+
+def get_cache_dir(user_id):
+    """Per-user dataset root: <data dir>/parquet/<user_id>/year_month=YYYY-MM/part-0.parquet"""
+    return Config.get_data_dir() / "parquet" / user_id
+
+
+def _partition_path(user_id, year_month):
+    return get_cache_dir(user_id) / f"{PARTITION_PREFIX}{year_month}" / PARTITION_FILE
+
+
+def _to_table(transactions):
+    rows = []
+    for record in to_transactions(transactions):
+        if not record.transaction_id or not record.day:
+            continue
+        rows.append({
+            "transaction_id": record.transaction_id,
+            "date": pd.Timestamp(record.date),
+            "amount": record.amount,
+            "category": record.category or UNCATEGORIZED,
+            "account_id": record.account_id,
+            "name": record.name,
+            "source": record.source,
+        })
+    return pa.Table.from_pylist(rows, schema=SCHEMA)
+
+
+def _write_partition(path, table):
+    atomic_write(path, lambda tmp_path: pq.write_table(table, tmp_path))
+
+
+def list_months(user_id):
+    """Months present in the cache, from the partition directory names alone."""
+    root = get_cache_dir(user_id)
+    if not root.exists():
+        return []
+    return sorted(
+        entry.name[len(PARTITION_PREFIX):]
+        for entry in root.iterdir()
+        if entry.name.startswith(PARTITION_PREFIX) and (entry / PARTITION_FILE).exists()
+    )
+
+
+def cache_version(user_id):
+    """
+    Cheap change signal for a user's cache, from file metadata only: every write swaps
+    in a new partition file, so (month, inode, mtime, size) per partition moves with it.
+    """
+    version = []
+    for year_month in list_months(user_id):
+        stat = _partition_path(user_id, year_month).stat()
+        version.append((year_month, stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def write_transactions(user_id, transactions):
+    """
+    Upsert transactions into their month partitions. Rows already cached with the
+    same transaction_id are replaced wherever they are, so a transaction whose date
+    moved to another month leaves no copy behind. Returns the number of rows written.
+    """
+    table = _to_table(transactions)
+    if table.num_rows == 0:
+        return 0
+
+    months = pc.strftime(table["date"], format="%Y-%m")
+    incoming = set(pc.unique(months).to_pylist())
+    with _write_lock:
+        for year_month in sorted(incoming | set(list_months(user_id))):
+            rows = table.filter(pc.equal(months, year_month)) if year_month in incoming else None
+            path = _partition_path(user_id, year_month)
+            if path.exists():
+                existing = pq.read_table(path, memory_map=True)
+                stale = pc.is_in(existing["transaction_id"], value_set=table["transaction_id"])
+                if rows is None and not pc.any(stale).as_py():
+                    continue  # Nothing incoming and no old copies here: leave the file alone
+                kept = existing.filter(pc.invert(stale))
+                rows = kept if rows is None else pa.concat_tables([kept, rows])
+            _write_partition(path, rows.sort_by("date"))
+    return table.num_rows
+
+
+def remove_transactions(user_id, transaction_ids):
+    """Drop transactions by id from whichever partitions hold them."""
+    ids = pa.array([tx["transaction_id"] if isinstance(tx, dict) else tx for tx in transaction_ids], pa.string())
+    if len(ids) == 0:
+        return 0
+
+    removed = 0
+    with _write_lock:
+        for year_month in list_months(user_id):
+            path = _partition_path(user_id, year_month)
+            existing = pq.read_table(path, memory_map=True)
+            hits = pc.is_in(existing["transaction_id"], value_set=ids)
+            hit_count = pc.sum(hits).as_py() or 0
+            if hit_count:
+                _write_partition(path, existing.filter(pc.invert(hits)))
+                removed += hit_count
+    return removed
+
+
+def read_transactions(user_id, columns=("date", "amount", "category", "account_id"), months=None, account_ids=None):
+    """
+    Load only the requested columns and month partitions as a DataFrame.
+    Files are memory-mapped, so untouched columns are never read into memory.
+    """
+    columns = list(columns)
+    read_columns = columns if account_ids is None or "account_id" in columns else columns + ["account_id"]
+    available = list_months(user_id)
+    wanted_months = available if months is None else sorted(set(months) & set(available))
+
+    tables = [
+        pq.read_table(_partition_path(user_id, year_month), columns=read_columns, memory_map=True)
+        for year_month in wanted_months
+    ]
+    if not tables:
+        return SCHEMA.empty_table().select(columns).to_pandas()
+
+    table = pa.concat_tables(tables)
+    if account_ids is not None:
+        table = table.filter(pc.is_in(table["account_id"], value_set=pa.array(list(account_ids), pa.string())))
+    return table.select(columns).to_pandas()
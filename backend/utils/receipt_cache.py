@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from PIL import Image
+from backend.utils.config import Config
+from backend.utils.files import atomic_write
+
+DEFAULT_MAX_BYTES = int(float(os.getenv("RECEIPT_CACHE_MAX_MB", "50")) * 1024 * 1024)
+
+
+def receipt_key(image):
+    """
+    SHA-256 of the decoded RGB pixels plus dimensions, so the same receipt uploaded
+    again, under another name or re-saved losslessly, maps to one key.
+    File-like inputs are rewound afterwards so the caller can read them again.
+    """
+    with Image.open(image) as img:
+        rgb = img.convert("RGB")
+        digest = hashlib.sha256(f"{rgb.width}x{rgb.height}:".encode())
+        digest.update(rgb.tobytes())
+    if hasattr(image, "seek"):
+        image.seek(0)
+    return digest.hexdigest()
+
+
+class ReceiptCache:
+    """
+    Disk cache of processed receipts keyed by receipt_key: one JSON file per receipt
+    holding the extracted text, parsed fields and category. Files are touched on every
+    hit and the least recently used ones are deleted once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = self._load()
+        self.total_bytes = sum(self._sizes.values())
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return self.directory / f"{key}.json"
+
+    def _load(self):
+        # Rebuild the LRU order from file modification times
+        if not self.directory.exists():
+            return OrderedDict()
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        return OrderedDict((key, size) for _, key, size in sorted(entries))
+
+    def get(self, key):
+        """Cached result for key, or None. Marks it recently used."""
+        with self._lock:
+            if key not in self._sizes:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    result = json.load(f)
+                os.utime(path)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Dropping unreadable receipt cache entry {path}: {e}")
+                self._forget(key)
+                self.misses += 1
+                return None
+            self._sizes.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def set(self, key, result):
+        """Store a result, then evict least recently used entries beyond max_bytes."""
+        payload = json.dumps(result).encode("utf-8")
+        with self._lock:
+            atomic_write(self._path(key), lambda tmp_path: tmp_path.write_bytes(payload))
+
+            self.total_bytes -= self._sizes.pop(key, 0)
+            self._sizes[key] = len(payload)
+            self.total_bytes += len(payload)
+            while self.total_bytes > self.max_bytes and len(self._sizes) > 1:
+                self._forget(next(iter(self._sizes)))
+
+    def _forget(self, key):
+        self.total_bytes -= self._sizes.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        return {"entries": len(self._sizes), "bytes": self.total_bytes, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def __contains__(self, key):
+        return key in self._sizes
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_receipt_cache():
+    """Process-wide cache at <data dir>/receipt_cache/, created on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ReceiptCache(Config.get_data_dir() / "receipt_cache")
+        return _cache
@@ -1,4 +1,3 @@
-from PIL import Image
 from datetime import datetime
 import re
 import os
@@ -7,21 +6,42 @@ import streamlit as st
 from openai import OpenAI
 import base64
 import requests
-from io import BytesIO
 from backend.utils.config import Config
 from frontend.components.AccountSelector import add_bank_to_state
+from backend.utils.transaction_store import get_transaction_store
+from backend.utils.transaction_sync import mark_transactions_changed
+from backend.utils import parquet_cache
+from backend.utils.receipt_cache import get_receipt_cache, receipt_key
+from backend.utils.image_preprocess import preprocess_receipt
+from backend.utils.categorizer import (
+    CONFIDENCE_THRESHOLD,
+    MODEL_CONFIDENCE_THRESHOLD,
+    MODEL_MIN_EXAMPLES,
+    get_category_model,
+    get_rule_categorizer,
+)
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dateutil import parser
 
 # Get OpenAI API key
 api_key = Config.get_openai_api_key()
 
-def extract_text_from_image(image) -> str:
+# Receipts processed at once by process_receipts (each one is a vision call plus a chat call)
+RECEIPT_WORKERS = int(os.getenv("RECEIPT_WORKERS", "4"))
+
+VISION_ERROR_PREFIX = "Error with OpenAI Vision API"
+
+def extract_text_from_image(image, stats=None, **preprocess_options) -> str:
+    """
+    Ask the vision model for vendor, total and date. The photo is cropped, downscaled
+    and re-encoded first (preprocess_options are passed to preprocess_receipt); pass a
+    dict as stats to receive its per-stage timings and byte counts.
+    """
     client = OpenAI()
-    img = Image.open(image).convert("RGB")
-    buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    img_bytes = buffered.getvalue()
+    img_bytes, mime_type, preprocess_stats = preprocess_receipt(image, **preprocess_options)
+    if stats is not None:
+        stats.update(preprocess_stats)
     encoded_image = base64.b64encode(img_bytes).decode("utf-8")
 
     try:
@@ -34,7 +54,7 @@ def extract_text_from_image(image) -> str:
                         {"type": "text", "text": "From this receipt, extract only the vendor/store name. "
                     "Do not describe or summarize anything else. Just give the store name as plain text. Also give the total amount and date. Give everything in order, don't mention a label, give direct information"
            },
-                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{encoded_image}"}}
+                        {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{encoded_image}"}}
                     ]
                 }
             ],
@@ -42,9 +62,12 @@ def extract_text_from_image(image) -> str:
         )
         return response.choices[0].message.content
     except Exception as e:
-        return f"Error with OpenAI Vision API: {str(e)}"
+        return f"{VISION_ERROR_PREFIX}: {str(e)}"
+
+RECEIPT_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
-def extract_receipt_fields(text: str):
+def extract_receipt_fields(text: str, default_to_today=True):
+    """(vendor, amount, date) from the vision text; date is today when none is found, or None without default_to_today."""
     lines = text.split("\n")
     vendor = lines[0].strip() if lines else "Unknown Vendor"
 
@@ -118,14 +141,25 @@ def extract_receipt_fields(text: str):
 
     # If no date found or parsing failed, use today's date
     if not parsed_date:
+        if not default_to_today:
+            return vendor, amount, None
         parsed_date = datetime.now()
 
     # Format date consistently for the application
-    formatted_date = parsed_date.strftime("%a, %d %b %Y %H:%M:%S GMT")
+    formatted_date = parsed_date.strftime(RECEIPT_DATE_FORMAT)
     return vendor, amount, formatted_date
 
 
 def categorize_transaction(vendor: str, text: str):
+    # Known merchants are categorized locally; only unfamiliar ones cost an LLM call
+    category, confidence, _ = get_rule_categorizer().categorize(vendor)
+    if confidence >= CONFIDENCE_THRESHOLD:
+        return category
+    model = get_category_model()
+    if len(model) >= MODEL_MIN_EXAMPLES:
+        prediction = model.predict([vendor]).iloc[0]
+        if prediction["confidence"] >= MODEL_CONFIDENCE_THRESHOLD:
+            return prediction["category"]
     try:
         client = OpenAI()
         prompt = f"""
@@ -146,6 +180,62 @@ def categorize_transaction(vendor: str, text: str):
     except:
         return "Uncategorized"
 
+
+def process_receipt(image, cache=None):
+    """
+    Full pipeline for one receipt image: vision text → vendor/amount/date → category.
+    The vision text and the fields parsed from it are cached by image content, so
+    re-uploading or re-scanning a receipt skips the vision call. The category and the
+    today fallback for an undated receipt are worked out again on every call, so they
+    follow the user's corrections and the current date. Vision API failures are never cached.
+    """
+    if cache is None:
+        cache = get_receipt_cache()
+    key = receipt_key(image)
+    fields = cache.get(key)
+    if fields is None or "category" in fields:  # Entries from before categories stopped being cached
+        text = extract_text_from_image(image)
+        vendor, amount, tx_date = extract_receipt_fields(text, default_to_today=False)
+        fields = {"text": text, "vendor": vendor, "amount": amount, "date": tx_date}
+        if not text.startswith(VISION_ERROR_PREFIX):
+            cache.set(key, fields)
+
+    return {
+        "text": fields["text"],
+        "vendor": fields["vendor"],
+        "amount": fields["amount"],
+        "date": fields["date"] or datetime.now().strftime(RECEIPT_DATE_FORMAT),
+        "category": categorize_transaction(fields["vendor"], fields["text"])
+    }
+
+
+def process_receipts(images, max_workers=None, on_progress=None):
+    """
+    Run process_receipt for many images on a bounded thread pool (RECEIPT_WORKERS by
+    default). Returns results in input order; an image that fails gets {"error": ...}
+    instead of stopping the batch. on_progress(done, total, index, result) is called
+    from the calling thread as each receipt finishes, so it can safely update the UI.
+    """
+    images = list(images)
+    results = [None] * len(images)
+    if not images:
+        return results
+
+    workers = max(1, min(max_workers or RECEIPT_WORKERS, len(images)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(process_receipt, image): index for index, image in enumerate(images)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                print(f"⚠️ Failed to process receipt {index}: {e}")
+                results[index] = {"error": str(e)}
+            if on_progress:
+                on_progress(done, len(images), index, results[index])
+    return results
+
+
 def append_to_csv(new_txn, csv_path="transactions.csv"):
     if os.path.exists(csv_path):
         df = pd.read_csv(csv_path)
@@ -226,6 +316,13 @@ def add_transaction_to_state(vendor, amount, date, text):
             st.session_state.duplicate_warning = True
             return None
 
+    # Persist so the receipt survives restarts
+    try:
+        get_transaction_store().upsert([transaction])
+        parquet_cache.write_transactions("demo-user-123", [transaction])
+    except Exception as e:
+        print(f"⚠️ Failed to persist receipt transaction: {e}")
+
     # Add transaction and sort by date
     st.session_state.transactions.append(transaction)
     st.session_state.transactions.sort(key=lambda x: x["date"], reverse=True)  # Sort newest first
@@ -234,6 +331,7 @@ def add_transaction_to_state(vendor, amount, date, text):
     if 'all_transactions' in st.session_state:
         st.session_state.all_transactions.append(transaction)
         st.session_state.all_transactions.sort(key=lambda x: x["date"], reverse=True)
+    mark_transactions_changed(st.session_state, upserted=[transaction])
     
     # Reset any cached data in session state to force refresh of views
     if 'chart_summary' in st.session_state:
@@ -253,6 +351,12 @@ def add_transaction_to_state(vendor, amount, date, text):
     return transaction_id
 
 def delete_receipt_transaction(transaction_id):
+    try:
+        get_transaction_store().delete([transaction_id])
+        parquet_cache.remove_transactions("demo-user-123", [transaction_id])
+    except Exception as e:
+        print(f"⚠️ Failed to delete persisted receipt transaction: {e}")
+
     # Remove from all_transactions
     if "all_transactions" in st.session_state:
         st.session_state.all_transactions = [
@@ -266,3 +370,4 @@ def delete_receipt_transaction(transaction_id):
             tx for tx in st.session_state.transactions
             if tx["transaction_id"] != transaction_id
         ]
+    mark_transactions_changed(st.session_state, removed=[transaction_id])
@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+from backend.utils.transaction import UNCATEGORIZED, Transaction
+from backend.utils.transaction_sync import transaction_changes_since
+
+EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+CELL_CHUNK = 1024  # Cell arrays grow this many cells at a time
+DIMENSIONS = ("date", "month", "category", "account_id", "source")
+
+
+class SpendingCube:
+    """
+    Spending totals pre-aggregated over (day, category, account_id, source) cells,
+    maintained incrementally as transactions are added, changed or removed.
+    Each transaction remembers the cell it landed in, so updates touch one cell;
+    roll-ups filter and group the cells, never the transactions.
+    Amounts are integer cents; signed amounts and absolute spend are kept side by side.
+    """
+
+    def __init__(self):
+        self._labels = {"category": [], "account_id": [], "source": []}  # dimension id → label
+        self._label_ids = {name: {} for name in self._labels}  # label → dimension id
+        self._cell_ids = {}  # (day, category id, account id, source id) → cell
+        self._dims = np.zeros((0, 4), dtype=np.int64)  # one row of dimension ids per cell
+        self._cents = np.zeros(0, dtype=np.int64)
+        self._abs_cents = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._members = {}  # transaction key → (cell, cents, Transaction record)
+        self._rollups = {}  # memoized roll-ups, dropped on any update
+
+    def __len__(self):
+        return len(self._members)
+
+    @property
+    def n_cells(self):
+        return len(self._cell_ids)
+
+    # --- storage helpers ---
+    def _label_id(self, dimension, label):
+        ids = self._label_ids[dimension]
+        label_id = ids.get(label)
+        if label_id is None:
+            label_id = ids[label] = len(self._labels[dimension])
+            self._labels[dimension].append(label)
+        return label_id
+
+    def _cell(self, record):
+        key = (
+            record.day,
+            self._label_id("category", record.category or UNCATEGORIZED),
+            self._label_id("account_id", record.account_id),
+            self._label_id("source", record.source),
+        )
+        cell = self._cell_ids.get(key)
+        if cell is None:
+            cell = self._cell_ids[key] = len(self._cell_ids)
+            if cell >= len(self._cents):
+                self._dims = np.concatenate([self._dims, np.zeros((CELL_CHUNK, 4), dtype=np.int64)])
+                for name in ("_cents", "_abs_cents", "_counts"):
+                    setattr(self, name, np.concatenate([getattr(self, name), np.zeros(CELL_CHUNK, dtype=np.int64)]))
+            self._dims[cell] = key
+        return cell
+
+    @staticmethod
+    def _key(tx):
+        # Transactions without an id (e.g. CSV imports) are tracked by object identity
+        transaction_id = tx.transaction_id if isinstance(tx, Transaction) else tx.get("transaction_id")
+        return transaction_id or id(tx)
+
+    def _apply(self, cell, cents, sign):
+        self._rollups.clear()
+        self._cents[cell] += sign * cents
+        self._abs_cents[cell] += sign * abs(cents)
+        self._counts[cell] += sign
+
+    # --- updates ---
+    def add(self, transactions):
+        """Add or replace transactions (dicts or Transactions) by id. Rows without a date are skipped."""
+        for tx in transactions:
+            self._put(self._key(tx), tx if isinstance(tx, Transaction) else Transaction.from_dict(tx))
+
+    def _put(self, key, record):
+        self._discard(key)
+        if not record.day:
+            return
+        cell = self._cell(record)
+        self._apply(cell, record.amount_cents, 1)
+        self._members[key] = (cell, record.amount_cents, record)
+
+    def _discard(self, key):
+        member = self._members.pop(key, None)
+        if member is not None:
+            self._apply(member[0], member[1], -1)
+
+    def remove(self, transaction_ids):
+        """Remove transactions by id. Accepts ids or Plaid's {'transaction_id': ...} dicts."""
+        for tx in transaction_ids:
+            self._discard(tx["transaction_id"] if isinstance(tx, dict) else tx)
+
+    def sync(self, transactions):
+        """
+        Make the cube hold exactly these transactions. Each one is compared by content
+        with the record already held, so edits made in place are picked up, and a
+        resync after a small change only touches the added, changed and removed rows.
+        Returns the number of rows added or replaced.
+        """
+        entries = {
+            self._key(tx): tx if isinstance(tx, Transaction) else Transaction.from_dict(tx)
+            for tx in transactions
+        }
+        for key in set(self._members) - set(entries):
+            self._discard(key)
+        changed = 0
+        for key, record in entries.items():
+            member = self._members.get(key)
+            if member is None and not record.day:
+                continue  # Undated: never held
+            if member is None or member[2] != record:
+                self._put(key, record)
+                changed += 1
+        return changed
+
+    # --- roll-ups ---
+    def _ids(self, dimension, labels):
+        ids = self._label_ids[dimension]
+        return [ids[label] for label in labels if label in ids]
+
+    def rollup(self, by=("category",), account_ids=None, sources=None, start=None, end=None):
+        """
+        Totals grouped by any of DIMENSIONS ("date" is the day, "month" is 'YYYY-MM'),
+        optionally limited to an inclusive date range and to cells whose account is in
+        account_ids or whose source is in sources (like TransactionStore.query).
+        Returns a DataFrame with columns by + amount, abs_amount and count; results are
+        memoized until the next update.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        unknown = set(by) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"❌ Unknown cube dimension(s): {sorted(unknown)}")
+
+        # Reruns with unchanged data get the memoized totals (a copy, so callers may edit it)
+        memo_key = (tuple(by), None if account_ids is None else tuple(account_ids),
+                    None if sources is None else tuple(sources), str(start), str(end))
+        if memo_key not in self._rollups:
+            self._rollups[memo_key] = self._rollup(by, account_ids, sources, start, end)
+        return self._rollups[memo_key].copy()
+
+    def _rollup(self, by, account_ids, sources, start, end):
+        n = self.n_cells
+        dims, counts = self._dims[:n], self._counts[:n]
+        keep = counts > 0
+        if account_ids is not None or sources is not None:
+            owner = np.zeros(n, dtype=bool)
+            if account_ids is not None:
+                owner |= np.isin(dims[:, 2], self._ids("account_id", account_ids))
+            if sources is not None:
+                owner |= np.isin(dims[:, 3], self._ids("source", sources))
+            keep &= owner
+        if start is not None:
+            keep &= dims[:, 0] >= pd.Timestamp(start).toordinal()
+        if end is not None:
+            keep &= dims[:, 0] <= pd.Timestamp(end).toordinal()
+        cells = np.flatnonzero(keep)
+
+        # Group the selected cells on integer codes, ordered like a sorted groupby
+        group_keys = np.zeros(len(cells), dtype=np.int64)
+        decoders = []
+        for dimension in by:
+            if dimension in ("date", "month"):
+                days = (dims[cells, 0] - EPOCH_ORDINAL).astype("datetime64[D]")
+                values = days.astype("datetime64[M]").astype(np.int64) if dimension == "month" else days.astype(np.int64)
+            else:
+                labels = self._labels[dimension]
+                # Rank labels by their sorted order (None first) so codes sort like the labels
+                order = sorted(range(len(labels)), key=lambda i: (labels[i] is not None, labels[i] or ""))
+                rank = np.empty(len(labels), dtype=np.int64)
+                rank[order] = np.arange(len(labels))
+                values = rank[dims[cells, DIMENSIONS.index(dimension) - 1]]
+            uniques, codes = np.unique(values, return_inverse=True)
+            group_keys = group_keys * len(uniques) + codes
+            decoders.append((dimension, uniques))
+
+        groups, inverse = np.unique(group_keys, return_inverse=True)
+        totals = {}
+        remaining = groups
+        for dimension, uniques in reversed(decoders):
+            remaining, codes = np.divmod(remaining, len(uniques))
+            values = uniques[codes]
+            if dimension == "date":
+                totals[dimension] = (values.astype("datetime64[D]")).astype("datetime64[ns]")
+            elif dimension == "month":
+                totals[dimension] = np.datetime_as_string(values.astype("datetime64[M]"), unit="M")
+            else:
+                labels = self._labels[dimension]
+                by_rank = sorted(labels, key=lambda label: (label is not None, label or ""))
+                totals[dimension] = np.asarray(by_rank, dtype=object)[values]
+
+        result = pd.DataFrame({dimension: totals[dimension] for dimension in by})
+        result["amount"] = np.bincount(inverse, weights=self._cents[cells], minlength=len(groups)) / 100
+        result["abs_amount"] = np.bincount(inverse, weights=self._abs_cents[cells], minlength=len(groups)) / 100
+        result["count"] = np.bincount(inverse, weights=counts[cells], minlength=len(groups)).astype(np.int64)
+        return result
+
+
+def get_spending_cube(state, transactions, key="spending_cube"):
+    """
+    The cube kept in state (e.g. st.session_state) under key, brought up to date with
+    transactions whenever state["transactions_version"] moved (see
+    transaction_sync.mark_transactions_changed): logged deltas are replayed, and a
+    reset or a gap in the log falls back to a full content-based sync.
+    """
+    cube = state.get(key)
+    version = state.get("transactions_version", 0)
+    if cube is not None and state.get(f"{key}_version") == version:
+        return cube
+
+    changes = None if cube is None else transaction_changes_since(state, state.get(f"{key}_version", -1))
+    if cube is None:
+        cube = state[key] = SpendingCube()
+    if changes is None:
+        cube.sync(transactions)
+    else:
+        for upserted, removed in changes:
+            cube.remove(removed)
+            cube.add(upserted)
+    state[f"{key}_version"] = version
+    return cube
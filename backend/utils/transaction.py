@@ -0,0 +1,135 @@
+import sys
+from datetime import date
+from backend.utils.dates import parse_date
+
+RECEIPT_SOURCE = "manual_upload"
+RECEIPT_ACCOUNT_NAME = "Receipt Transactions"
+UNCATEGORIZED = "Uncategorized"
+
+
+def intern_text(value):
+    """sys.intern for non-empty strings, so repeated accounts/categories/merchants share one object."""
+    return sys.intern(value) if isinstance(value, str) and value else None
+
+
+def to_cents(amount):
+    """Dollar amount (number or numeric string) to integer cents; 0 when it can't be read."""
+    try:
+        return round(float(amount) * 100)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def to_day(value):
+    """Date value in any format we see to a proleptic Gregorian ordinal (date.toordinal); None if unparseable."""
+    parsed = parse_date(value)
+    return parsed.toordinal() if parsed else None
+
+
+def first_category(category):
+    """Plaid and receipts carry category as a list; keep its first entry."""
+    if isinstance(category, (list, tuple)):
+        category = category[0] if category else None
+    return category if isinstance(category, str) and category else None
+
+
+class Transaction:
+    """
+    Canonical compact transaction record. Amounts are integer cents, the date is a
+    day ordinal, and account/category/merchant/source strings are interned, so a
+    large history costs a fraction of the Plaid dicts it came from.
+    """
+    __slots__ = ("transaction_id", "account_id", "institution_id", "day", "name", "merchant",
+                 "amount_cents", "category", "source")
+
+    def __init__(self, transaction_id, account_id, day, name, amount_cents, category=None,
+                 merchant=None, source=None, institution_id=None):
+        self.transaction_id = transaction_id
+        self.account_id = intern_text(account_id)
+        self.institution_id = intern_text(institution_id)
+        self.day = day
+        self.name = intern_text(name)
+        self.merchant = intern_text(merchant) or self.name
+        self.amount_cents = amount_cents
+        self.category = intern_text(category)
+        self.source = intern_text(source)
+
+    @classmethod
+    def from_plaid(cls, tx, source="plaid"):
+        """From a Plaid transaction dict (to_dict() or its JSON round trip)."""
+        return cls(
+            transaction_id=tx.get("transaction_id"),
+            account_id=tx.get("account_id"),
+            day=to_day(tx.get("date")),
+            name=tx.get("name"),
+            amount_cents=to_cents(tx.get("amount")),
+            category=first_category(tx.get("category")),
+            merchant=tx.get("merchant_name"),
+            source=tx.get("source") or source,
+            institution_id=tx.get("institution_id"),
+        )
+
+    @classmethod
+    def from_receipt(cls, tx):
+        """From a transaction dict built by the receipt pipeline (receipt_parser.save_transaction)."""
+        return cls(
+            transaction_id=tx.get("transaction_id"),
+            account_id=tx.get("account_id") or RECEIPT_SOURCE,
+            day=to_day(tx.get("date")),
+            name=tx.get("name") or tx.get("merchant_name"),
+            amount_cents=to_cents(tx.get("amount")),
+            category=first_category(tx.get("category")),
+            merchant=tx.get("merchant_name"),
+            source=tx.get("source") or RECEIPT_SOURCE,
+        )
+
+    @classmethod
+    def from_dict(cls, tx):
+        """From any transaction dict in the app, picking the converter by its source."""
+        if tx.get("source") == RECEIPT_SOURCE:
+            return cls.from_receipt(tx)
+        return cls.from_plaid(tx, source=None)
+
+    @property
+    def amount(self):
+        return self.amount_cents / 100
+
+    @property
+    def date(self):
+        return date.fromordinal(self.day) if self.day else None
+
+    def to_dict(self):
+        """The dict shape the views read: ISO date, float amount and a one-item category list."""
+        tx = {
+            "transaction_id": self.transaction_id,
+            "account_id": self.account_id,
+            "date": self.date.isoformat() if self.day else None,
+            "name": self.name,
+            "merchant_name": self.merchant,
+            "amount": self.amount,
+            "category": [self.category or UNCATEGORIZED],
+            "source": self.source,
+        }
+        if self.institution_id:
+            tx["institution_id"] = self.institution_id
+        if self.source == RECEIPT_SOURCE:
+            tx["account_name"] = RECEIPT_ACCOUNT_NAME
+        return tx
+
+    def _key(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, Transaction) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return (f"Transaction({self.transaction_id!r}, {self.date}, {self.name!r}, "
+                f"{self.amount:.2f}, {self.category!r}, account={self.account_id!r})")
+
+
+def to_transactions(records):
+    """Convert transaction dicts (Plaid or receipts) to Transactions; Transactions pass through."""
+    return [tx if isinstance(tx, Transaction) else Transaction.from_dict(tx) for tx in records]
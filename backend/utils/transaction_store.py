@@ -0,0 +1,152 @@
+import json
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from backend.utils.config import Config
+from backend.utils.dates import GMT_FORMAT, parse_date
+from backend.utils.transaction import Transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id TEXT PRIMARY KEY,  -- primary key doubles as the transaction_id index
+    account_id     TEXT,
+    institution_id TEXT,
+    date           TEXT,              -- ISO YYYY-MM-DD so range scans use the index
+    name           TEXT,
+    merchant       TEXT,
+    amount         REAL,
+    category       TEXT,
+    source         TEXT,
+    payload        TEXT NOT NULL      -- the full transaction dict as JSON
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions (account_id, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_merchant_amount ON transactions (merchant, amount);
+"""
+
+def to_iso_date(value):
+    """Normalize the date formats we see (date objects, ISO, Plaid/GMT, receipts) to YYYY-MM-DD."""
+    parsed = parse_date(value)
+    return parsed.isoformat() if parsed else None
+
+
+def _json_default(value):
+    # Serialize dates the same way Flask's jsonify does, so stored rows look like API rows
+    if isinstance(value, (date, datetime)):
+        return value.strftime(GMT_FORMAT)
+    return str(value)
+
+
+class TransactionStore:
+    """
+    SQLite-backed transaction store shared by the Flask backend and the Streamlit views.
+    Runs in WAL mode so the backend can write while the frontend reads, and keeps one
+    connection per thread since sqlite3 connections are not shareable across threads.
+    The views render from the session list, which query() hydrates once per session;
+    they don't query per page, since the session also holds rows the store never sees
+    (e.g. CSV imports without a transaction_id).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_for(tx):
+        record = Transaction.from_dict(tx)
+        return (
+            tx["transaction_id"],
+            record.account_id,
+            record.institution_id,
+            record.date.isoformat() if record.day else None,
+            record.name,
+            record.merchant,
+            record.amount,
+            record.category,
+            tx.get("source"),
+            json.dumps(tx, default=_json_default),
+        )
+
+    def upsert(self, transactions):
+        """Insert or replace transactions by transaction_id. Rows without an id are skipped."""
+        rows = [self._row_for(tx) for tx in transactions if tx.get("transaction_id")]
+        if not rows:
+            return 0
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO transactions "
+                "(transaction_id, account_id, institution_id, date, name, merchant, amount, category, source, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def delete(self, transaction_ids):
+        """Delete transactions by id. Accepts ids or Plaid's {'transaction_id': ...} dicts."""
+        ids = [(tx["transaction_id"] if isinstance(tx, dict) else tx,) for tx in transaction_ids]
+        if not ids:
+            return 0
+        conn = self._connect()
+        with conn:
+            conn.executemany("DELETE FROM transactions WHERE transaction_id = ?", ids)
+        return len(ids)
+
+    def query(self, account_ids=None, start_date=None, end_date=None, sources=None):
+        """
+        Return transaction dicts, newest first, for the requested slice.
+        Rows match if their account is in account_ids or their source is in sources;
+        start_date / end_date are inclusive and accept anything to_iso_date understands.
+        """
+        clauses, params = [], []
+
+        owner_clauses = []
+        if account_ids is not None:
+            owner_clauses.append(f"account_id IN ({', '.join('?' for _ in account_ids)})" if account_ids else "0")
+            params.extend(account_ids)
+        if sources:
+            owner_clauses.append(f"source IN ({', '.join('?' for _ in sources)})")
+            params.extend(sources)
+        if owner_clauses:
+            clauses.append("(" + " OR ".join(owner_clauses) + ")")
+
+        if start_date is not None:
+            clauses.append("date >= ?")
+            params.append(to_iso_date(start_date))
+        if end_date is not None:
+            clauses.append("date <= ?")
+            params.append(to_iso_date(end_date))
+
+        sql = "SELECT payload FROM transactions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY date DESC, transaction_id"
+
+        return [json.loads(payload) for (payload,) in self._connect().execute(sql, params)]
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_transaction_store():
+    """Return the process-wide store at <data dir>/transactions.db, creating it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TransactionStore(Config.get_data_dir() / "transactions.db")
+        return _store
@@ -0,0 +1,108 @@
+import json
+import threading
+from pathlib import Path
+from backend.utils.files import write_json
+
+
+class CursorStore:
+    """
+    Persists Plaid /transactions/sync cursors per user and item so each refresh
+    only asks Plaid for what changed since the last successful sync.
+    Stored as a small JSON file: {"user_id": {"item_key": "cursor", ...}, ...}
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._cursors = self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not read cursor store {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        write_json(self.path, self._cursors)
+
+    def get(self, user_id, item_key):
+        with self._lock:
+            return self._cursors.get(user_id, {}).get(item_key)
+
+    def set(self, user_id, item_key, cursor):
+        with self._lock:
+            self._cursors.setdefault(user_id, {})[item_key] = cursor
+            self._save()
+
+    def reset(self, user_id, item_key=None):
+        """Forget one item's cursor, or every cursor for the user."""
+        with self._lock:
+            if item_key is None:
+                self._cursors.pop(user_id, None)
+            else:
+                self._cursors.get(user_id, {}).pop(item_key, None)
+            self._save()
+
+
+def apply_transaction_changes(transactions, added=(), modified=(), removed=()):
+    """
+    Apply a /transactions/sync delta to a list of transaction dicts.
+    Added and modified transactions are upserted by transaction_id, removed ids are dropped.
+    Returns a new list; transactions without an id (e.g. CSV imports) are kept as-is.
+    """
+    removed_ids = {
+        tx["transaction_id"] if isinstance(tx, dict) else tx
+        for tx in removed
+    }
+    updates = {tx["transaction_id"]: tx for tx in list(added) + list(modified)}
+
+    result = []
+    for tx in transactions:
+        tx_id = tx.get("transaction_id")
+        if tx_id in removed_ids:
+            continue
+        if tx_id in updates:
+            result.append(updates.pop(tx_id))
+        else:
+            result.append(tx)
+
+    # Whatever is left was never seen before
+    result.extend(tx for tx_id, tx in updates.items() if tx_id not in removed_ids)
+    return result
+
+
+CHANGE_LOG_LIMIT = 200  # Deltas kept in state; views further behind than this rebuild
+
+
+def mark_transactions_changed(state, upserted=(), removed=(), reset=False):
+    """
+    Record a change to state["transactions"] (e.g. st.session_state) so derived data
+    (the spending cube, budget history) can tell it is stale. Bumps
+    state["transactions_version"] and logs the delta: upserted transaction dicts and
+    removed ids, or reset=True when the whole list was replaced.
+    Returns the new version.
+    """
+    version = state.get("transactions_version", 0) + 1
+    log = list(state.get("transactions_changes", []))
+    log.append((version, None if reset else list(upserted), list(removed)))
+    state["transactions_changes"] = log[-CHANGE_LOG_LIMIT:]
+    state["transactions_version"] = version
+    return version
+
+
+def transaction_changes_since(state, version):
+    """
+    The (upserted, removed) deltas logged after version, oldest first; None when they
+    can't be replayed (a reset since then, or the log no longer reaches back that far).
+    """
+    current = state.get("transactions_version", 0)
+    log = [entry for entry in state.get("transactions_changes", []) if entry[0] > version]
+    if version > current or len(log) != current - version:
+        return None
+    if any(upserted is None for _, upserted, _ in log):
+        return None
+    return [(upserted, removed) for _, upserted, removed in log]
@@ -0,0 +1,51 @@
+"""
+Benchmark ReminderSchedule on thousands of recurring series over multi-year horizons.
+
+Run from the project root:
+    python -m benchmarks.bench_bill_reminders
+"""
+import random
+import time
+from datetime import date, timedelta
+
+from backend.utils.notifications import ReminderSchedule
+
+SERIES_COUNTS = [1_000, 5_000]
+CADENCES = ["monthly", "monthly", "weekly", "biweekly", "annual"]
+WINDOWS = [("next 30 days", 30), ("next 90 days", 90), ("next 12 months", 365), ("next 5 years", 5 * 365)]
+
+
+def make_series(n, seed=17):
+    rng = random.Random(seed)
+    today = date.today()
+    return [
+        {
+            "name": f"Bill {i}",
+            "category": "Service",
+            "amount": round(rng.uniform(5, 500), 2),
+            "next_due": today + timedelta(days=rng.randrange(31)),
+            "cadence": rng.choice(CADENCES),
+        }
+        for i in range(n)
+    ]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+if __name__ == "__main__":
+    today = date.today()
+    for n in SERIES_COUNTS:
+        series = make_series(n)
+        build_ms, schedule = timed(lambda: ReminderSchedule(series))
+        print(f"{n:,} series: index built in {build_ms:.1f} ms")
+        for label, days in WINDOWS:
+            end = today + timedelta(days=days)
+            count_ms, count = timed(lambda: schedule.count_between(today, end))
+            frame_ms, _ = timed(lambda: schedule.due_frame(today, end))
+            list_ms, _ = timed(lambda: schedule.due_between(today, end))
+            print(f"  {label:<15} {count:>9,} due   count {count_ms:7.2f} ms   "
+                  f"frame {frame_ms:7.1f} ms   reminder dicts {list_ms:8.1f} ms")
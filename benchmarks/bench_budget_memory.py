@@ -0,0 +1,39 @@
+"""
+Compare memory held by BudgetTracker (nested defaultdicts) and CompactBudgetTracker (dense matrices).
+
+Run from the project root:
+    python -m benchmarks.bench_budget_memory
+"""
+import tracemalloc
+
+from backend.utils.budget import BudgetTracker, CompactBudgetTracker, month_label
+
+MONTHS = 120  # ten years of history
+CATEGORIES = [f"Category {i}" for i in range(40)]
+
+
+def fill(tracker):
+    for m in range(MONTHS):
+        year_month = month_label(2015 * 12 + m)
+        for i, category in enumerate(CATEGORIES):
+            tracker.set_monthly_limit(year_month, category, 100.0 + i)
+            tracker.set_monthly_expense(year_month, category, 50.0 + m)
+    return tracker
+
+
+def measure(factory):
+    tracemalloc.start()
+    tracker = fill(factory())
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tracker, current
+
+
+if __name__ == "__main__":
+    _, dict_bytes = measure(BudgetTracker)
+    compact, compact_bytes = measure(CompactBudgetTracker)
+
+    print(f"{MONTHS} months × {len(CATEGORIES)} categories (limits + expenses)")
+    print(f"BudgetTracker          {dict_bytes / 1024:8.1f} KiB  {dict_bytes / MONTHS:8.0f} B/month")
+    print(f"CompactBudgetTracker   {compact_bytes / 1024:8.1f} KiB  {compact_bytes / MONTHS:8.0f} B/month")
+    print(f"Compact snapshot       {len(compact.to_bytes()) / 1024:8.1f} KiB")
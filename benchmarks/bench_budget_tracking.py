@@ -0,0 +1,46 @@
+"""
+Benchmark BudgetTracker.track_monthly_expenses (per row) against the vectorized batch path.
+
+Run from the project root:
+    python -m benchmarks.bench_budget_tracking
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from backend.utils.budget import BudgetTracker
+
+CATEGORIES = ["Food and Drink", "Travel", "Shopping", "Payment", "Transfer", "Recreation"]
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_transactions(n, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2022, 1, 1)
+    return [
+        {
+            "date": (start + timedelta(days=rng.randrange(3 * 365))).strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "amount": round(rng.uniform(-50, 500), 2),
+            "category": [rng.choice(CATEGORIES)],
+        }
+        for _ in range(n)
+    ]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>10} {'per-row':>10} {'batch':>10} {'speedup':>8}")
+    for size in SIZES:
+        transactions = make_transactions(size)
+        frame = pd.DataFrame(transactions)
+
+        row_time, _ = timed(lambda: BudgetTracker().track_monthly_expenses(transactions))
+        batch_time, _ = timed(lambda: BudgetTracker().track_monthly_expenses_batch(frame))
+        print(f"{size:>10,} {row_time:>9.3f}s {batch_time:>9.3f}s {row_time / batch_time:>7.1f}x")
@@ -0,0 +1,87 @@
+"""
+Benchmark NaiveBayesCategorizer training and batch inference on 100k-row batches.
+
+Merchants are synthetic local businesses (no chain names the keyword rules know),
+so accuracy comes from the learned n-grams alone. Some names carry no category
+hint at all and a few history rows are mislabelled, as in real user data. Test
+rows are unseen store numbers / processor prefixes of merchants from the history,
+plus merchants never seen at all.
+
+Run from the project root:
+    python -m benchmarks.bench_category_model
+"""
+import random
+import time
+
+import numpy as np
+
+from backend.utils.categorizer import MODEL_CONFIDENCE_THRESHOLD, NaiveBayesCategorizer
+
+TRAIN_ROWS = 20_000
+BATCH_ROWS = 100_000
+MERCHANTS = 3_000
+CATEGORY_WORDS = {
+    "Food and Drink": ["taqueria", "bistro", "noodle bar", "kitchen", "pizzeria", "espresso", "deli", "ramen"],
+    "Groceries": ["farm market", "grocer", "foods co op", "butcher", "produce", "fresh mart"],
+    "Health": ["dental", "physio", "pediatrics", "chiropractic", "eye care", "family medicine"],
+    "Shopping": ["boutique", "outfitters", "hardware", "books", "gifts", "furniture"],
+    "Bills and Utilities": ["power co", "water district", "broadband", "wireless", "mutual insurance"],
+    "Transportation": ["auto repair", "fuel stop", "tire center", "car wash", "parking garage"],
+    "Travel": ["inn", "suites", "lodge", "air charter", "tours"],
+    "Rent": ["apartments", "property mgmt", "realty rentals", "residences"],
+    "Entertainment": ["cinema", "bowling", "arcade", "music hall", "escape room"],
+}
+GENERIC_SUFFIXES = ["llc", "& sons", "group", "inc"]  # Names that say nothing about the category
+GENERIC_SHARE = 0.15
+LABEL_NOISE = 0.05  # Share of history rows the user filed under the wrong category
+SYLLABLES = ["ka", "lo", "mi", "ren", "to", "sa", "vel", "dor", "pin", "qua", "bel", "mar", "tin", "ros"]
+
+
+def make_merchants(rng):
+    merchants = []
+    for _ in range(MERCHANTS):
+        category = rng.choice(list(CATEGORY_WORDS))
+        owner = "".join(rng.sample(SYLLABLES, rng.randint(2, 3))).title()
+        words = GENERIC_SUFFIXES if rng.random() < GENERIC_SHARE else CATEGORY_WORDS[category]
+        merchants.append((f"{owner} {rng.choice(words).title()}", category))
+    return merchants
+
+
+def variant(rng, name):
+    """How the same merchant shows up on different statements."""
+    return f"{rng.choice(['', 'SQ *', 'TST* ', 'POS '])}{name.upper() if rng.random() < 0.5 else name} #{rng.randint(1, 9999)}"
+
+
+if __name__ == "__main__":
+    rng = random.Random(23)
+    merchants = make_merchants(rng)
+    seen, unseen = merchants[:2_400], merchants[2_400:]
+    history = [rng.choice(seen) for _ in range(TRAIN_ROWS)]
+    history = [
+        (name, rng.choice(list(CATEGORY_WORDS)) if rng.random() < LABEL_NOISE else category)
+        for name, category in history
+    ]
+
+    model = NaiveBayesCategorizer()
+    started = time.perf_counter()
+    model.partial_fit([variant(rng, name) for name, _ in history], [category for _, category in history])
+    print(f"train {TRAIN_ROWS:,} rows: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    for label, pool in (("seen merchants", seen), ("unseen merchants", unseen)):
+        sample = [rng.choice(pool) for _ in range(BATCH_ROWS)]
+        names = [variant(rng, name) for name, _ in sample]
+        truth = np.array([category for _, category in sample], dtype=object)
+
+        started = time.perf_counter()
+        proba = model.predict_proba(names)
+        elapsed = time.perf_counter() - started
+        predicted = np.asarray(model.classes, dtype=object)[proba.argmax(axis=1)]
+        confident = proba.max(axis=1) >= MODEL_CONFIDENCE_THRESHOLD
+
+        print(f"{label:<17} {BATCH_ROWS:,} rows: {elapsed * 1000:5.0f} ms ({BATCH_ROWS / elapsed / 1000:.0f}k rows/s)  "
+              f"accuracy {np.mean(predicted == truth):.1%}  "
+              f"confident {confident.mean():.1%} (accuracy {np.mean(predicted[confident] == truth[confident]):.1%})")
+
+    started = time.perf_counter()
+    model.partial_fit(["Kalo Bistro #9"] * 5, ["Groceries"] * 5)
+    print(f"incremental correction: {(time.perf_counter() - started) * 1000:.1f} ms")
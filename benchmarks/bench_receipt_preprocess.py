@@ -0,0 +1,128 @@
+"""
+Benchmark the receipt image pre-processing stage against the old full-frame PNG upload.
+
+Reports request payload size (base64, as sent), local encode time and an estimated
+upload time per receipt. With no arguments a synthetic corpus of 12-MP phone-style
+photos is generated; pass a directory of real receipt photos to use those instead.
+
+    python -m benchmarks.bench_receipt_preprocess [corpus_dir] [--vision]
+
+--vision also sends both variants of each synthetic receipt to the vision model and
+checks that vendor, total and date are still extracted correctly (needs OPENAI_API_KEY).
+"""
+import base64
+import random
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from backend.utils.image_preprocess import preprocess_receipt
+
+PHOTO_SIZE = (4032, 3024)  # 12 MP
+SYNTHETIC_RECEIPTS = 8
+UPLINK_MBPS = 10  # Typical home/mobile uplink, used to estimate upload time
+VENDORS = ["Corner Market", "Blue Bottle Cafe", "City Hardware", "Green Grocer", "Metro Pharmacy"]
+
+# Options that reproduce the previous pipeline: full frame, RGB, lossless PNG
+LEGACY_OPTIONS = {"crop": False, "grayscale": False, "fmt": "PNG", "max_edge": 10 ** 6}
+
+
+def synthetic_receipt(seed):
+    """A receipt photographed on a wooden table, with its ground-truth fields."""
+    rng = random.Random(seed)
+    vendor = rng.choice(VENDORS)
+    total = round(rng.uniform(5, 250), 2)
+    tx_date = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+    width, height = PHOTO_SIZE
+    table = np.random.default_rng(seed).normal(0, 1, (height // 8, width // 8)).cumsum(axis=1)
+    table = (90 + 25 * (table - table.mean()) / (table.std() + 1e-9)).clip(30, 160).astype(np.uint8)
+    img = Image.fromarray(table).resize(PHOTO_SIZE).convert("RGB")
+
+    paper_w, paper_h = int(width * rng.uniform(0.3, 0.4)), int(height * rng.uniform(0.75, 0.9))
+    left, top = rng.randint(200, width - paper_w - 200), rng.randint(50, height - paper_h - 50)
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((left, top, left + paper_w, top + paper_h), fill=(242, 240, 232))
+
+    font = ImageFont.load_default(size=64)
+    small = ImageFont.load_default(size=44)
+    x, y = left + 80, top + 80
+    draw.text((x, y), vendor.upper(), fill=(25, 25, 25), font=font)
+    y += 140
+    for _ in range(rng.randint(6, 14)):
+        draw.text((x, y), f"ITEM {rng.randint(100, 999)}", fill=(40, 40, 40), font=small)
+        draw.text((left + paper_w - 330, y), f"{rng.uniform(1, 30):6.2f}", fill=(40, 40, 40), font=small)
+        y += 70
+    draw.text((x, y + 40), f"TOTAL  ${total:.2f}", fill=(20, 20, 20), font=font)
+    draw.text((x, y + 160), f"DATE  {tx_date}", fill=(20, 20, 20), font=small)
+
+    # Camera noise, so encoders see photo-like content rather than flat colour
+    noisy = np.asarray(img).astype(np.int16) + np.random.default_rng(seed + 1).normal(0, 5, (height, width, 3)).astype(np.int16)
+    img = Image.fromarray(noisy.clip(0, 255).astype(np.uint8))
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=92)  # As a phone camera would store it
+    return buf.getvalue(), {"vendor": vendor, "amount": total, "date": tx_date}
+
+
+def load_corpus(directory):
+    paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp"})
+    return [(p.name, p.read_bytes(), None) for p in paths]
+
+
+def encoded(data, **options):
+    started = time.perf_counter()
+    payload, _, stats = preprocess_receipt(BytesIO(data), **options)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return len(base64.b64encode(payload)), elapsed_ms, stats
+
+
+def upload_ms(size):
+    return size * 8 / (UPLINK_MBPS * 1_000_000) * 1000
+
+
+def check_vision(corpus):
+    from backend.utils.receipt_parser import extract_receipt_fields, extract_text_from_image
+
+    print("\nVision extraction (vendor / total / date correct):")
+    for label, options in (("legacy PNG", LEGACY_OPTIONS), ("preprocessed", {})):
+        correct = 0
+        for _, data, truth in corpus:
+            vendor, amount, tx_date = extract_receipt_fields(extract_text_from_image(BytesIO(data), **options))
+            correct += (
+                truth["vendor"].lower() in vendor.lower()
+                and abs(amount - truth["amount"]) < 0.01
+                and truth["date"] in tx_date
+            )
+        print(f"  {label:<13} {correct}/{len(corpus)}")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if args:
+        corpus = load_corpus(args[0])
+    else:
+        corpus = [(f"synthetic-{i}.jpg", *synthetic_receipt(i)) for i in range(SYNTHETIC_RECEIPTS)]
+
+    print(f"{len(corpus)} receipts, uplink {UPLINK_MBPS} Mbps\n")
+    print(f"{'receipt':<20} {'legacy KB':>10} {'new KB':>8} {'ratio':>7} {'legacy ms':>10} {'new ms':>8}  crop  stages (ms)")
+    totals = np.zeros(4)
+    for name, data, _ in corpus:
+        legacy_size, legacy_ms, _ = encoded(data, **LEGACY_OPTIONS)
+        new_size, new_ms, stats = encoded(data)
+        legacy_total = legacy_ms + upload_ms(legacy_size)
+        new_total = new_ms + upload_ms(new_size)
+        totals += (legacy_size, new_size, legacy_total, new_total)
+        stages = " ".join(f"{s}={stats[s + '_ms']:.0f}" for s in ("decode", "crop", "resize", "grayscale", "encode"))
+        print(f"{name:<20} {legacy_size / 1024:>10.0f} {new_size / 1024:>8.0f} {legacy_size / new_size:>6.1f}x "
+              f"{legacy_total:>10.0f} {new_total:>8.0f}  {'yes' if stats['cropped'] else 'no ':<4}  {stages}")
+
+    n = len(corpus)
+    print(f"\nmean payload: {totals[0] / n / 1024:.0f} KB -> {totals[1] / n / 1024:.0f} KB ({totals[0] / totals[1]:.1f}x smaller)")
+    print(f"mean encode + estimated upload: {totals[2] / n:.0f} ms -> {totals[3] / n:.0f} ms")
+
+    if "--vision" in sys.argv:
+        check_vision([item for item in corpus if item[2] is not None])
@@ -0,0 +1,61 @@
+"""
+Benchmark the row-wise recurring bill detector against the vectorized one.
+The row-wise reference lives in the notifications test module.
+
+Run from the project root:
+    python -m benchmarks.bench_recurring_detection
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from backend.utils.notifications import detect_recurring_transactions
+from tests.backend.utils.test_notifications import detect_recurring_transactions_rowwise
+
+MERCHANTS = ["Netflix", "Spotify", "Comcast", "PG&E", "Geico", "Rent", "Starbucks", "Uber", "Amazon", "Shell"]
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_transactions(n, seed=11):
+    """Mostly one-off purchases plus monthly bills on a stable billing day."""
+    rng = random.Random(seed)
+    start = datetime(2022, 1, 1)
+    transactions = []
+    for i in range(n):
+        if i % 10 == 0:
+            # Monthly bill: merchant/amount pair fixed per account, day jitters by a day or two
+            bill = rng.randrange(2_000)
+            month = rng.randrange(36)
+            day = min(1 + bill % 28 + rng.randrange(-1, 2), 28)
+            tx_date = datetime(2022 + month // 12, month % 12 + 1, max(day, 1))
+            name, amount = f"{MERCHANTS[bill % len(MERCHANTS)]} #{chr(97 + bill % 26)}{chr(97 + bill // 26 % 26)}", 5 + bill % 200
+        else:
+            tx_date = start + timedelta(days=rng.randrange(3 * 365))
+            name, amount = rng.choice(MERCHANTS), round(rng.uniform(1, 300), 2)
+        transactions.append({
+            "name": name,
+            "amount": amount,
+            "date": tx_date.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "category": ["Service"],
+        })
+    return transactions
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+if __name__ == "__main__":
+    print(f"{'rows':>10} {'row-wise':>10} {'columnar':>10} {'speedup':>8} {'bills':>6} {'same':>5}")
+    for size in SIZES:
+        transactions = make_transactions(size)
+        frame = pd.DataFrame(transactions)
+
+        row_time, expected = timed(lambda: detect_recurring_transactions_rowwise(transactions))
+        columnar_time, actual = timed(lambda: detect_recurring_transactions(frame))
+        print(f"{size:>10,} {row_time:>9.3f}s {columnar_time:>9.3f}s {row_time / columnar_time:>7.1f}x "
+              f"{len(actual):>6} {str(actual == expected):>5}")
@@ -0,0 +1,79 @@
+"""
+Benchmark amount-tolerant recurring detection on synthetic histories.
+
+Each merchant gets one planted pattern (a variable monthly bill, a weekly or biweekly
+charge, an annual renewal) or random one-off purchases. Reports run time and how many
+planted series detect_recurring_series finds with the right cadence, next to the
+exact-amount detector.
+
+Run from the project root:
+    python -m benchmarks.bench_recurring_series
+"""
+import random
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from backend.utils.notifications import detect_recurring_series, detect_recurring_transactions
+
+MERCHANT_COUNTS = [1_000, 10_000]
+PATTERNS = ["monthly", "weekly", "biweekly", "annual", None]
+START = date(2023, 1, 1)
+
+
+def merchant_name(i):
+    # normalize_name drops digits, so spell the merchant number in letters
+    return "Merchant " + "".join(chr(97 + int(digit)) for digit in str(i))
+
+
+def make_history(n_merchants, seed=13):
+    rng = random.Random(seed)
+    transactions, planted = [], {}
+    for i in range(n_merchants):
+        name, pattern = merchant_name(i), rng.choice(PATTERNS)
+        base = rng.uniform(10, 300)
+        if pattern == "monthly":
+            day = rng.randrange(1, 28)
+            dates = [date(2023 + m // 12, m % 12 + 1, day) + timedelta(days=rng.randrange(-2, 3)) for m in range(24)]
+        elif pattern in ("weekly", "biweekly"):
+            step = 7 if pattern == "weekly" else 14
+            first = START + timedelta(days=rng.randrange(step))
+            dates = [first + timedelta(days=step * k) for k in range(730 // step)]
+        elif pattern == "annual":
+            first = START + timedelta(days=rng.randrange(365))
+            dates = [first.replace(year=first.year + k) for k in range(3) if not (first.month == 2 and first.day == 29)]
+        else:
+            dates = [START + timedelta(days=rng.randrange(730)) for _ in range(20)]
+
+        for tx_date in dates:
+            # Variable bills move ±10% around their base; one-offs are anything
+            amount = base * rng.uniform(0.9, 1.1) if pattern else rng.uniform(1, 500)
+            transactions.append({"name": name, "amount": round(amount, 2), "date": tx_date.isoformat()})
+        if pattern:
+            planted[name] = pattern
+
+    rng.shuffle(transactions)
+    return transactions, planted
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+if __name__ == "__main__":
+    print(f"{'merchants':>9} {'rows':>9} {'series':>8} {'found':>13} {'false+':>7} {'exact-key':>9} {'found':>6}")
+    for n_merchants in MERCHANT_COUNTS:
+        transactions, planted = make_history(n_merchants)
+        frame = pd.DataFrame(transactions)
+
+        series_time, series = timed(lambda: detect_recurring_series(frame))
+        exact_time, exact = timed(lambda: detect_recurring_transactions(frame))
+
+        found = {(r["name"], r["cadence"]) for r in series}
+        hits = sum((name, cadence) in found for name, cadence in planted.items())
+        false_positives = sum(name not in planted for name, _ in found)
+        print(f"{n_merchants:>9,} {len(frame):>9,} {series_time:>7.2f}s {hits:>6}/{len(planted):<6} "
+              f"{false_positives:>7} {exact_time:>8.2f}s {len({r['name'] for r in exact}):>6}")
@@ -0,0 +1,102 @@
+"""
+Benchmark the SpendingCube against regrouping the full DataFrame on every rerun.
+
+The legacy path is what show_insights did per rerun: group the transactions by
+category and by date for the two charts. The cube path reads the same totals
+from day × category × account × source cells; the one-off build and the cost of
+a small incremental change (replaying the logged delta, or a full content
+resync as after a reset) are reported separately.
+
+Run from the project root:
+    python -m benchmarks.bench_spending_cube
+"""
+import random
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from backend.utils.dates import parse_dates
+from backend.utils.spending_cube import SpendingCube, get_spending_cube
+from backend.utils.transaction_sync import mark_transactions_changed
+
+ROWS = 100_000
+DAYS = 730
+ACCOUNTS = ["acc_1", "acc_2", "acc_3", "acc_4"]
+CATEGORIES = ["Food and Drink", "Shops", "Travel", "Service", "Transfer", "Payment", "Recreation", "Healthcare"]
+RERUNS = 20
+
+
+def make_history(n, seed=9):
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    history = []
+    for i in range(n):
+        receipt = rng.random() < 0.05
+        day = start + timedelta(days=rng.randrange(DAYS))
+        history.append({
+            "transaction_id": f"t{i}",
+            "date": day.isoformat() if receipt else day.strftime("%a, %d %b %Y 00:00:00 GMT"),
+            "name": f"MERCHANT {rng.randrange(800)}",
+            "amount": round(rng.uniform(-100, 300), 2),
+            "category": [rng.choice(CATEGORIES)],
+            "account_id": "manual_upload" if receipt else rng.choice(ACCOUNTS),
+            "source": "manual_upload" if receipt else "plaid",
+        })
+    return history
+
+
+def timed(run, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = run()
+    return result, (time.perf_counter() - started) / repeat * 1000
+
+
+if __name__ == "__main__":
+    history = make_history(ROWS)
+    selected = ACCOUNTS[:3]
+
+    df = pd.DataFrame(history)
+    df["date"] = parse_dates(df["date"])
+    df["category"] = df["category"].str[0]
+    df = df[df["account_id"].isin(selected + ["manual_upload"])]
+
+    def legacy():
+        return (df.groupby("category")["amount"].sum().reset_index(),
+                df.groupby("date")["amount"].sum().reset_index())
+
+    cube = SpendingCube()
+    _, build_ms = timed(lambda: cube.sync(history))
+    owners = {"account_ids": selected + ["manual_upload"], "sources": ["manual_upload"]}
+
+    def rollups():
+        return cube.rollup("category", **owners), cube.rollup("date", **owners)
+
+    (legacy_categories, legacy_days), legacy_ms = timed(legacy, RERUNS)
+    (cube_categories, cube_days), first_ms = timed(rollups)  # First read after a change
+    _, cube_ms = timed(rollups, RERUNS)  # Later reruns with unchanged data
+
+    changed = history[:-10] + make_history(10, seed=99)
+    for i, tx in enumerate(changed[-10:]):
+        tx["transaction_id"] = f"new{i}"
+    state = {"spending_cube": cube, "spending_cube_version": 0}
+    mark_transactions_changed(state, upserted=changed[-10:], removed=[tx["transaction_id"] for tx in history[-10:]])
+    _, delta_ms = timed(lambda: get_spending_cube(state, changed))
+    cube.add(history[-10:])  # Put the rows back so the content resync has the same work to do
+    cube.remove([tx["transaction_id"] for tx in changed[-10:]])
+    touched, sync_ms = timed(lambda: cube.sync(changed))
+    _, add_ms = timed(lambda: cube.add([dict(history[0], amount=1.0)]))
+
+    match = (
+        (legacy_categories["amount"].round(2).tolist() == cube_categories["amount"].round(2).tolist())
+        and (legacy_days["amount"].round(2).tolist() == cube_days["amount"].round(2).tolist())
+    )
+    print(f"{ROWS:,} transactions, {cube.n_cells:,} cube cells")
+    print(f"  per rerun, category + daily totals: groupby {legacy_ms:6.1f} ms   cube roll-up {cube_ms:6.2f} ms "
+          f"(first after a change {first_ms:.1f} ms)")
+    print(f"  cube build (once): {build_ms:.0f} ms")
+    print(f"  10 removed + 10 added, replaying the logged delta: {delta_ms:.1f} ms")
+    print(f"  10 removed + 10 added, full content resync (after a reset): {sync_ms:.0f} ms ({touched} rows added)")
+    print(f"  add / replace one transaction: {add_ms:.2f} ms")
+    print(f"  totals match: {match}")
@@ -0,0 +1,93 @@
+"""
+Benchmark memory of 100k transactions held as Plaid dicts vs compact Transaction records.
+
+The dicts mirror what /transactions/sync returns after the JSON round trip through
+the Flask API (every string is a fresh object, as json.loads creates them), so the
+comparison matches what sits in st.session_state today.
+
+Run from the project root:
+    python -m benchmarks.bench_transaction_memory
+"""
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from backend.utils.transaction import to_transactions
+
+ROWS = 100_000
+ACCOUNTS = 6
+MERCHANTS = 800
+CATEGORIES = [["Food and Drink", "Restaurants"], ["Shops", "Supermarkets and Groceries"], ["Travel", "Taxi"],
+              ["Service", "Subscription"], ["Transfer", "Debit"], ["Payment", "Rent"]]
+
+
+def plaid_payload(n, seed=3):
+    """JSON text of n Plaid-shaped transactions, dates serialized as jsonify does."""
+    rng = random.Random(seed)
+    merchants = [f"MERCHANT {i} #{rng.randint(100, 999)}" for i in range(MERCHANTS)]
+    start = date(2023, 1, 1)
+    rows = []
+    for i in range(n):
+        day = start + timedelta(days=rng.randrange(730))
+        merchant = rng.choice(merchants)
+        rows.append({
+            "account_id": f"acc_{rng.randrange(ACCOUNTS)}_{'x' * 30}",
+            "account_owner": None,
+            "amount": round(rng.uniform(1, 300), 2),
+            "authorized_date": day.strftime("%a, %d %b %Y 00:00:00 GMT"),
+            "authorized_datetime": None,
+            "category": rng.choice(CATEGORIES),
+            "category_id": str(rng.randint(10000000, 22000000)),
+            "check_number": None,
+            "counterparties": [],
+            "date": day.strftime("%a, %d %b %Y 00:00:00 GMT"),
+            "datetime": None,
+            "institution_id": "ins_109508",
+            "iso_currency_code": "USD",
+            "location": {"address": None, "city": None, "country": None, "lat": None, "lon": None,
+                         "postal_code": None, "region": None, "store_number": None},
+            "logo_url": None,
+            "merchant_entity_id": None,
+            "merchant_name": merchant.split(" #")[0].title(),
+            "name": merchant,
+            "payment_channel": rng.choice(["online", "in store"]),
+            "payment_meta": {"by_order_of": None, "payee": None, "payer": None, "payment_method": None,
+                             "payment_processor": None, "ppd_id": None, "reason": None, "reference_number": None},
+            "pending": False,
+            "pending_transaction_id": None,
+            "personal_finance_category": {"confidence_level": "VERY_HIGH", "detailed": "GENERAL_MERCHANDISE_OTHER",
+                                          "primary": "GENERAL_MERCHANDISE"},
+            "transaction_code": None,
+            "transaction_id": f"{i:012d}{'t' * 25}",
+            "transaction_type": "place",
+            "unofficial_currency_code": None,
+            "website": None,
+        })
+    return json.dumps(rows)
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+if __name__ == "__main__":
+    payload = plaid_payload(ROWS)
+    dicts, dict_bytes, dict_s = measure(lambda: json.loads(payload))
+    del dicts
+    # Counted after the dicts are gone, so the records pay for their own transaction_id strings
+    records, record_bytes, record_s = measure(lambda: to_transactions(json.loads(payload)))
+
+    print(f"{ROWS:,} transactions")
+    print(f"  Plaid dicts          {dict_bytes / 2**20:7.1f} MB  ({dict_bytes / ROWS:5.0f} B/tx)  json.loads {dict_s * 1000:.0f} ms")
+    print(f"  Transaction records  {record_bytes / 2**20:7.1f} MB  ({record_bytes / ROWS:5.0f} B/tx)  json.loads + convert {record_s * 1000:.0f} ms")
+    print(f"  {dict_bytes / record_bytes:.1f}x smaller")
@@ -4,6 +4,8 @@ import sys
 import os
 from pathlib import Path
 from frontend.views.AddBankAccount import show_add_bank_account
+from backend.utils.transaction_store import get_transaction_store
+from backend.utils.transaction_sync import mark_transactions_changed
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 
@@ -25,6 +27,17 @@ st.set_page_config(
 if "current_page" not in st.session_state:
     st.session_state["current_page"] = st.query_params.get("page", "home")
 
+# Restore transactions persisted by earlier sessions so they survive restarts
+if "all_transactions" not in st.session_state:
+    try:
+        persisted_transactions = get_transaction_store().query()
+        if persisted_transactions:
+            st.session_state["all_transactions"] = persisted_transactions
+            st.session_state["transactions"] = list(persisted_transactions)
+            mark_transactions_changed(st.session_state, reset=True)
+    except Exception as e:
+        print(f"⚠️ Could not load persisted transactions: {e}")
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -5,6 +5,7 @@ from frontend.components.AccountSelector import add_bank_to_state, show_account_
 import streamlit.components.v1 as components
 import pandas as pd
 import json
+from backend.utils.transaction_sync import apply_transaction_changes, mark_transactions_changed
 
 def process_uploaded_statement(uploaded_file):
     if uploaded_file.type != "text/csv":
@@ -32,6 +33,7 @@ def process_uploaded_statement(uploaded_file):
         transactions.append(transaction)
 
     st.session_state["transactions"] = transactions
+    mark_transactions_changed(st.session_state, reset=True)
     return len(transactions)
 
 
@@ -156,29 +158,37 @@ def show_add_bank_account():
             if st.button("Get Transactions", use_container_width=True):
                 st.info(f"📆 Date Range: `{start_date}` to `{end_date}`")
                 
-                # Fetch transactions for each selected account
+                # Fetch transactions for all selected accounts in one batch request
                 plaid_transactions = []
                 with st.spinner("Fetching transactions..."):
-                    for account_id in selected_accounts:
-                        request_data = {
-                            "start_date": str(start_date),
-                            "end_date": str(end_date),
-                            "account_ids": [account_id]
-                        }
-                        
+                    request_data = {
+                        "start_date": str(start_date),
+                        "end_date": str(end_date),
+                        "account_ids": [
+                            account_id for account_id in selected_accounts
+                            if account_id != "manual_upload"  # Receipts never come from Plaid
+                        ]
+                    }
+
+                    if request_data["account_ids"]:
                         tx_response = requests.post(
-                            "http://localhost:5050/api/plaid/get_transactions",
+                            "http://localhost:5050/api/plaid/get_transactions_batch",
                             json=request_data
                         )
 
                         if tx_response.status_code == 200:
-                            transactions = tx_response.json().get("transactions", [])
-                            # Add source field to distinguish Plaid transactions
-                            for tx in transactions:
-                                tx["source"] = "plaid"
-                            plaid_transactions.extend(transactions)
+                            batch = tx_response.json()
+                            for account_id, transactions in batch.get("transactions_by_account", {}).items():
+                                # Add source field to distinguish Plaid transactions
+                                for tx in transactions:
+                                    tx["source"] = "plaid"
+                                plaid_transactions.extend(transactions)
+
+                            for institution in batch.get("institutions", []):
+                                if institution.get("error"):
+                                    st.error(f"Failed to fetch transactions for {institution['institution_id']}: {institution['error']}")
                         else:
-                            st.error(f"Failed to fetch transactions for account {account_id}")
+                            st.error("Failed to fetch transactions for the selected accounts")
 
                 if plaid_transactions:
                     st.success(f"Found {len(plaid_transactions)} bank transactions.")
@@ -194,6 +204,7 @@ def show_add_bank_account():
                     
                     # Update the main transactions list
                     st.session_state.transactions = st.session_state.all_transactions.copy()
+                    mark_transactions_changed(st.session_state, reset=True)
                     
                     # Build account_id → institution_name map
                     # Build account_id → details map
@@ -241,6 +252,44 @@ def show_add_bank_account():
                     st.info(f"Total transactions in system: {len(st.session_state.all_transactions)}")
                 else:
                     st.warning("No transactions found for the selected period.")
+
+            # Incremental refresh: only pull what changed since the last sync
+            if st.button("🔄 Sync New Transactions", use_container_width=True):
+                with st.spinner("Syncing changes since your last refresh..."):
+                    sync_response = requests.post(
+                        "http://localhost:5050/api/plaid/sync_transactions",
+                        json={}
+                    )
+
+                if sync_response.status_code == 200:
+                    changes = sync_response.json()
+                    # Add source field to distinguish Plaid transactions
+                    for tx in changes.get("added", []) + changes.get("modified", []):
+                        tx["source"] = "plaid"
+
+                    st.session_state.all_transactions = apply_transaction_changes(
+                        st.session_state.all_transactions,
+                        added=changes.get("added", []),
+                        modified=changes.get("modified", []),
+                        removed=changes.get("removed", [])
+                    )
+                    st.session_state.transactions = st.session_state.all_transactions.copy()
+                    mark_transactions_changed(
+                        st.session_state,
+                        upserted=changes.get("added", []) + changes.get("modified", []),
+                        removed=changes.get("removed", [])
+                    )
+
+                    st.success(
+                        f"✅ Synced: {len(changes.get('added', []))} added, "
+                        f"{len(changes.get('modified', []))} modified, "
+                        f"{len(changes.get('removed', []))} removed."
+                    )
+                    for institution in changes.get("institutions", []):
+                        if institution.get("error"):
+                            st.error(f"Failed to sync {institution['institution_id']}: {institution['error']}")
+                else:
+                    st.error("Failed to sync transactions.")
     
     # Tab 2: Add Another Bank
     with tab2:
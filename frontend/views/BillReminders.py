@@ -1,18 +1,23 @@
 import streamlit as st
 import requests
+from datetime import date, timedelta
 from backend.utils.notifications import (
-    detect_recurring_transactions,
-    generate_bill_reminders,
-    filter_important_recurring
+    ReminderSchedule,
+    detect_recurring_series,
+    filter_important_recurring,
+    get_notification_store
 )
 
+CALENDAR_HORIZONS = {"Next 90 days": 90, "Next 6 months": 182, "Next 12 months": 365}
+
 def show_bill_reminders():
     st.title("🔔 Budget Alerts & Bill Reminders")
 
-    # 💰 Budget overspending alerts
-    if 'notifications' in st.session_state and st.session_state['notifications']:
+    # 💰 Budget overspending alerts (persisted, newest month first)
+    notifications = get_notification_store().recent()
+    if notifications:
         st.subheader("⚠️ Budget Overspending Alerts")
-        for note in st.session_state['notifications']:
+        for note in notifications:
             st.warning(note["message"])
     else:
         st.success("✅ No budget alerts!")
@@ -24,16 +29,19 @@ def show_bill_reminders():
         # 🔁 Days-ahead slider
         days_ahead = st.slider("Show recurring bills due in the next X days:", min_value=1, max_value=30, value=5)
 
-        # 🚀 Detect recurring payments and reminders
-        # recurring = detect_recurring_transactions(st.session_state['transactions'])
-        if 'recurring_static' not in st.session_state:
-            recurring_candidates = detect_recurring_transactions(st.session_state['transactions'])
-            filtered = filter_important_recurring(recurring_candidates)
-            st.session_state['recurring_static'] = filtered
-
-        reminders = generate_bill_reminders(st.session_state['recurring_static'], days_ahead=days_ahead)
-
+        # 🚀 Detect recurring payments, variable amounts (utilities, metered plans) included,
+        # again only when the transactions changed since the last detection
+        recurring_key = st.session_state.get('transactions_version', 0)
+        if st.session_state.get('recurring_key') != recurring_key or 'recurring_static' not in st.session_state:
+            recurring_candidates = detect_recurring_series(st.session_state['transactions'])
+            st.session_state['recurring_static'] = filter_important_recurring(recurring_candidates)
+            st.session_state['recurring_key'] = recurring_key
 
+        # Each series is projected on its own cadence and billing day, so weekly bills show every due date;
+        # series that stopped being charged (cancelled subscriptions) are dropped
+        today = date.today()
+        schedule = ReminderSchedule(st.session_state['recurring_static'], as_of=today)
+        reminders = schedule.due_between(today, today + timedelta(days=days_ahead))
 
         st.subheader(f"🔁 Recurring Payments (due within {days_ahead} days)")
         if reminders:
@@ -41,5 +49,17 @@ def show_bill_reminders():
                 st.info(r["message"])
         else:
             st.success(f"✅ No recurring bills due in the next {days_ahead} days.")
+
+        # 🗓️ Longer-range calendar: project each recurring bill forward
+        st.subheader("🗓️ Bill Calendar")
+        horizon = st.selectbox("Show projected bills for:", list(CALENDAR_HORIZONS))
+        calendar = schedule.due_frame(today, today + timedelta(days=CALENDAR_HORIZONS[horizon]))
+        if calendar.empty:
+            st.info("No recurring bills to project.")
+        else:
+            calendar["month"] = calendar["due_date"].dt.strftime("%Y-%m")
+            monthly_totals = calendar.groupby("month")["amount"].sum().round(2)
+            st.bar_chart(monthly_totals)
+            st.dataframe(calendar[["due_date", "name", "category", "amount"]], use_container_width=True)
     else:
         st.info("No transactions loaded.")
\ No newline at end of file
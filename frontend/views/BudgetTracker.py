@@ -1,142 +1,228 @@
 import streamlit as st
-from backend.utils.budget import BudgetTracker
-from backend.utils.notifications import generate_notifications
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.utils.budget import BudgetTracker, CompactBudgetTracker, suggest_budget
+from backend.utils.categorizer import CONFIDENCE_THRESHOLD, MERCHANT_KEYWORDS, get_rule_categorizer
+from backend.utils.dates import parse_date, parse_dates, year_months
+from backend.utils.spending_cube import get_spending_cube
+from backend.utils.transaction_sync import transaction_changes_since
+from backend.utils.notifications import generate_notifications, get_notification_store
 import pandas as pd
 import altair as alt
-from dateutil import parser as date_parser
 from openai import OpenAI
 from backend.utils.config import Config
 import json
 from frontend.components.AccountSelector import show_account_selector
 
-def categorize_transactions(transactions):
-    """Use OpenAI to categorize transactions and suggest budgets."""
-    try:
-        client = OpenAI()
-        
-        # Calculate total spending per transaction name
-        spending_summary = {}
-        for tx in transactions:
-            name = tx["name"]
-            amount = abs(float(tx["amount"]))
-            if name in spending_summary:
-                spending_summary[name]["total"] += amount
-                spending_summary[name]["count"] += 1
-            else:
-                spending_summary[name] = {"total": amount, "count": 1}
-
-        # Prepare transaction data for OpenAI
-        transaction_list = [
-            {
+# Merchants per LLM request are capped by an estimated prompt-token budget, and
+# the requests for one month run concurrently
+CHUNK_TOKEN_BUDGET = int(os.getenv("CATEGORIZE_CHUNK_TOKENS", "1500"))
+CATEGORIZE_WORKERS = int(os.getenv("CATEGORIZE_WORKERS", "4"))
+CHARS_PER_TOKEN = 4  # Rough English/JSON average; good enough for sizing chunks
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def category_key(category):
+    """Comparison key so "food & drink" and "Food and Drink" count as one category."""
+    return re.sub(r"[^a-z]+", " ", category.lower().replace("&", " and ")).strip()
+
+def summarize_merchants(transactions):
+    """One entry per distinct merchant name with its month total, count and Plaid category."""
+    merchants = {}
+    for tx in transactions:
+        amount = abs(float(tx["amount"]))
+        merchant = merchants.get(tx["name"])
+        if merchant is None:
+            category = tx.get("category")
+            merchant = merchants[tx["name"]] = {
                 "name": tx["name"],
-                "amount": abs(float(tx["amount"])),
-                "date": tx["date"],
-                "existing_category": tx.get("category", [""])[0] if isinstance(tx.get("category"), list) else tx.get("category", ""),
-                "monthly_frequency": spending_summary[tx["name"]]["count"],
-                "monthly_total": spending_summary[tx["name"]]["total"]
+                "existing_category": category[-1] if isinstance(category, list) and category else (category or ""),
+                "plaid_category": category,
+                "total": 0.0,
+                "count": 0,
+                "transactions": [],
             }
-            for tx in transactions
+        merchant["total"] += amount
+        merchant["count"] += 1
+        merchant["transactions"].append({
+            "transaction_id": tx.get("transaction_id"), "name": tx["name"], "amount": amount, "date": tx["date"]
+        })
+    return list(merchants.values())
+
+def chunk_merchants(merchants, token_budget=None):
+    """Split merchants into chunks whose compact JSON lines fit the token budget (at least one per chunk)."""
+    token_budget = token_budget or CHUNK_TOKEN_BUDGET
+    chunks, current, used = [], [], 0
+    for merchant in merchants:
+        line = json.dumps([merchant["name"], merchant["existing_category"], merchant["count"], round(merchant["total"], 2)])
+        tokens = estimate_tokens(line) + 1
+        if current and used + tokens > token_budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append((merchant, line))
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _categorize_chunk(client, chunk, allowed_categories):
+    """Ask the LLM for {merchant: category} for one chunk; returns (mapping, stats)."""
+    prompt = f"""Categorize these merchants from one month of a user's bank transactions.
+
+        Use one of these categories whenever it fits: {", ".join(allowed_categories)}.
+        Only create a new short category name if none of them fits. Keep the existing
+        category in mind where it is informative.
+
+        Each line is [merchant name, existing category, transactions this month, total spent]:
+        {chr(10).join(line for _, line in chunk)}
+
+        Return only a JSON object mapping every merchant name exactly as given to its category."""
+    started = time.perf_counter()
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are a financial expert who categorizes transactions consistently."},
+            {"role": "user", "content": prompt}
         ]
-
-        # Create prompt for OpenAI
-        prompt = f"""Analyze these financial transactions and create a smart categorization system with practical budget suggestions.
-
-        Task 1 - Category Analysis:
-        1. Look at the existing_category field in each transaction
-        2. Identify the main categories and subcategories being used
-        3. Maintain the existing categorization structure where possible
-        4. Group similar transactions together
-
-        Task 2 - Budget Suggestions:
-        For each category, suggest a practical monthly budget following these rules:
-        1. For small regular expenses (food, entertainment, etc.):
-           - Round to nearest $5 if under $50
-           - Round to nearest $10 if under $100
-           - Round to nearest $50 if under $500
-        
-        2. For large expenses (rent, mortgage, etc.):
-           - Round to nearest $100
-        
-        3. Consider these factors:
-           - Monthly frequency of transactions
-           - Total monthly spending in the category
-           - Typical household spending patterns
-           - Add 10-20% buffer for flexibility
-        
-        4. Examples of good budget suggestions:
-           - Coffee & Snacks: $25 (small regular expense)
-           - Groceries: $400 (medium regular expense)
-           - Rent: $1200 (large fixed expense)
-           - Entertainment: $150 (medium variable expense)
-
-        Important Guidelines:
-        - ALWAYS suggest budgets as whole numbers (no decimals)
-        - Make suggestions slightly higher than current spending to allow flexibility
-        - Consider both transaction frequency and total amounts
-        - Use common sense for different expense types
-
-        Transactions to analyze:
-        {json.dumps(transaction_list, indent=2)}
-
-        Return the response in this exact JSON format:
-        {{
-            "categories": {{
-                "category_name": {{
-                    "transactions": [
-                        {{
-                            "name": "transaction_name",
-                            "amount": amount,
-                            "date": "date"
-                        }}
-                    ],
-                    "suggested_budget": rounded_monthly_budget_amount,
-                    "description": "Brief description of what this category includes and why this budget is suggested"
-                }}
-            }}
-        }}
-        """
-
-        # Get categorization from OpenAI
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a financial expert who understands practical budgeting. Always suggest realistic, rounded budget numbers that make sense for each category."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-
-        # Parse the response
-        try:
-            categorized_data = json.loads(response.choices[0].message.content)
-            
-            # Validate the categorization and budget suggestions
-            all_transactions = set(tx["name"] for tx in transaction_list)
-            categorized_transactions = set()
-            
-            # Validate and round budget suggestions
-            for category, data in categorized_data["categories"].items():
-                if isinstance(data, dict):
-                    if "transactions" in data:
-                        categorized_transactions.update(tx["name"] for tx in data["transactions"])
-                    
-                    # Ensure budget is a whole number
-                    if "suggested_budget" in data:
-                        data["suggested_budget"] = round(float(data["suggested_budget"]))
-            
-            # Check for missing transactions
-            missing_transactions = all_transactions - categorized_transactions
-            if missing_transactions:
-                st.warning(f"Some transactions were not categorized: {', '.join(missing_transactions)}")
-                
-            return categorized_data["categories"]
-        except json.JSONDecodeError:
-            st.error("Failed to parse AI response. Please try again.")
-            return {}
+    )
+    content = response.choices[0].message.content
+    # Prefer the API's token usage; fall back to the estimate if it is missing
+    prompt_tokens = getattr(getattr(response, "usage", None), "prompt_tokens", None)
+    completion_tokens = getattr(getattr(response, "usage", None), "completion_tokens", None)
+    stats = {
+        "merchants": len(chunk),
+        "prompt_tokens": prompt_tokens if isinstance(prompt_tokens, int) else estimate_tokens(prompt),
+        "completion_tokens": completion_tokens if isinstance(completion_tokens, int) else estimate_tokens(content),
+        "seconds": time.perf_counter() - started,
+    }
+    mapping = json.loads(content)
+    if not isinstance(mapping, dict):
+        raise json.JSONDecodeError("Expected a JSON object", content, 0)
+    return mapping, stats
+
+def categorize_transactions(transactions, stats=None):
+    """
+    Categorize a month of transactions and suggest budgets. Merchants are de-duplicated;
+    the local categorizer handles the ones it is confident about, the rest go to the
+    LLM in token-budgeted chunks run concurrently, and budgets are computed locally
+    from each category's total. A chunk that fails is retried once; if it fails again
+    only its merchants end up Uncategorized. Per-chunk token counts and wall time are
+    appended to stats when a list is passed.
+    """
+    try:
+        merchants = summarize_merchants(transactions)
+
+        # Local rules first; only low-confidence merchants need the LLM
+        local = get_rule_categorizer().categorize_many([
+            {"name": m["name"], "category": m["plaid_category"]} for m in merchants
+        ])
+        categories_by_merchant = {}
+        unresolved = []
+        for merchant, row in zip(merchants, local.itertuples(index=False)):
+            if row.confidence >= CONFIDENCE_THRESHOLD:
+                categories_by_merchant[merchant["name"]] = row.category
+            else:
+                unresolved.append(merchant)
+
+        failed_merchants = set()
+        errors = []
+        if unresolved:
+            allowed_categories = sorted(set(MERCHANT_KEYWORDS) | set(categories_by_merchant.values()) | {"Other"})
+            chunks = chunk_merchants(unresolved)
+
+            def merge(index, mapping, chunk_stats):
+                categories_by_merchant.update(
+                    (name, category) for name, category in mapping.items() if isinstance(category, str) and category.strip()
+                )
+                if stats is not None:
+                    stats.append({"chunk": index + 1, **chunk_stats})
+
+            # Built only now that the LLM is needed; if it can't be (no API key), keep the local answers
+            try:
+                client = OpenAI()
+            except Exception as e:
+                client = None
+                errors.append(e)
+                failed_merchants.update(merchant["name"] for merchant in unresolved)
+
+            failed = []
+            if client is not None:
+                with ThreadPoolExecutor(max_workers=max(1, min(CATEGORIZE_WORKERS, len(chunks)))) as executor:
+                    futures = [executor.submit(_categorize_chunk, client, chunk, allowed_categories) for chunk in chunks]
+                    for index, future in enumerate(futures):
+                        try:
+                            merge(index, *future.result())
+                        except Exception:
+                            failed.append(index)
+
+            # 🔁 One retry per failed chunk; merchants of chunks that fail again stay Uncategorized
+            for index in failed:
+                try:
+                    merge(index, *_categorize_chunk(client, chunks[index], allowed_categories))
+                except Exception as e:
+                    errors.append(e)
+                    failed_merchants.update(merchant["name"] for merchant, _ in chunks[index])
+
+            if errors:
+                if any(isinstance(e, json.JSONDecodeError) for e in errors):
+                    st.error("Failed to parse AI response. Please try again.")
+                else:
+                    st.error(f"Error categorizing transactions: {str(errors[0])}")
+                if not categories_by_merchant:
+                    return {}  # Nothing was categorized at all
+
+        # Merge the chunks' answers into one consistent category set, preferring the local names
+        canonical = {}
+        for category in [*MERCHANT_KEYWORDS, *categories_by_merchant.values()]:
+            canonical.setdefault(category_key(category), category.strip())
+
+        missing = []
+        categorized = {}
+        for merchant in merchants:
+            category = categories_by_merchant.get(merchant["name"])
+            if category is None:
+                if merchant["name"] not in failed_merchants:  # Those were already reported as an error
+                    missing.append(merchant["name"])
+                category = "Uncategorized"
+            category = canonical.get(category_key(category), category)
+            entry = categorized.setdefault(category, {"transactions": [], "total": 0.0, "merchants": 0})
+            entry["transactions"].extend(merchant["transactions"])
+            entry["total"] += merchant["total"]
+            entry["merchants"] += 1
+
+        if missing:
+            st.warning(f"Some transactions were not categorized: {', '.join(missing)}")
+
+        return {
+            category: {
+                "transactions": entry["transactions"],
+                "suggested_budget": suggest_budget(entry["total"]),
+                "description": f"${entry['total']:,.2f} across {len(entry['transactions'])} transactions at "
+                               f"{entry['merchants']} merchant(s) this month, with some headroom",
+            }
+            for category, entry in categorized.items()
+        }
 
     except Exception as e:
         st.error(f"Error categorizing transactions: {str(e)}")
         return {}
 
+def show_categorization_stats(chunk_stats):
+    """Caption plus per-chunk table for the LLM requests behind a categorization run."""
+    if not chunk_stats:
+        return
+    stats_df = pd.DataFrame(chunk_stats)
+    st.caption(
+        f"🤖 {len(stats_df)} AI request(s) for {stats_df['merchants'].sum()} merchants: "
+        f"{stats_df['prompt_tokens'].sum() + stats_df['completion_tokens'].sum():,} tokens, "
+        f"slowest {stats_df['seconds'].max():.1f}s"
+    )
+    with st.expander("⏱️ Categorization requests", expanded=False):
+        st.dataframe(stats_df, use_container_width=True, hide_index=True)
+
 def analyze_transactions_for_budgets(categorized_transactions):
     """Analyze categorized transactions to suggest appropriate budgets using OpenAI."""
     try:
@@ -179,6 +265,81 @@ def analyze_transactions_for_budgets(categorized_transactions):
         st.error(f"Error getting budget suggestions: {str(e)}")
         return {}
 
+def categorized_records(categorized_data):
+    """
+    Flatten AI-categorized data into records BudgetTracker.sync_month can ingest,
+    keyed by each transaction's own transaction_id, so a re-categorized or renamed
+    transaction is moved instead of being counted twice. Rows without one fall back
+    to name/date/amount plus an occurrence counter for exact duplicates.
+    """
+    records = []
+    occurrences = {}
+    for category, data in categorized_data.items():
+        if not isinstance(data, dict) or 'transactions' not in data:
+            continue
+        for tx in data['transactions']:
+            transaction_id = tx.get('transaction_id')
+            if not transaction_id:
+                key = f"{tx.get('name')}|{tx.get('date')}|{tx.get('amount')}"
+                occurrences[key] = occurrences.get(key, 0) + 1
+                transaction_id = f"{key}|{occurrences[key]}"
+            records.append({
+                'transaction_id': transaction_id,
+                'category': category,
+                'amount': tx['amount'],
+            })
+    return records
+
+def merchant_categories(categorized_data):
+    """Merchant name → category from one month's categorization."""
+    return {
+        tx['name']: category
+        for category, data in categorized_data.items() if isinstance(data, dict) and 'transactions' in data
+        for tx in data['transactions']
+    }
+
+def sync_budget_month(state, budget_tracker, year_month, selected_accounts):
+    """
+    Bring budget_tracker's expenses for year_month up to date with state["transactions"].
+    The first sync, and any after a reset or a re-categorization, ingests the month's
+    categorized records; later ones replay only the changes logged since
+    (mark_transactions_changed), booking new rows to their merchant's category, so a
+    refresh costs the changes rather than the month. Returns the number of rows changed.
+    """
+    synced = state.setdefault('budget_synced_versions', {})
+    version = state.get('transactions_version', 0)
+    if synced.get(year_month) == version:
+        return 0
+
+    changes = transaction_changes_since(state, synced[year_month]) if year_month in synced else None
+    if changes is not None and any(not tx.get('transaction_id') for upserted, _ in changes for tx in upserted):
+        changes = None  # Rows without ids can't be matched up: rebuild the month
+    categorized_data = state['categorized_transactions'][year_month]
+
+    if changes is None:
+        changed = budget_tracker.sync_month(year_month, categorized_records(categorized_data))
+    else:
+        categories = merchant_categories(categorized_data)
+        changed = 0
+        for upserted, removed in changes:
+            records, moved_out = [], []
+            for tx in upserted:
+                day = parse_date(tx.get('date'))
+                selected = tx.get('account_id') in selected_accounts or tx.get('source') == 'manual_upload'
+                if selected and day is not None and day.strftime("%Y-%m") == year_month:
+                    records.append({
+                        'transaction_id': tx['transaction_id'],
+                        'category': categories.get(tx.get('name'), "Uncategorized"),
+                        'amount': tx['amount'],
+                    })
+                else:
+                    moved_out.append(tx['transaction_id'])  # Left this month (or the selected accounts)
+            changed += budget_tracker.remove(removed)
+            changed += budget_tracker.remove(moved_out, year_month) + budget_tracker.ingest(records, year_month)
+
+    synced[year_month] = version
+    return changed
+
 def show_budget_tracker():
     st.title("📊 Budget Tracker - Monthly Overspending")
 
@@ -212,22 +373,9 @@ def show_budget_tracker():
     if 'category' not in df.columns:
         df['category'] = "Uncategorized"
     
-    # Convert dates to datetime, handling different formats
-    def parse_date(date_str):
-        if isinstance(date_str, str):
-            try:
-                # Try parsing as ISO format first
-                return pd.to_datetime(date_str)
-            except:
-                try:
-                    # Try parsing as GMT format
-                    return pd.to_datetime(date_str, format="%a, %d %b %Y %H:%M:%S GMT")
-                except:
-                    # If both fail, return NaT
-                    return pd.NaT
-        return pd.NaT
-
-    df["date"] = df["date"].apply(parse_date)
+    # Parse all dates in one vectorized pass; month labels are kept per transaction for filtering
+    df["date"] = parse_dates(df["date"])
+    tx_months = year_months(df["date"]).astype(str).to_numpy()
     
     # Remove any rows with invalid dates
     df = df.dropna(subset=["date"])
@@ -262,10 +410,23 @@ def show_budget_tracker():
     
     df["category"] = df["category"].apply(standardize_category)
 
+    # Month × category history for the trends section, rebuilt only when the data changes
+    # (accounts, transactions_version): the version moves on every logged change, edits included
+    history_key = (tuple(sorted(selected_accounts)), st.session_state.get('transactions_version', 0))
+    if st.session_state.get('spending_history_key') != history_key:
+        # Rolled up from the session's spending cube: cost grows with day × category cells, not transactions
+        cube = get_spending_cube(st.session_state, st.session_state['transactions'])
+        monthly = cube.rollup(["month", "category"], account_ids=list(selected_accounts), sources=["manual_upload"])
+        monthly["category"] = monthly["category"].apply(standardize_category)
+        history = CompactBudgetTracker()
+        for (month, category), spent in monthly.groupby(["month", "category"])["abs_amount"].sum().items():
+            history.set_monthly_expense(month, category, spent)
+        st.session_state['spending_history'] = history
+        st.session_state['spending_history_key'] = history_key
+    history = st.session_state['spending_history']
+
     # Extract available months from transactions
-    all_months = sorted(set(
-        date_parser.parse(str(date)).strftime("%Y-%m") for date in df["date"]
-    ))
+    all_months = sorted(set(year_months(df["date"]).astype(str)))
     
     # Add month selection with change detection
     if 'previous_month' not in st.session_state:
@@ -278,10 +439,7 @@ def show_budget_tracker():
     st.session_state['previous_month'] = selected_month
 
     # Filter transactions for selected month
-    filtered_tx = [
-        tx for tx in transactions
-        if date_parser.parse(str(parse_date(tx['date']))).strftime("%Y-%m") == selected_month
-    ]
+    filtered_tx = [tx for tx, month in zip(transactions, tx_months) if month == selected_month]
 
     # Initialize or reuse BudgetTracker
     if 'budget_tracker' not in st.session_state:
@@ -313,9 +471,12 @@ def show_budget_tracker():
     # 2. User explicitly requests AI suggestions
     if selected_month not in st.session_state['categorized_transactions']:
         with st.spinner("🤖 AI is categorizing your transactions..."):
-            categorized = categorize_transactions(filtered_tx)
+            chunk_stats = []
+            categorized = categorize_transactions(filtered_tx, stats=chunk_stats)
+            show_categorization_stats(chunk_stats)
             st.session_state['categorized_transactions'][selected_month] = categorized
             st.session_state['ai_categorized_months'].add(selected_month)
+            st.session_state.setdefault('budget_synced_versions', {}).pop(selected_month, None)  # Full sync next
             
             # Store categories for this month
             st.session_state['budget_categories'][selected_month] = [
@@ -342,24 +503,14 @@ def show_budget_tracker():
         'chart_month' not in st.session_state or 
         st.session_state['chart_month'] != selected_month):
         
-        # Reset and update budget tracker for the new month
-        budget_tracker.reset_month(selected_month)
-        
         # Restore budget limits from session state
         if selected_month in st.session_state['budget_limits']:
             for category, limit in st.session_state['budget_limits'][selected_month].items():
                 budget_tracker.set_monthly_limit(selected_month, category, limit)
         
         if selected_month in st.session_state['categorized_transactions']:
-            categorized_data = st.session_state['categorized_transactions'][selected_month]
-            
-            # Update expenses for the new month
-            for category in categories:
-                if category in categorized_data and isinstance(categorized_data[category], dict):
-                    data = categorized_data[category]
-                    if 'transactions' in data:
-                        total_spent = sum(tx['amount'] for tx in data['transactions'])
-                        budget_tracker.monthly_expenses[selected_month][category] = total_spent
+            # Apply only the transactions changed since this month was last synced
+            sync_budget_month(st.session_state, budget_tracker, selected_month, selected_accounts)
 
             # Get new summary and update session state
             overspending = budget_tracker.get_overspending_summary(selected_month)
@@ -369,18 +520,8 @@ def show_budget_tracker():
             st.session_state['chart_summary'] = summary
             st.session_state['chart_month'] = selected_month
             
-            # Add notifications if there's overspending
-            if overspending:
-                if 'notifications' not in st.session_state:
-                    st.session_state['notifications'] = []
-
-                new_notes = generate_notifications(overspending, selected_month)
-                
-                # ✅ De-duplicate based on message
-                existing_messages = {note["message"] for note in st.session_state['notifications']}
-                unique_new_notes = [note for note in new_notes if note["message"] not in existing_messages]
-                
-                st.session_state['notifications'].extend(unique_new_notes)
+            # Replace the month's overspending alerts (✅ one per category; categories back under budget are cleared)
+            get_notification_store().replace_month(selected_month, generate_notifications(overspending, selected_month))
 
 
     # Show charts if data exists
@@ -515,6 +656,26 @@ def show_budget_tracker():
                         use_container_width=True
                     )
 
+    # Spending Trends: range queries over the whole history, not just the selected month
+    month_over_month = history.get_month_over_month(selected_month)
+    trailing = {window: history.get_trailing_averages(selected_month, window) for window in (3, 6, 12)}
+    this_month = {row['category']: row['spent'] for row in history.get_range_summary(selected_month, selected_month)}
+    trend_rows = [
+        {
+            'category': category,
+            'This Month': this_month.get(category, 0.0),
+            'vs. Last Month': month_over_month.get(category, 0.0),
+            '3-Month Avg': trailing[3].get(category, 0.0),
+            '6-Month Avg': trailing[6].get(category, 0.0),
+            '12-Month Avg': trailing[12].get(category, 0.0),
+        }
+        for category in sorted(trailing[12])
+    ]
+    if trend_rows:
+        st.subheader("📈 Spending Trends")
+        st.caption("Spending by transaction category compared with recent months")
+        st.dataframe(pd.DataFrame(trend_rows), use_container_width=True)
+
     # Budget Settings Section
     st.subheader("💰 Budget Settings")
     
@@ -523,10 +684,13 @@ def show_budget_tracker():
     with col2:
         if st.button("🤖 Get AI Budget Suggestions"):
             with st.spinner("Analyzing spending patterns..."):
-                categorized = categorize_transactions(filtered_tx)
+                chunk_stats = []
+                categorized = categorize_transactions(filtered_tx, stats=chunk_stats)
+                show_categorization_stats(chunk_stats)
                 if categorized:
                     st.session_state['categorized_transactions'][selected_month] = categorized
                     st.session_state['ai_categorized_months'].add(selected_month)
+                    st.session_state.setdefault('budget_synced_versions', {}).pop(selected_month, None)  # Re-categorized: full sync next
                     
                     # Update categories for this month
                     st.session_state['budget_categories'][selected_month] = [
@@ -570,14 +734,8 @@ def show_budget_tracker():
 
     # Analyze Spending button
     if st.button("📈 Analyze Spending"):
-        # Track expenses using AI-categorized transactions
-        budget_tracker.reset_month(selected_month)
-        categorized_data = st.session_state['categorized_transactions'][selected_month]
-        
-        for category, data in categorized_data.items():
-            if isinstance(data, dict) and 'transactions' in data:
-                total_spent = sum(tx['amount'] for tx in data['transactions'])
-                budget_tracker.monthly_expenses[selected_month][category] = total_spent
+        # Track expenses using AI-categorized transactions (logged changes only)
+        sync_budget_month(st.session_state, budget_tracker, selected_month, selected_accounts)
 
         # Get updated summary with current budget limits
         summary = budget_tracker.get_monthly_summary(selected_month)
@@ -592,18 +750,8 @@ def show_budget_tracker():
         st.session_state['chart_summary'] = summary
         st.session_state['chart_month'] = selected_month
         
-        # Add notifications for overspending
-        if overspending:
-                if 'notifications' not in st.session_state:
-                    st.session_state['notifications'] = []
-
-                new_notes = generate_notifications(overspending, selected_month)
-                
-                # ✅ De-duplicate based on message
-                existing_messages = {note["message"] for note in st.session_state['notifications']}
-                unique_new_notes = [note for note in new_notes if note["message"] not in existing_messages]
-                
-                st.session_state['notifications'].extend(unique_new_notes)
+        # Replace the month's overspending alerts (✅ one per category; categories back under budget are cleared)
+        get_notification_store().replace_month(selected_month, generate_notifications(overspending, selected_month))
 
         # Force a rerun to update the display
         st.rerun()
@@ -5,6 +5,24 @@ from openai import OpenAI
 import json
 from backend.utils.config import Config
 from frontend.components.AccountSelector import show_account_selector
+from backend.utils.parquet_cache import cache_version, read_transactions
+from backend.utils.dates import parse_dates
+from backend.utils.spending_cube import SpendingCube, get_spending_cube
+
+# Only the columns the charts and table actually use (transaction_id keys the cube's rows)
+INSIGHTS_COLUMNS = ["transaction_id", "date", "name", "amount", "category", "account_id", "source"]
+
+
+def get_cached_rows_cube(df, version):
+    """Spending cube over the cached rows in df, resynced only when version (cache files + accounts) moves."""
+    cube = st.session_state.get("insights_cube")
+    if cube is None:
+        cube = st.session_state["insights_cube"] = SpendingCube()
+    if st.session_state.get("insights_cube_version") != version:
+        cube.sync(df[INSIGHTS_COLUMNS].to_dict(orient="records"))
+        st.session_state["insights_cube_version"] = version
+    return cube
+
 
 def show_insights():
     st.title("📊 Spending Insights – AI Finance Manager")
@@ -19,15 +37,13 @@ def show_insights():
         st.warning("No transaction data found. Go to 'Home' and connect your bank first.")
         st.stop()
 
-    # Filter relevant transactions
-    transactions = [
-        tx for tx in st.session_state['transactions']
-        if (tx.get('account_id') in selected_accounts or tx.get('source') == 'manual_upload')
-    ]
-
-    if not transactions:
-        st.warning("No transactions found for selected accounts.")
-        st.stop()
+    # 📦 Load just the needed columns from the columnar cache (receipts are always included)
+    user_id = "demo-user-123"
+    df = read_transactions(
+        user_id,
+        columns=INSIGHTS_COLUMNS,
+        account_ids=list(selected_accounts) + ["manual_upload"]
+    )
 
     # 🔁 Map account_id → institution name (bank)
     bank_name_map = {}
@@ -37,21 +53,27 @@ def show_insights():
             for account in bank.get("accounts", []):
                 bank_name_map[account["account_id"]] = institution_name
 
-    # 📄 Create DataFrame
-    df = pd.DataFrame(transactions)
+    # 📄 Fall back to the session list when nothing is cached yet (e.g. data fetched before the cache existed)
+    if df.empty:
+        # Filter relevant transactions
+        transactions = [
+            tx for tx in st.session_state['transactions']
+            if (tx.get('account_id') in selected_accounts or tx.get('source') == 'manual_upload')
+        ]
+
+        if not transactions:
+            st.warning("No transactions found for selected accounts.")
+            st.stop()
+
+        df = pd.DataFrame(transactions)
+        df["date"] = parse_dates(df["date"])
+
+        # The session list is the source here, so is its cube (kept current by the transactions change log)
+        cube = get_spending_cube(st.session_state, st.session_state['transactions'])
+    else:
+        # The cached rows are the source: the chart totals and the AI prompt roll up exactly what the table shows
+        cube = get_cached_rows_cube(df, (cache_version(user_id), tuple(sorted(selected_accounts))))
 
-    def parse_date(date_str):
-        if isinstance(date_str, str):
-            try:
-                return pd.to_datetime(date_str)
-            except:
-                try:
-                    return pd.to_datetime(date_str, format="%a, %d %b %Y %H:%M:%S GMT")
-                except:
-                    return pd.NaT
-        return pd.NaT
-
-    df["date"] = df["date"].apply(parse_date)
     df = df.dropna(subset=["date"]).sort_values("date", ascending=False)
 
     # Add bank name for Plaid transactions
@@ -75,9 +97,14 @@ def show_insights():
 
     # -------------------- Visualization --------------------
 
+    # 📦 Chart totals are cube roll-ups over the table's rows, so reruns read day × category cells
+    # instead of regrouping every transaction
+    owners = {"account_ids": list(selected_accounts) + ["manual_upload"], "sources": ["manual_upload"]}
+    category_totals = cube.rollup("category", **owners)[["category", "amount"]].sort_values("amount", ascending=False)
+    daily_spending = cube.rollup("date", **owners)[["date", "amount"]]
+
     # 1. Category-wise Spending
     st.subheader("🧾 Spending by Category")
-    category_totals = df.groupby("category")["amount"].sum().reset_index().sort_values("amount", ascending=False)
 
     st.altair_chart(
         alt.Chart(category_totals).mark_bar().encode(
@@ -93,7 +120,6 @@ def show_insights():
 
     # 2. Time-based Spending
     st.subheader("📅 Spending Over Time")
-    daily_spending = df.groupby("date")["amount"].sum().reset_index()
 
     st.altair_chart(
         alt.Chart(daily_spending).mark_line(point=True).encode(
@@ -133,13 +159,9 @@ def show_insights():
         with st.spinner("Analyzing your charts..."):
             client = OpenAI()
 
-            category_data = (
-                df.groupby("category")["amount"].sum().reset_index().to_dict(orient="records")
-            )
+            category_data = category_totals.sort_values("category").to_dict(orient="records")
 
-            date_df = (
-                df.groupby("date")["amount"].sum().reset_index().sort_values("date")
-            )
+            date_df = daily_spending.copy()
             date_df["date"] = date_df["date"].dt.strftime("%Y-%m-%d")
             date_data = date_df.to_dict(orient="records")
 
@@ -5,15 +5,25 @@ from io import BytesIO
 from datetime import datetime
 import pandas as pd
 from backend.utils.receipt_parser import (
-    extract_text_from_image,
-    extract_receipt_fields,
     add_transaction_to_state,
     categorize_transaction,
-    delete_receipt_transaction
+    delete_receipt_transaction,
+    process_receipt,
+    process_receipts
 )
 import backend.utils.receipt_parser as rp
+from backend.utils.categorizer import learn_categories
 from streamlit_webrtc import webrtc_streamer, VideoTransformerBase
 
+def category_corrections(receipts):
+    """{vendor: category} for the receipts whose category the user changed from the suggested one."""
+    corrections = {}
+    for receipt in receipts:
+        category = receipt.get("category")
+        if isinstance(category, str) and category and category != receipt.get("suggested_category", category):
+            corrections[receipt["vendor"]] = category
+    return corrections
+
 def show_receipt_parser():
     # 🔁 Initialize session state
     if "webcam_img" not in st.session_state:
@@ -83,6 +93,26 @@ def show_receipt_parser():
                     
                 if st.session_state["uploaded_files"]:
                     st.info(f"📎 You uploaded {len(st.session_state['uploaded_files'])} receipt(s).")
+
+                    # ⚡ Process every new receipt in one parallel batch instead of one per rerun
+                    to_process = [
+                        f for f in st.session_state["uploaded_files"]
+                        if st.session_state["processing_status"].setdefault(f.name, "pending") == "pending"
+                    ]
+                    if to_process:
+                        progress_bar = st.progress(0.0, text=f"🔍 Processing {len(to_process)} receipt(s)...")
+
+                        def on_progress(done, total, index, result):
+                            progress_bar.progress(done / total, text=f"🔍 Processed {done}/{total} receipt(s)")
+
+                        results = process_receipts(to_process, on_progress=on_progress)
+                        for uploaded_file, result in zip(to_process, results):
+                            if "error" in result:
+                                st.error(f"❌ Could not process {uploaded_file.name}: {result['error']}")
+                                st.session_state["processing_status"][uploaded_file.name] = "failed"
+                            else:
+                                st.session_state["processing_status"][uploaded_file.name] = result
+                        progress_bar.empty()
                     
                     # Create a grid layout for receipts
                     cols = st.columns(3)  # 3 columns for the grid
@@ -104,23 +134,6 @@ def show_receipt_parser():
                                     remaining_files.append(uploaded_file)
                                     st.image(uploaded_file, use_container_width=True)
                                     
-                                    # Show processing status
-                                    if uploaded_file.name not in st.session_state["processing_status"]:
-                                        st.session_state["processing_status"][uploaded_file.name] = "pending"
-                                    
-                                    if st.session_state["processing_status"][uploaded_file.name] == "pending":
-                                        with st.spinner("🔍 Processing..."):
-                                            text = extract_text_from_image(uploaded_file)
-                                            vendor, amount, tx_date = extract_receipt_fields(text)
-                                            category = categorize_transaction(vendor, text)
-                                            st.session_state["processing_status"][uploaded_file.name] = {
-                                                "text": text,
-                                                "vendor": vendor,
-                                                "amount": amount,
-                                                "date": tx_date,
-                                                "category": category
-                                            }
-                                    
                                     # Show extracted information in a collapsible section
                                     with st.expander("📝 Details", expanded=False):
                                         if isinstance(st.session_state["processing_status"][uploaded_file.name], dict):
@@ -146,9 +159,9 @@ def show_receipt_parser():
                                                 "amount": info["amount"],
                                                 "date": info["date"],
                                                 "category": info.get("category", "Uncategorized"),  # Ensure category is always present
+                                                "suggested_category": info.get("category", "Uncategorized"),
                                                 "text": info["text"]
                                             })
-                                            st.rerun()
                                 else:
                                     # Remove from processing status
                                     if uploaded_file.name in st.session_state["processing_status"]:
@@ -218,9 +231,11 @@ def show_receipt_parser():
                             st.session_state["webcam_img"].save(buf, format="PNG")
                             buf.seek(0)
 
-                            text = extract_text_from_image(buf)
-                            vendor, amount, tx_date = extract_receipt_fields(text)
-                            category = categorize_transaction(vendor, text)
+                            # Cached by image content, so reruns don't repeat the API calls
+                            info = process_receipt(buf)
+                            text, vendor, amount, tx_date, category = (
+                                info["text"], info["vendor"], info["amount"], info["date"], info["category"]
+                            )
 
                             st.markdown("### 📝 Extracted Information")
                             st.markdown(f"**Vendor:** {vendor}")
@@ -236,6 +251,7 @@ def show_receipt_parser():
                                     "amount": amount,
                                     "date": tx_date,
                                     "category": category if category else "Uncategorized",  # Default to "Uncategorized"
+                                    "suggested_category": category if category else "Uncategorized",
                                     "text": text
                                 })
                                 st.success("✅ Added to pending transactions!")
@@ -294,6 +310,7 @@ def show_receipt_parser():
 
                 with st.spinner("Saving transactions..."):
                     transaction_ids = []
+                    saved_receipts = []
                     import backend.utils.receipt_parser as rp
                     original_categorize = rp.categorize_transaction
 
@@ -317,6 +334,12 @@ def show_receipt_parser():
                             st.session_state.duplicate_warning = False
                             continue
                         transaction_ids.append(tx_id)
+                        saved_receipts.append(receipt)
+
+                    # Only saved receipts teach the local categorizer, so abandoned edits and typos don't stick
+                    corrections = category_corrections(saved_receipts)
+                    if corrections:
+                        learn_categories(list(corrections), list(corrections.values()))
 
                 # Clean up after saving
                 st.session_state["pending_receipts"] = []
@@ -15,7 +15,21 @@ if __name__ == "__main__":
     suite.addTests(loader.loadTestsFromName("tests.frontend.views.test_budget_tracker"))
     suite.addTests(loader.loadTestsFromName("tests.frontend.views.test_add_bank_account"))
     suite.addTests(loader.loadTestsFromName("tests.frontend.views.test_chatbot"))
+    suite.addTests(loader.loadTestsFromName("tests.frontend.views.test_bill_reminders"))
     suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_receipt_parser"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_transaction_sync"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_transaction_store"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_parquet_cache"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_budget"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_notifications"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_merchant_cache"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_receipt_cache"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_image_preprocess"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_categorizer"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_dates"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_transaction"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_spending_cube"))
+    suite.addTests(loader.loadTestsFromName("tests.backend.utils.test_files"))
     suite.addTests(loader.loadTestsFromName("tests.frontend.views.test_receipt_parser"))
 
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Keep test runs from writing cursors and transactions into the real ./data directory
+os.environ.setdefault("FINANCE_DATA_DIR", tempfile.mkdtemp(prefix="finance-tests-"))
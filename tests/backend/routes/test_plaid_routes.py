@@ -1,7 +1,11 @@
+import os
+import tempfile
+import time
 import unittest
 from unittest.mock import patch, MagicMock, Mock
 from flask import Flask
-from backend.routes.plaid_routes import plaid_bp, ACCESS_TOKENS
+from backend.routes.plaid_routes import plaid_bp, ACCESS_TOKENS, ACCOUNT_INSTITUTIONS
+from backend.utils.transaction_sync import CursorStore
 
 class TestPlaidRoutes(unittest.TestCase):
     def setUp(self):
@@ -77,6 +81,103 @@ class TestPlaidRoutes(unittest.TestCase):
         self.assertEqual(response.json["transactions"][0]["institution_id"], "mocked_institution_id")
 
 
+    @patch("backend.routes.plaid_routes.client.transactions_get")
+    def test_get_transactions_multiple_institutions(self, mock_transactions_get):
+        """Results stay in institution order and failures are reported per institution."""
+        ACCESS_TOKENS["demo-user-123"] = {
+            "ins_slow": "token_slow",
+            "ins_broken": "token_broken",
+            "ins_fast": "token_fast"
+        }
+
+        def fake_transactions_get(request_data):
+            token = request_data.access_token
+            if token == "token_broken":
+                raise Exception("Institution unavailable")
+            if token == "token_slow":
+                time.sleep(0.05)
+            response = MagicMock()
+            response.to_dict.return_value = {
+                "transactions": [{"id": f"tx_{token}"}],
+                "accounts": [{"account_id": f"acc_{token}"}]
+            }
+            return response
+
+        mock_transactions_get.side_effect = fake_transactions_get
+
+        response = self.client.post("/api/plaid/get_transactions", json={
+            "start_date": "2025-01-01",
+            "end_date": "2025-01-31"
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [tx["id"] for tx in response.json["transactions"]],
+            ["tx_token_slow", "tx_token_fast"]
+        )
+        self.assertEqual(response.json["total_transactions"], 2)
+
+        institutions = response.json["institutions"]
+        self.assertEqual([i["institution_id"] for i in institutions], ["ins_slow", "ins_broken", "ins_fast"])
+        self.assertEqual(institutions[1]["error"], "Institution unavailable")
+        self.assertEqual(institutions[1]["transaction_count"], 0)
+        self.assertIsNone(institutions[0]["error"])
+        self.assertIn("elapsed_ms", institutions[0])
+
+    def _paged_transactions_get(self, total):
+        """Build a transactions_get stand-in that serves `total` rows page by page."""
+        def fake_transactions_get(request_data):
+            offset = request_data.options.offset
+            count = request_data.options.count
+            response = MagicMock()
+            response.to_dict.return_value = {
+                "transactions": [{"id": f"tx_{i}"} for i in range(offset, min(offset + count, total))],
+                "accounts": [{"account_id": "acc_1"}],
+                "total_transactions": total
+            }
+            return response
+        return fake_transactions_get
+
+    @patch("backend.routes.plaid_routes.client.transactions_get")
+    def test_get_transactions_follows_pagination(self, mock_transactions_get):
+        """All pages are fetched once total_transactions is known, in offset order."""
+        ACCESS_TOKENS["demo-user-123"] = {"ins_1": "token_1"}
+        mock_transactions_get.side_effect = self._paged_transactions_get(1234)
+
+        response = self.client.post("/api/plaid/get_transactions", json={
+            "start_date": "2025-01-01",
+            "end_date": "2025-01-31",
+            "page_size": 500
+        })
+
+        self.assertEqual(response.status_code, 200)
+        ids = [tx["id"] for tx in response.json["transactions"]]
+        self.assertEqual(ids, [f"tx_{i}" for i in range(1234)])
+        self.assertEqual(mock_transactions_get.call_count, 3)
+        self.assertEqual(len(response.json["accounts"]), 1)
+        self.assertEqual(response.json["institutions"][0]["pages"], 3)
+        self.assertFalse(response.json["institutions"][0]["truncated"])
+
+    @patch("backend.routes.plaid_routes.client.transactions_get")
+    def test_get_transactions_respects_max_rows(self, mock_transactions_get):
+        """The max_rows cap stops pagination and flags the result as truncated."""
+        ACCESS_TOKENS["demo-user-123"] = {"ins_1": "token_1"}
+        mock_transactions_get.side_effect = self._paged_transactions_get(1000)
+
+        response = self.client.post("/api/plaid/get_transactions", json={
+            "start_date": "2025-01-01",
+            "end_date": "2025-01-31",
+            "page_size": 100,
+            "max_rows": 250
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["total_transactions"], 250)
+        self.assertEqual(mock_transactions_get.call_count, 3)
+        institution = response.json["institutions"][0]
+        self.assertEqual(institution["total_available"], 1000)
+        self.assertTrue(institution["truncated"])
+
     def test_get_transactions_no_access_tokens(self):
         """Test the /api/plaid/get_transactions endpoint with no access tokens."""
         ACCESS_TOKENS.clear()
@@ -85,6 +186,205 @@ class TestPlaidRoutes(unittest.TestCase):
         self.assertIn("error", response.json)
         self.assertEqual(response.json["error"], "No access tokens")
 
+    @patch("backend.routes.plaid_routes.client.transactions_sync")
+    def test_sync_transactions_persists_cursor(self, mock_transactions_sync):
+        """Sync reads every page, returns the delta and stores the final cursor."""
+        ACCESS_TOKENS["demo-user-123"] = {"ins_1": "token_1"}
+        pages = [
+            {"added": [{"transaction_id": "t1"}], "modified": [], "removed": [],
+             "next_cursor": "cursor_1", "has_more": True},
+            {"added": [{"transaction_id": "t2"}], "modified": [{"transaction_id": "t0"}],
+             "removed": [{"transaction_id": "t9"}], "next_cursor": "cursor_2", "has_more": False},
+        ]
+        mock_transactions_sync.return_value.to_dict.side_effect = pages
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = CursorStore(os.path.join(tmp_dir, "cursors.json"))
+            with patch("backend.routes.plaid_routes.CURSOR_STORE", store):
+                response = self.client.post("/api/plaid/sync_transactions", json={})
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([tx["transaction_id"] for tx in response.json["added"]], ["t1", "t2"])
+                self.assertEqual(response.json["modified"][0]["institution_id"], "ins_1")
+                self.assertEqual(response.json["removed"], ["t9"])
+                self.assertEqual(store.get("demo-user-123", "ins_1"), "cursor_2")
+
+                # The second page request continues from the first page's cursor
+                second_request = mock_transactions_sync.call_args_list[1][0][0]
+                self.assertEqual(second_request.cursor, "cursor_1")
+
+    @patch("backend.routes.plaid_routes.client.transactions_sync")
+    def test_sync_transactions_failure_keeps_cursor(self, mock_transactions_sync):
+        """A failed sync reports the error and leaves the stored cursor unchanged."""
+        ACCESS_TOKENS["demo-user-123"] = {"ins_1": "token_1"}
+        mock_transactions_sync.side_effect = Exception("ITEM_LOGIN_REQUIRED")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = CursorStore(os.path.join(tmp_dir, "cursors.json"))
+            store.set("demo-user-123", "ins_1", "cursor_old")
+            with patch("backend.routes.plaid_routes.CURSOR_STORE", store):
+                response = self.client.post("/api/plaid/sync_transactions", json={})
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json["institutions"][0]["error"], "ITEM_LOGIN_REQUIRED")
+                self.assertEqual(store.get("demo-user-123", "ins_1"), "cursor_old")
+
+    @patch("backend.routes.plaid_routes.parquet_cache")
+    @patch("backend.routes.plaid_routes.get_transaction_store")
+    @patch("backend.routes.plaid_routes.client.transactions_sync")
+    def test_sync_transactions_store_failure_keeps_cursor(self, mock_transactions_sync, mock_get_store, mock_parquet):
+        """If the rows can't be stored, the cursor stays put so the next sync delivers them again."""
+        ACCESS_TOKENS["demo-user-123"] = {"ins_1": "token_1"}
+        mock_transactions_sync.return_value.to_dict.return_value = {
+            "added": [{"transaction_id": "t1"}], "modified": [], "removed": [{"transaction_id": "t9"}],
+            "next_cursor": "cursor_new", "has_more": False
+        }
+        mock_get_store.return_value.upsert.side_effect = Exception("database is locked")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = CursorStore(os.path.join(tmp_dir, "cursors.json"))
+            store.set("demo-user-123", "ins_1", "cursor_old")
+            with patch("backend.routes.plaid_routes.CURSOR_STORE", store):
+                response = self.client.post("/api/plaid/sync_transactions", json={})
+
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.json["persisted"])
+                self.assertEqual(store.get("demo-user-123", "ins_1"), "cursor_old")
+
+                # Once the store recovers the same delta is stored and the cursor moves on
+                mock_get_store.return_value.upsert.side_effect = None
+                response = self.client.post("/api/plaid/sync_transactions", json={})
+                self.assertTrue(response.json["persisted"])
+                self.assertEqual(mock_transactions_sync.call_args[0][0].cursor, "cursor_old")
+                self.assertEqual(store.get("demo-user-123", "ins_1"), "cursor_new")
+
+    @patch("backend.routes.plaid_routes.client.transactions_get")
+    def test_get_transactions_batch_queries_each_institution_once(self, mock_transactions_get):
+        """Accounts are grouped per institution and results split back out by account."""
+        ACCESS_TOKENS["demo-user-123"] = {"ins_a": "token_a", "ins_b": "token_b", "ins_c": "token_c"}
+        ACCOUNT_INSTITUTIONS.clear()
+        ACCOUNT_INSTITUTIONS.update({"acc_a1": "ins_a", "acc_a2": "ins_a", "acc_b1": "ins_b", "acc_c1": "ins_c"})
+
+        def fake_transactions_get(request_data):
+            response = MagicMock()
+            response.to_dict.return_value = {
+                "transactions": [
+                    {"transaction_id": f"tx_{account_id}", "account_id": account_id}
+                    for account_id in request_data.options.account_ids
+                ],
+                "accounts": []
+            }
+            return response
+
+        mock_transactions_get.side_effect = fake_transactions_get
+
+        response = self.client.post("/api/plaid/get_transactions_batch", json={
+            "account_ids": ["acc_a1", "acc_b1", "acc_a2"],
+            "start_date": "2025-01-01",
+            "end_date": "2025-01-31"
+        })
+
+        self.assertEqual(response.status_code, 200)
+        # ins_c has no selected accounts, so only two Plaid calls are made
+        self.assertEqual(mock_transactions_get.call_count, 2)
+        queried = sorted(call[0][0].access_token for call in mock_transactions_get.call_args_list)
+        self.assertEqual(queried, ["token_a", "token_b"])
+
+        by_account = response.json["transactions_by_account"]
+        self.assertEqual(set(by_account), {"acc_a1", "acc_a2", "acc_b1"})
+        self.assertEqual(by_account["acc_a2"][0]["institution_id"], "ins_a")
+        self.assertEqual(response.json["total_transactions"], 3)
+
+    @patch("backend.routes.plaid_routes.client.accounts_get")
+    @patch("backend.routes.plaid_routes.client.transactions_get")
+    def test_get_transactions_batch_unknown_accounts(self, mock_transactions_get, mock_accounts_get):
+        """Unmapped accounts are looked up once in each unmapped institution."""
+        ACCESS_TOKENS["demo-user-123"] = {"ins_a": "token_a", "ins_new": "token_new"}
+        ACCOUNT_INSTITUTIONS.clear()
+        ACCOUNT_INSTITUTIONS["acc_a1"] = "ins_a"
+        # ins_new can't list its accounts, so it is queried unfiltered
+        mock_accounts_get.side_effect = lambda request_data: (
+            self._accounts_response(["acc_a1"]) if request_data.access_token == "token_a" else self._raise("down")
+        )
+
+        mock_transactions_get.return_value.to_dict.return_value = {
+            "transactions": [
+                {"transaction_id": "tx_1", "account_id": "acc_new1"},
+                {"transaction_id": "tx_2", "account_id": "acc_not_selected"}
+            ],
+            "accounts": [{"account_id": "acc_new1"}, {"account_id": "acc_not_selected"}]
+        }
+
+        response = self.client.post("/api/plaid/get_transactions_batch", json={
+            "account_ids": ["acc_new1"],
+            "start_date": "2025-01-01",
+            "end_date": "2025-01-31"
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_transactions_get.call_count, 1)
+        self.assertEqual(mock_transactions_get.call_args[0][0].access_token, "token_new")
+        self.assertEqual([tx["transaction_id"] for tx in response.json["transactions"]], ["tx_1"])
+        # The accounts returned are remembered for the next batch
+        self.assertEqual(ACCOUNT_INSTITUTIONS["acc_new1"], "ins_new")
+        self.assertEqual(response.json["unresolved_account_ids"], [])
+
+    @staticmethod
+    def _accounts_response(account_ids):
+        response = MagicMock()
+        response.to_dict.return_value = {"accounts": [{"account_id": account_id} for account_id in account_ids]}
+        return response
+
+    @staticmethod
+    def _raise(message):
+        raise Exception(message)
+
+    @patch("backend.routes.plaid_routes.client.accounts_get")
+    @patch("backend.routes.plaid_routes.client.transactions_get")
+    def test_get_transactions_batch_new_account_at_mapped_institution(self, mock_transactions_get, mock_accounts_get):
+        """A new account at an already mapped bank is found via /accounts/get; strangers are reported."""
+        ACCESS_TOKENS["demo-user-123"] = {"ins_a": "token_a", "ins_b": "token_b"}
+        ACCOUNT_INSTITUTIONS.clear()
+        ACCOUNT_INSTITUTIONS.update({"acc_a1": "ins_a", "acc_b1": "ins_b"})
+        mock_accounts_get.side_effect = lambda request_data: self._accounts_response(
+            ["acc_a1", "acc_a2"] if request_data.access_token == "token_a" else ["acc_b1"]
+        )
+
+        def fake_transactions_get(request_data):
+            response = MagicMock()
+            response.to_dict.return_value = {
+                "transactions": [{"transaction_id": f"tx_{account_id}", "account_id": account_id}
+                                 for account_id in request_data.options.account_ids],
+                "accounts": []
+            }
+            return response
+
+        mock_transactions_get.side_effect = fake_transactions_get
+
+        response = self.client.post("/api/plaid/get_transactions_batch", json={
+            "account_ids": ["acc_a2", "acc_ghost"],
+            "start_date": "2025-01-01",
+            "end_date": "2025-01-31"
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_accounts_get.call_count, 2)
+        self.assertEqual(mock_transactions_get.call_count, 1)
+        self.assertEqual(mock_transactions_get.call_args[0][0].options.account_ids, ["acc_a2"])
+        self.assertEqual([tx["transaction_id"] for tx in response.json["transactions"]], ["tx_acc_a2"])
+        self.assertEqual(response.json["unresolved_account_ids"], ["acc_ghost"])
+        self.assertEqual(response.json["transactions_by_account"]["acc_ghost"], [])
+
+    def test_get_transactions_batch_requires_accounts(self):
+        """A batch request without accounts is rejected."""
+        ACCESS_TOKENS["demo-user-123"] = {"ins_a": "token_a"}
+        response = self.client.post("/api/plaid/get_transactions_batch", json={
+            "start_date": "2025-01-01",
+            "end_date": "2025-01-31"
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json["error"], "No accounts selected")
+
     @patch("backend.routes.plaid_routes.client.accounts_get")
     def test_get_accounts_success(self, mock_accounts_get):
         """Test the /api/plaid/get_accounts endpoint for success."""
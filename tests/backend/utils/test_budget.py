@@ -0,0 +1,248 @@
+import unittest
+import pandas as pd
+from backend.utils.budget import (
+    BudgetTracker, CompactBudgetTracker, aggregate_monthly_expenses, month_label, month_number, suggest_budget,
+)
+
+TRANSACTIONS = [
+    {"date": "Wed, 15 Jan 2025 00:00:00 GMT", "amount": 12.5, "category": ["Food and Drink", "Restaurants"]},
+    {"date": "Thu, 16 Jan 2025 00:00:00 GMT", "amount": -40.0, "category": "Travel"},
+    {"date": "Sat, 01 Feb 2025 00:00:00 GMT", "amount": "7.25", "category": []},
+    {"date": " Sat, 01 Feb 2025 00:00:00 GMT ", "amount": 3.0},
+    {"date": "Sun, 02 Feb 2025 00:00:00 GMT", "amount": 10.0, "category": ["Food and Drink"]},
+]
+
+
+def as_plain_dict(expenses):
+    return {month: dict(categories) for month, categories in expenses.items()}
+
+
+class TestSuggestBudget(unittest.TestCase):
+    def test_rounding_tiers(self):
+        # Spending plus 15%, rounded up to $5 / $10 / $50 / $100 steps
+        self.assertEqual(suggest_budget(0), 5)
+        self.assertEqual(suggest_budget(10), 15)
+        self.assertEqual(suggest_budget(60), 70)
+        self.assertEqual(suggest_budget(300), 350)
+        self.assertEqual(suggest_budget(1000), 1200)
+
+    def test_always_covers_spending(self):
+        for spent in range(0, 3000, 7):
+            self.assertGreaterEqual(suggest_budget(spent), spent * 1.15)
+
+
+class TestTrackMonthlyExpensesBatch(unittest.TestCase):
+    def test_matches_per_row_path(self):
+        """The batch path produces the same nested totals as the per-row path."""
+        expected = BudgetTracker()
+        expected.track_monthly_expenses(TRANSACTIONS)
+
+        actual = BudgetTracker()
+        result = actual.track_monthly_expenses_batch(TRANSACTIONS)
+
+        self.assertEqual(as_plain_dict(result), as_plain_dict(expected.monthly_expenses))
+        self.assertEqual(actual.monthly_expenses["2025-02"]["Uncategorized"], 10.25)
+
+    def test_accepts_dataframe_and_column_arrays(self):
+        """DataFrames and dicts of column arrays are both accepted."""
+        columns = {
+            "date": ["Wed, 15 Jan 2025 00:00:00 GMT", "Wed, 15 Jan 2025 00:00:00 GMT"],
+            "amount": [1.0, 2.0],
+            "category": ["Travel", "Travel"],
+        }
+        from_columns = BudgetTracker().track_monthly_expenses_batch(columns)
+        from_frame = BudgetTracker().track_monthly_expenses_batch(pd.DataFrame(columns))
+        self.assertEqual(from_columns["2025-01"]["Travel"], 3.0)
+        self.assertEqual(as_plain_dict(from_columns), as_plain_dict(from_frame))
+
+    def test_adds_to_existing_totals(self):
+        """Batches accumulate like repeated per-row calls."""
+        tracker = BudgetTracker()
+        tracker.track_monthly_expenses(TRANSACTIONS[:1])
+        tracker.track_monthly_expenses_batch(TRANSACTIONS[:1])
+        self.assertEqual(tracker.monthly_expenses["2025-01"]["Food and Drink"], 25.0)
+
+    def test_bad_date_raises(self):
+        """Unparseable dates raise the same ValueError as the per-row path."""
+        with self.assertRaises(ValueError):
+            BudgetTracker().track_monthly_expenses_batch([{"date": "2025-01-15", "amount": 1.0}])
+
+    def test_empty_input(self):
+        """An empty batch leaves the tracker untouched."""
+        self.assertEqual(dict(BudgetTracker().track_monthly_expenses_batch([])), {})
+
+    def test_parsed_dates_skip_undated_rows(self):
+        """Rows whose parsed date is NaT are left out rather than booked to another month."""
+        frame = pd.DataFrame({
+            "date": pd.to_datetime(["2025-01-15", None, "2025-02-01"]),
+            "amount": [1.0, 50.0, 2.0],
+            "category": ["Travel", "Travel", "Travel"],
+        })
+        self.assertEqual(aggregate_monthly_expenses(frame), [("2025-01", "Travel", 1.0), ("2025-02", "Travel", 2.0)])
+
+
+class TestIdempotentIngestion(unittest.TestCase):
+    def with_ids(self):
+        return [dict(tx, transaction_id=f"tx{i}") for i, tx in enumerate(TRANSACTIONS)]
+
+    def test_reingest_is_a_no_op(self):
+        """Ingesting the same ids twice counts them once and applies nothing the second time."""
+        expected = BudgetTracker()
+        expected.track_monthly_expenses(TRANSACTIONS)
+
+        tracker = BudgetTracker()
+        self.assertEqual(tracker.ingest(self.with_ids()), 5)
+        self.assertEqual(tracker.ingest(self.with_ids()), 0)
+        self.assertEqual(as_plain_dict(tracker.monthly_expenses), as_plain_dict(expected.monthly_expenses))
+        self.assertEqual(tracker.ingested_ids("2025-01"), {"tx0", "tx1"})
+
+    def test_modified_and_removed_apply_deltas(self):
+        tracker = BudgetTracker()
+        tracker.ingest(self.with_ids())
+
+        moved = dict(self.with_ids()[0], amount=20.0, category="Shopping")
+        self.assertEqual(tracker.ingest([moved]), 1)
+        self.assertEqual(tracker.monthly_expenses["2025-01"]["Food and Drink"], 0.0)
+        self.assertEqual(tracker.monthly_expenses["2025-01"]["Shopping"], 20.0)
+
+        self.assertEqual(tracker.remove(["tx1", {"transaction_id": "tx4"}, "missing"]), 2)
+        self.assertEqual(tracker.monthly_expenses["2025-01"]["Travel"], 0.0)
+        self.assertEqual(tracker.monthly_expenses["2025-02"]["Food and Drink"], 0.0)
+        self.assertNotIn("tx1", tracker.ingested_ids())
+
+        # Scoped to a month, ids booked elsewhere stay
+        self.assertEqual(tracker.remove(["tx0", "tx3"], year_month="2025-02"), 1)
+        self.assertEqual(tracker.ingested_ids(), {"tx0", "tx2"})
+
+    def test_sync_month(self):
+        """sync_month books rows to the given month and drops ids that disappeared."""
+        tracker = BudgetTracker()
+        tracker.sync_month("2025-03", [
+            {"transaction_id": "a", "category": "Food", "amount": 10.1},
+            {"transaction_id": "b", "category": "Food", "amount": 0.2},
+        ])
+        self.assertAlmostEqual(tracker.monthly_expenses["2025-03"]["Food"], 10.3)
+
+        changed = tracker.sync_month("2025-03", [{"transaction_id": "a", "category": "Food", "amount": 10.1}])
+        self.assertEqual(changed, 1)
+        self.assertEqual(tracker.monthly_expenses["2025-03"]["Food"], 10.1)
+
+        tracker.reset_month("2025-03")
+        self.assertEqual(tracker.ingested_ids("2025-03"), set())
+        self.assertEqual(tracker.sync_month("2025-03", [{"transaction_id": "a", "category": "Food", "amount": 10.1}]), 1)
+
+
+class TestCompactBudgetTracker(unittest.TestCase):
+    def build(self, tracker):
+        tracker.track_monthly_expenses(TRANSACTIONS)
+        tracker.set_monthly_limit("2025-01", "Travel", 30)
+        tracker.set_monthly_limit("2025-01", "Shopping", 100)
+        tracker.set_monthly_limit("2025-02", "Food and Drink", 0)
+        tracker.set_monthly_limit("2024-11", "Rent", 1200)  # Earlier than anything tracked
+        return tracker
+
+    def summary(self, tracker, year_month):
+        return sorted((row["category"], row["spent"], row["limit"]) for row in tracker.get_monthly_summary(year_month))
+
+    def test_matches_dict_tracker(self):
+        """Summaries and overspending match the dict-backed tracker month by month."""
+        expected = self.build(BudgetTracker())
+        compact = self.build(CompactBudgetTracker())
+
+        for year_month in ["2024-11", "2024-12", "2025-01", "2025-02", "2025-03"]:
+            self.assertEqual(self.summary(compact, year_month), self.summary(expected, year_month))
+            self.assertEqual(compact.get_overspending_summary(year_month),
+                             expected.get_overspending_summary(year_month))
+        self.assertEqual(compact.get_overspending_summary("2025-01"), {"Travel": 10.0})
+
+    def test_reset_and_set_expense(self):
+        """reset_month clears expenses but keeps limits; set_monthly_expense overwrites."""
+        compact = self.build(CompactBudgetTracker())
+        compact.reset_month("2025-01")
+        self.assertEqual(self.summary(compact, "2025-01"), [("Shopping", 0.0, 100.0), ("Travel", 0.0, 30.0)])
+        compact.set_monthly_expense("2025-01", "Shopping", 150.0)
+        self.assertEqual(compact.get_overspending_summary("2025-01"), {"Shopping": 50.0})
+
+    def test_nested_views(self):
+        """monthly_expenses / monthly_limits expose the familiar nested dicts."""
+        compact = self.build(CompactBudgetTracker())
+        self.assertEqual(compact.monthly_limits["2024-11"], {"Rent": 1200.0})
+        self.assertEqual(compact.monthly_expenses["2025-01"], {"Food and Drink": 12.5, "Travel": 40.0})
+
+    def test_snapshot_and_pickle_round_trip(self):
+        """to_bytes/from_bytes and pickle restore an identical tracker."""
+        import pickle
+        compact = self.build(CompactBudgetTracker())
+        for restored in (CompactBudgetTracker.from_bytes(compact.to_bytes()), pickle.loads(pickle.dumps(compact))):
+            self.assertEqual(restored.monthly_expenses, compact.monthly_expenses)
+            self.assertEqual(restored.monthly_limits, compact.monthly_limits)
+            restored.set_monthly_expense("2025-04", "Travel", 1.0)
+            self.assertEqual(restored.monthly_expenses["2025-04"], {"Travel": 1.0})
+
+    def test_empty_tracker(self):
+        """An empty tracker answers queries and snapshots cleanly."""
+        compact = CompactBudgetTracker()
+        self.assertEqual(compact.get_monthly_summary("2025-01"), [])
+        self.assertEqual(compact.get_overspending_summary("2025-01"), {})
+        self.assertEqual(CompactBudgetTracker.from_bytes(compact.to_bytes()).monthly_expenses, {})
+
+
+class TestCompactBudgetTrackerRanges(unittest.TestCase):
+    def setUp(self):
+        self.tracker = CompactBudgetTracker()
+        for month, amounts in [("2025-01", {"Food": 100, "Rent": 1000}),
+                               ("2025-02", {"Food": 50}),
+                               ("2025-04", {"Food": 150, "Travel": 300})]:
+            for category, amount in amounts.items():
+                self.tracker.set_monthly_expense(month, category, amount)
+        self.tracker.set_monthly_limit("2025-02", "Food", 80)
+
+    def test_range_summary(self):
+        """Spans sum spent and limits, and average over the months in the span that have data."""
+        rows = {row["category"]: row for row in self.tracker.get_range_summary("2025-01", "2025-04")}
+        self.assertEqual(set(rows), {"Food", "Rent", "Travel"})
+        self.assertAlmostEqual(rows["Food"]["spent"], 300)
+        self.assertAlmostEqual(rows["Food"]["limit"], 80)
+        self.assertAlmostEqual(rows["Food"]["average"], 100)  # Jan, Feb and Apr; March is empty
+        self.assertEqual(self.tracker.get_range_summary("2024-01", "2024-12"), [])
+
+    def test_trailing_averages_and_month_over_month(self):
+        averages = self.tracker.get_trailing_averages("2025-04", 3)
+        self.assertAlmostEqual(averages["Food"], 100)  # Feb and Apr have data
+        self.assertAlmostEqual(averages["Travel"], 150)
+        self.assertNotIn("Rent", averages)
+
+        # A new user with one month of history averages over that month, not the window
+        self.assertEqual(self.tracker.get_trailing_averages("2025-01", 12), {"Food": 100.0, "Rent": 1000.0})
+
+        self.assertEqual(self.tracker.get_month_over_month("2025-02"), {"Food": -50.0, "Rent": -1000.0})
+        self.assertEqual(self.tracker.get_month_over_month("2025-04"), {"Food": 150.0, "Travel": 300.0})
+
+    def test_prefix_sums_follow_updates(self):
+        """Writes to earlier months, new categories and earlier-than-first months all show up."""
+        self.tracker.get_range_summary("2025-01", "2025-04")  # build the prefix sums
+        self.tracker.set_monthly_expense("2025-02", "Food", 70)
+        self.tracker.set_monthly_expense("2025-03", "Gifts", 40)
+        self.tracker.set_monthly_expense("2024-12", "Food", 10)
+        self.tracker.reset_month("2025-04")
+
+        rows = {row["category"]: row["spent"] for row in self.tracker.get_range_summary("2024-12", "2025-04")}
+        self.assertAlmostEqual(rows["Food"], 180)
+        self.assertAlmostEqual(rows["Gifts"], 40)
+        self.assertNotIn("Travel", rows)
+
+    def test_matches_direct_sums(self):
+        """Range answers match summing get_monthly_summary month by month."""
+        for start, end in [("2025-01", "2025-01"), ("2025-02", "2025-04"), ("2024-11", "2025-06")]:
+            expected = {}
+            for number in range(month_number(start), month_number(end) + 1):
+                for row in self.tracker.get_monthly_summary(month_label(number)):
+                    expected[row["category"]] = expected.get(row["category"], 0.0) + row["spent"]
+            actual = {row["category"]: row["spent"] for row in self.tracker.get_range_summary(start, end)}
+            self.assertEqual(actual.keys(), expected.keys())
+            for category in expected:
+                self.assertAlmostEqual(actual[category], expected[category])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+from backend.utils import categorizer as categorizer_module
+from backend.utils.categorizer import (
+    CONFIDENCE_THRESHOLD,
+    KeywordAutomaton,
+    NaiveBayesCategorizer,
+    RuleCategorizer,
+    get_rule_categorizer,
+    hashed_ngrams,
+    learn_categories,
+    training_examples,
+    mcc_category,
+    normalize_text,
+    plaid_category,
+)
+
+
+def brute_force(keywords, text):
+    """Longest whole-word keyword contained in text, the slow obvious way."""
+    normalized = normalize_text(text)
+    matches = [(len(normalize_text(k)), v) for k, v in keywords.items() if normalize_text(k) in normalized]
+    return max(matches)[1] if matches else None
+
+
+class TestKeywordAutomaton(unittest.TestCase):
+    def test_longest_whole_word_match(self):
+        automaton = KeywordAutomaton({"uber": "ride", "uber eats": "food", "shell": "gas"})
+        self.assertEqual(automaton.search(normalize_text("UBER *TRIP 8841")), "ride")
+        self.assertEqual(automaton.search(normalize_text("Uber Eats - Order")), "food")
+        self.assertEqual(automaton.search(normalize_text("SHELL OIL 5744")), "gas")
+        self.assertIsNone(automaton.search(normalize_text("Shellys Boutique")))
+        self.assertIsNone(automaton.search(normalize_text("Suber")))
+
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        words = ["ab", "abc", "bc", "cab", "b", "ca", "abca"]
+        keywords = {" ".join(rng.sample(words, rng.randint(1, 2))): i for i in range(20)}
+        automaton = KeywordAutomaton(keywords)
+        for _ in range(500):
+            text = " ".join(rng.choice(words + ["x"]) for _ in range(rng.randint(1, 6)))
+            expected = brute_force(keywords, text)
+            found = automaton.search(normalize_text(text))
+            if expected is None:
+                self.assertIsNone(found, text)
+            else:
+                # Ties between equally long keywords may resolve either way; compare lengths
+                lengths = {v: len(normalize_text(k)) for k, v in keywords.items()}
+                self.assertEqual(lengths[found], lengths[expected], text)
+
+
+class TestMappings(unittest.TestCase):
+    def test_mcc(self):
+        self.assertEqual(mcc_category("5812"), "Food and Drink")
+        self.assertEqual(mcc_category(5411), "Groceries")
+        self.assertEqual(mcc_category(4121), "Transportation")
+        self.assertIsNone(mcc_category("0001"))
+        self.assertIsNone(mcc_category(None))
+        self.assertIsNone(mcc_category("n/a"))
+
+    def test_plaid_prefers_most_specific(self):
+        self.assertEqual(plaid_category(["Shops", "Supermarkets and Groceries"]), "Groceries")
+        self.assertEqual(plaid_category(["Shops", "Clothing"]), "Shopping")
+        self.assertEqual(plaid_category("Travel"), "Travel")
+        self.assertIsNone(plaid_category(["Transfer", "Deposit"]))
+        self.assertIsNone(plaid_category(None))
+
+
+class TestRuleCategorizer(unittest.TestCase):
+    def setUp(self):
+        self.categorizer = RuleCategorizer()
+
+    def test_rule_priority(self):
+        self.assertEqual(self.categorizer.categorize("STARBUCKS #1234"), ("Food and Drink", 0.9, "keyword"))
+        # Keywords beat the MCC and Plaid's category
+        self.assertEqual(self.categorizer.categorize("Netflix.com", ["Shops"], "5999")[2], "keyword")
+        self.assertEqual(self.categorizer.categorize("Joe's Place", ["Shops"], "5812")[:2], ("Food and Drink", 0.85))
+        self.assertEqual(self.categorizer.categorize("Joe's Place", ["Shops"])[2], "plaid")
+        self.assertEqual(self.categorizer.categorize("Joe's Place"), ("Uncategorized", 0.0, None))
+
+    def test_overrides_win(self):
+        self.categorizer.add_override("Costco Gas #12", "Transportation")
+        self.assertEqual(self.categorizer.categorize("COSTCO GAS 12")[:2], ("Transportation", 1.0))
+        self.assertEqual(self.categorizer.categorize("Costco Wholesale")[0], "Groceries")
+
+    def test_generic_words_need_context(self):
+        """Broad words only match inside the phrases that pin them to a category."""
+        for name in ["Enterprise Rent-A-Car", "Candy Bar Co", "Flea Market", "Target Field",
+                     "Water World Park"]:
+            self.assertEqual(self.categorizer.categorize(name)[0], "Uncategorized", name)
+        self.assertEqual(self.categorizer.categorize("Delta Dental")[0], "Health")
+        self.assertEqual(self.categorizer.categorize("DELTA AIR LINES 006")[0], "Travel")
+        self.assertEqual(self.categorizer.categorize("Joe's Bar & Grill")[0], "Food and Drink")
+        self.assertEqual(self.categorizer.categorize("Union Sq Farmers Market")[0], "Groceries")
+        self.assertEqual(self.categorizer.categorize("CITY WATER DEPT")[0], "Bills and Utilities")
+        self.assertEqual(self.categorizer.categorize("TARGET.COM *1234")[0], "Shopping")
+        self.assertEqual(self.categorizer.categorize("Oak LLC Rent Payment")[0], "Rent")
+
+    def test_categorize_many_matches_single(self):
+        rng = random.Random(5)
+        names = ["Starbucks #1", "Uber Eats", "Joe's Place", "Whole Foods Market", None, "Delta Air 006"]
+        categories = [None, ["Travel"], ["Shops", "Supermarkets and Groceries"], "Food and Drink"]
+        mccs = [None, "5812", "4511", ""]
+        transactions = [
+            {"name": rng.choice(names), "category": rng.choice(categories), "mcc": rng.choice(mccs)}
+            for _ in range(300)
+        ]
+        result = self.categorizer.categorize_many(transactions)
+        self.assertEqual(len(result), 300)
+        for row, tx in zip(result.itertuples(index=False), transactions):
+            expected = self.categorizer.categorize(tx["name"] or "", tx["category"] if isinstance(tx["category"], list) else ([tx["category"]] if tx["category"] else None), tx["mcc"] or None)
+            self.assertEqual((row.category, row.confidence), expected[:2])
+
+    def test_categorize_columns_names_only(self):
+        result = self.categorizer.categorize_columns(["Lyft Ride", "Unknown Co", "Lyft Ride"])
+        self.assertEqual(list(result["category"]), ["Transportation", "Uncategorized", "Transportation"])
+        self.assertEqual(list(result["confidence"] >= CONFIDENCE_THRESHOLD), [True, False, True])
+
+    def test_empty(self):
+        self.assertEqual(len(self.categorizer.categorize_many([])), 0)
+
+
+HISTORY = [
+    ("Joe's Tacos", "Food and Drink"), ("JOES TACOS #2", "Food and Drink"), ("Green Leaf Salads", "Food and Drink"),
+    ("Main St Dental", "Health"), ("Riverside Dental Group", "Health"), ("Sunrise Physio", "Health"),
+    ("Oak Apartments LLC", "Rent"), ("Oak Apartments Rent", "Rent"),
+]
+
+
+class TestHashedNgrams(unittest.TestCase):
+    def test_same_name_same_features(self):
+        buckets, valid = hashed_ngrams(["Joe's Tacos", "JOES TACOS", "ab"])
+        np.testing.assert_array_equal(buckets[0][valid[0]], buckets[1][valid[1]])
+        # "ab" is shorter than every n-gram size
+        self.assertFalse(valid[2].any())
+        self.assertTrue((buckets >= 0).all() and (buckets < 1 << 16).all())
+
+
+class TestNaiveBayesCategorizer(unittest.TestCase):
+    def setUp(self):
+        self.model = NaiveBayesCategorizer().partial_fit(*zip(*HISTORY))
+
+    def test_predicts_similar_names(self):
+        result = self.model.predict(["JOE'S TACOS 0042", "Riverside Dental", "Oak Apartments"])
+        self.assertEqual(list(result["category"]), ["Food and Drink", "Health", "Rent"])
+        self.assertTrue((result["confidence"] > 0.9).all())
+
+    def test_probabilities(self):
+        proba = self.model.predict_proba(["Joes Tacos", "zzzz"])
+        self.assertEqual(proba.shape, (2, 3))
+        np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+        # Nothing known about "zzzz": close to the class prior, so low confidence
+        self.assertLess(proba[1].max(), 0.6)
+
+    def test_incremental_correction(self):
+        self.assertEqual(self.model.predict(["Sunrise Bakery"])["category"][0], "Health")
+        for _ in range(3):
+            self.model.partial_fit(["Sunrise Bakery"], ["Groceries"])
+        self.assertEqual(self.model.classes[-1], "Groceries")
+        self.assertEqual(self.model.predict(["SUNRISE BAKERY #3"])["category"][0], "Groceries")
+        self.assertEqual(len(self.model), len(HISTORY) + 3)
+
+    def test_chunked_batch_matches_single(self):
+        names = [name for name, _ in HISTORY] * 700
+        with patch("backend.utils.categorizer.PREDICT_CHUNK_ROWS", 1000):
+            batch = self.model.predict_proba(names)
+        np.testing.assert_allclose(batch[:len(HISTORY)], self.model.predict_proba([name for name, _ in HISTORY]), rtol=1e-6)
+        np.testing.assert_allclose(batch[-len(HISTORY):], batch[:len(HISTORY)], rtol=1e-6)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model.npz"
+            self.model.save(path)
+            loaded = NaiveBayesCategorizer.load(path)
+        self.assertEqual(loaded.classes, self.model.classes)
+        np.testing.assert_allclose(loaded.predict_proba(["Joe's Tacos"]), self.model.predict_proba(["Joe's Tacos"]))
+
+    def test_untrained(self):
+        result = NaiveBayesCategorizer().predict(["anything"])
+        self.assertEqual((result["category"][0], result["confidence"][0]), ("Uncategorized", 0.0))
+
+    def test_training_examples(self):
+        names, categories = training_examples([
+            {"name": "Joe's Tacos", "category": ["Food and Drink", "Restaurants"]},
+            {"name": "Corner Store", "category": "Groceries"},
+            {"name": "ATM Withdrawal", "category": ["Transfer"]},
+            {"name": "Mystery", "category": "Uncategorized"},
+            {"name": None, "category": "Rent"},
+        ])
+        self.assertEqual(names, ["Joe's Tacos", "Corner Store"])
+        self.assertEqual(categories, ["Food and Drink", "Groceries"])
+
+
+class TestLearnCategories(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for patcher in (
+            patch("backend.utils.categorizer.Config.get_data_dir", return_value=Path(self.tmp.name)),
+            patch("backend.utils.categorizer.get_category_model", return_value=NaiveBayesCategorizer()),
+            patch.object(categorizer_module, "_categorizer", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_corrections_become_persisted_overrides(self):
+        self.assertEqual(get_rule_categorizer().categorize("Corner Spot #4")[0], "Uncategorized")
+        learn_categories(["Corner Spot #4"], ["Groceries"])
+        self.assertEqual(get_rule_categorizer().categorize("CORNER SPOT 4")[:2], ("Groceries", 1.0))
+
+        # A fresh process reloads the overrides saved next to the model
+        categorizer_module._categorizer = None
+        self.assertEqual(get_rule_categorizer().categorize("Corner Spot")[:2], ("Groceries", 1.0))
+        self.assertTrue((Path(self.tmp.name) / "category_overrides.json").exists())
+
+    def test_overrides_round_trip(self):
+        rules = RuleCategorizer(overrides={"Costco Gas #12": "Transportation"})
+        rules.save_overrides(Path(self.tmp.name) / "overrides.json")
+        restored = RuleCategorizer(overrides=categorizer_module._load_overrides(Path(self.tmp.name) / "overrides.json"))
+        self.assertEqual(restored.overrides, rules.overrides)
+
+
+class TestReceiptCategorization(unittest.TestCase):
+    @patch("backend.utils.receipt_parser.OpenAI")
+    def test_known_vendor_skips_llm(self, mock_openai):
+        from backend.utils.receipt_parser import categorize_transaction
+        self.assertEqual(categorize_transaction("WHOLE FOODS MKT #10", "receipt"), "Groceries")
+        mock_openai.assert_not_called()
+
+    @patch("backend.utils.receipt_parser.OpenAI")
+    def test_learned_vendor_skips_llm(self, mock_openai):
+        from backend.utils.receipt_parser import categorize_transaction
+        model = NaiveBayesCategorizer().partial_fit(*zip(*(HISTORY * 3)))
+        with patch("backend.utils.receipt_parser.get_category_model", return_value=model):
+            self.assertEqual(categorize_transaction("Riverside Dental Group", "receipt"), "Health")
+        mock_openai.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
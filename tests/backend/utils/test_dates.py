@@ -0,0 +1,74 @@
+import unittest
+from datetime import date, datetime
+import pandas as pd
+from backend.utils.dates import parse_date, parse_dates, with_dates, year_months
+
+
+class TestParseDates(unittest.TestCase):
+    def test_mixed_formats(self):
+        values = [
+            "Tue, 05 Mar 2024 00:00:00 GMT",  # Plaid via jsonify
+            "2024-03-06",
+            "2024-03-07 14:30:00",  # Receipt saved to state
+            "2024-03-08T09:15:00Z",
+            "Mar 9, 2024",  # dateutil fallback
+            "not a date",
+            None,
+        ]
+        parsed = parse_dates(values)
+        self.assertEqual(str(parsed.dtype), "datetime64[ns]")
+        self.assertEqual(list(parsed[:5].dt.strftime("%Y-%m-%d")),
+                         ["2024-03-05", "2024-03-06", "2024-03-07", "2024-03-08", "2024-03-09"])
+        self.assertEqual(parsed[2], pd.Timestamp("2024-03-07 14:30:00"))
+        self.assertTrue(parsed[5:].isna().all())
+
+    def test_offsets_keep_local_date(self):
+        parsed = parse_dates(["2024-03-31T23:00:00-05:00", pd.Timestamp("2024-07-01", tz="US/Eastern")])
+        self.assertEqual(list(parsed), [pd.Timestamp("2024-03-31 23:00"), pd.Timestamp("2024-07-01")])
+
+    def test_datetime_objects(self):
+        values = [date(2024, 1, 2), datetime(2024, 1, 3, 8, 0), 20240104]
+        self.assertEqual(list(parse_dates(values)[:2]), [pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-03 08:00")])
+        self.assertTrue(parse_dates(values)[2:].isna().all())
+        self.assertTrue(parse_dates(values, accept_datetimes=False).isna().all())
+
+    def test_keeps_index_and_repeats(self):
+        values = pd.Series(["2024-02-01", "2024-02-01", "bad", "2024-02-01"], index=[10, 11, 12, 13])
+        parsed = parse_dates(values)
+        self.assertEqual(list(parsed.index), [10, 11, 12, 13])
+        self.assertEqual(parsed.isna().tolist(), [False, False, True, False])
+
+    def test_matches_dateutil(self):
+        from dateutil import parser as date_parser
+        values = ["Fri, 01 Nov 2024 00:00:00 GMT", "2024-11-02", "11/03/2024", "Nov 4 2024 5pm", "2024-11-05T10:00:00+02:00"]
+        expected = [pd.Timestamp(date_parser.parse(v).replace(tzinfo=None)) for v in values]
+        self.assertEqual(list(parse_dates(values)), expected)
+
+
+class TestParseDate(unittest.TestCase):
+    def test_matches_column_parser(self):
+        values = ["Tue, 05 Mar 2024 00:00:00 GMT", "2024-03-06", "2024-03-07 14:30:00", "2024-03-31T23:00:00-05:00",
+                  "Mar 9, 2024", datetime(2024, 3, 10, 8, 0), date(2024, 3, 11)]
+        self.assertEqual([parse_date(v) for v in values], list(parse_dates(values).dt.date))
+
+    def test_unparseable(self):
+        for value in ("not a date", "", None, 20240105):
+            self.assertIsNone(parse_date(value))
+
+
+class TestWithDates(unittest.TestCase):
+    def test_adds_year_month(self):
+        df = pd.DataFrame({"date": ["2024-01-31", "Thu, 01 Feb 2024 00:00:00 GMT", None], "amount": [1, 2, 3]})
+        result = with_dates(df)
+        self.assertEqual(list(year_months(result["date"])[:2].astype(str)), ["2024-01", "2024-02"])
+        self.assertEqual(list(result["year_month"][:2].astype(str)), ["2024-01", "2024-02"])
+        self.assertTrue(pd.isna(result["year_month"][2]))
+        self.assertEqual(list(df["date"])[0], "2024-01-31")  # Input left untouched
+
+    def test_missing_column(self):
+        result = with_dates(pd.DataFrame({"amount": [1.0]}))
+        self.assertTrue(result["date"].isna().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
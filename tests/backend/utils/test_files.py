@@ -0,0 +1,35 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from backend.utils.files import atomic_write, write_json
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.root = Path(self.tmp_dir.name)
+
+    def test_write_json_creates_parents_and_leaves_no_temp_file(self):
+        path = self.root / "nested" / "store.json"
+        write_json(path, {"a": 1})
+        write_json(path, {"a": 2})
+        self.assertEqual(json.loads(path.read_text(encoding="utf-8")), {"a": 2})
+        self.assertEqual([p.name for p in path.parent.iterdir()], ["store.json"])
+
+    def test_failed_write_keeps_the_old_file(self):
+        path = self.root / "store.json"
+        write_json(path, {"a": 1})
+
+        def broken(tmp_path):
+            tmp_path.write_text("{half", encoding="utf-8")
+            raise OSError("disk full")
+
+        with self.assertRaises(OSError):
+            atomic_write(path, broken)
+        self.assertEqual(json.loads(path.read_text(encoding="utf-8")), {"a": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
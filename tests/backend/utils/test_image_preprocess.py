@@ -0,0 +1,88 @@
+import unittest
+from functools import lru_cache
+from io import BytesIO
+import numpy as np
+from PIL import Image, ImageDraw
+from backend.utils.image_preprocess import find_receipt_box, preprocess_receipt
+
+PAPER = (700, 150, 1300, 1350)
+
+
+@lru_cache(maxsize=None)
+def receipt_png(size=(2000, 1500), paper=PAPER):
+    """White receipt with dark text lines lying on a dark table, with sensor noise like a real photo."""
+    img = Image.new("RGB", size, color=(45, 40, 35))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle(paper, fill=(245, 245, 240))
+    left, top, right, bottom = paper
+    for y in range(top + 40, bottom - 40, 60):
+        draw.rectangle((left + 40, y, right - 120, y + 18), fill=(20, 20, 20))
+    noise = np.random.default_rng(7).normal(0, 6, (size[1], size[0], 3))
+    img = Image.fromarray(np.clip(np.asarray(img) + noise, 0, 255).astype(np.uint8))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def receipt_photo():
+    return BytesIO(receipt_png())
+
+
+class TestFindReceiptBox(unittest.TestCase):
+    def test_crops_to_paper(self):
+        box = find_receipt_box(Image.open(receipt_photo()))
+        self.assertIsNotNone(box)
+        left, top, right, bottom = box
+        # Contains the whole paper plus only a small margin
+        self.assertLessEqual(left, PAPER[0])
+        self.assertLessEqual(top, PAPER[1])
+        self.assertGreaterEqual(right, PAPER[2])
+        self.assertGreaterEqual(bottom, PAPER[3])
+        self.assertLess((right - left) * (bottom - top), 0.4 * 2000 * 1500)
+
+    def test_full_frame_receipt_is_not_cropped(self):
+        self.assertIsNone(find_receipt_box(Image.new("RGB", (800, 1200), color="white")))
+
+    def test_blank_photo_is_not_cropped(self):
+        self.assertIsNone(find_receipt_box(Image.new("RGB", (800, 600), color=(40, 40, 40))))
+
+
+class TestPreprocessReceipt(unittest.TestCase):
+    def test_jpeg_grayscale_downscaled(self):
+        photo = receipt_photo()
+        payload, mime, stats = preprocess_receipt(photo, max_edge=800)
+        self.assertEqual(mime, "image/jpeg")
+        self.assertTrue(payload.startswith(b"\xff\xd8"))
+
+        out = Image.open(BytesIO(payload))
+        self.assertEqual(out.mode, "L")
+        self.assertLessEqual(max(out.size), 800)
+        self.assertTrue(stats["cropped"])
+        self.assertEqual(stats["input_size"], (2000, 1500))
+        self.assertEqual(stats["output_size"], out.size)
+        self.assertEqual(stats["output_bytes"], len(payload))
+        self.assertEqual(stats["input_bytes"], len(photo.getvalue()))
+        # Far smaller than the lossless full-frame PNG that used to be sent
+        self.assertLess(stats["output_bytes"], stats["input_bytes"] / 10)
+        for stage in ("decode", "crop", "resize", "grayscale", "encode", "total"):
+            self.assertIn(f"{stage}_ms", stats)
+
+    def test_webp_and_options(self):
+        payload, mime, stats = preprocess_receipt(receipt_photo(), fmt="webp", grayscale=False, crop=False)
+        self.assertEqual(mime, "image/webp")
+        self.assertEqual(payload[8:12], b"WEBP")
+        out = Image.open(BytesIO(payload))
+        self.assertEqual(out.mode, "RGB")
+        self.assertFalse(stats["cropped"])
+        self.assertEqual(stats["output_size"], (1600, 1200))
+
+    def test_small_images_are_not_upscaled(self):
+        buf = BytesIO()
+        Image.new("RGB", (300, 500), color="white").save(buf, format="PNG")
+        buf.seek(0)
+        _, _, stats = preprocess_receipt(buf)
+        self.assertEqual(stats["output_size"], (300, 500))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from backend.utils.merchant_cache import MerchantCache
+
+
+class TestMerchantCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "merchants.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_persists_and_counts_hits(self):
+        cache = MerchantCache(self.path)
+        cache.set_many({"netflix": True, "starbucks": False})
+
+        reloaded = MerchantCache(self.path)
+        self.assertTrue(reloaded.get("netflix"))
+        self.assertFalse(reloaded.get("starbucks"))
+        self.assertIsNone(reloaded.get("comcast"))
+        self.assertEqual((reloaded.hits, reloaded.misses), (2, 1))
+
+    def test_ttl_expiry(self):
+        cache = MerchantCache(self.path, ttl_seconds=60)
+        with patch("backend.utils.merchant_cache.time.time", return_value=1_000):
+            cache.set("netflix", True)
+        with patch("backend.utils.merchant_cache.time.time", return_value=1_059):
+            self.assertTrue(cache.get("netflix"))
+        with patch("backend.utils.merchant_cache.time.time", return_value=1_060):
+            self.assertIsNone(cache.get("netflix"))
+
+    def test_lru_eviction(self):
+        """Beyond max_entries the least recently *used* merchant goes first."""
+        cache = MerchantCache(self.path, max_entries=2)
+        cache.set_many({"a": True, "b": True})
+        cache.get("a")
+        cache.set("c", False)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertTrue(cache.get("a"))
+        self.assertIsNone(MerchantCache(self.path).get("b"))
+
+    def test_corrupt_file_starts_empty(self):
+        self.path.write_text("{not json")
+        with patch("builtins.print"):
+            self.assertEqual(len(MerchantCache(self.path)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
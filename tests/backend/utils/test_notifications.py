@@ -0,0 +1,367 @@
+import os
+import random
+import tempfile
+import unittest
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+import numpy as np
+import pandas as pd
+from dateutil import parser as date_parser
+from backend.utils.notifications import (
+    NotificationStore,
+    ReminderSchedule,
+    cluster_amounts,
+    detect_recurring_series,
+    detect_recurring_transactions,
+    filter_important_recurring,
+    generate_bill_reminders,
+    generate_notifications,
+    normalize_name
+)
+from backend.utils.merchant_cache import MerchantCache
+
+
+def detect_recurring_transactions_rowwise(transactions):
+    """The original per-row detector, kept as the reference detect_recurring_transactions must match."""
+    recurring = []
+    grouped = defaultdict(list)
+
+    for tx in transactions:
+        try:
+            norm_name = normalize_name(tx["name"])
+            amount = round(float(tx["amount"]), 2)
+
+            # ❌ Skip negative or zero transactions (credits/refunds)
+            if amount <= 0:
+                continue
+
+            tx_date = date_parser.parse(tx["date"]).date()
+            key = (norm_name, amount)
+            grouped[key].append((tx_date, tx))
+        except:
+            continue
+
+    for (norm_name, amount), entries in grouped.items():
+        if len(entries) < 3:
+            continue
+
+        entries.sort(key=lambda x: x[0])
+        dates = [entry[0] for entry in entries]
+        months_seen = set((d.year, d.month) for d in dates)
+
+        # Require recurrence in at least 3 different months
+        if len(months_seen) < 3:
+            continue
+
+        avg_day = sum(d.day for d in dates) / len(dates)
+
+        # Allow ±3 day tolerance around the average billing day
+        if all(abs(d.day - avg_day) <= 3 for d in dates):
+            last_date = dates[-1]
+            next_month = last_date.month + 1
+            next_year = last_date.year + (1 if next_month > 12 else 0)
+            next_month = 1 if next_month > 12 else next_month
+            max_day = monthrange(next_year, next_month)[1]
+            next_day = min(round(avg_day), max_day)
+            next_due = date(next_year, next_month, next_day)
+
+            recurring.append({
+                "name": entries[-1][1]["name"],
+                "category": entries[-1][1].get("category", ["Other"])[0],
+                "amount": amount,
+                "next_due": next_due
+            })
+
+    return recurring
+
+
+def monthly(name, amount, day, months, fmt="%a, %d %b %Y %H:%M:%S GMT", **extra):
+    return [
+        dict({"name": name, "amount": amount, "date": datetime(2025, month, day).strftime(fmt)}, **extra)
+        for month in months
+    ]
+
+
+def random_history(seed=3):
+    """Monthly-ish bills with jittered days, mixed date formats and some broken rows."""
+    rng = random.Random(seed)
+    formats = ["%a, %d %b %Y %H:%M:%S GMT", "%Y-%m-%d", "%m/%d/%Y", "%Y-%m-%dT%H:%M:%S"]
+    transactions = []
+    for merchant in range(200):
+        name = rng.choice(["Comcast", "Rent", "Spotify"]) + "".join(chr(97 + int(c)) for c in str(merchant))
+        amount = rng.choice([9.99, 1200, "55.5", -3, 2.675, "bad", None])
+        day, start = rng.randrange(1, 29), rng.randrange(12)
+        for k in range(rng.randrange(2, 8)):
+            month = start + k
+            tx_date = datetime(2023 + month // 12, month % 12 + 1, day) + timedelta(days=rng.choice([0, 1, -2, 4]))
+            tx = {"name": name, "amount": amount, "date": tx_date.strftime(rng.choice(formats))}
+            if rng.random() < 0.6:
+                tx["category"] = [rng.choice(["Bills", "Subscription"])]
+            if rng.random() < 0.05:
+                tx["date"] = rng.choice([None, "garbage"])
+            transactions.append(tx)
+    rng.shuffle(transactions)
+    return transactions
+
+
+class TestNotificationStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "notifications.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_upsert_replaces_by_month_category_kind(self):
+        store = NotificationStore(self.path)
+        self.assertEqual(store.upsert_many(generate_notifications({"Travel": 10, "Food": 5}, "2025-01")), 2)
+        self.assertEqual(store.upsert_many(generate_notifications({"Travel": 10}, "2025-01")), 0)  # unchanged
+        self.assertEqual(store.upsert_many(generate_notifications({"Travel": 25}, "2025-01")), 1)
+
+        messages = [note["message"] for note in store.for_month("2025-01")]
+        self.assertEqual(messages, [
+            "⚠️ You exceeded your budget for Travel by $25.00 in 2025-01.",
+            "⚠️ You exceeded your budget for Food by $5.00 in 2025-01.",
+        ])
+        self.assertTrue(store.upsert({"month": "2025-01", "category": "Travel", "kind": "reminder", "message": "x"}))
+        self.assertEqual(len(store.for_month("2025-01")), 3)
+
+    def test_replace_month_clears_resolved_alerts(self):
+        """Re-analysing a month drops alerts for categories that are back under budget."""
+        store = NotificationStore(self.path)
+        store.upsert_many(generate_notifications({"Travel": 10, "Food": 5}, "2025-01"))
+        store.upsert_many(generate_notifications({"Travel": 3}, "2025-02"))
+        store.upsert({"month": "2025-01", "category": "Rent", "kind": "reminder", "message": "x"})
+
+        self.assertEqual(store.replace_month("2025-01", generate_notifications({"Food": 7}, "2025-01")), 2)
+        self.assertEqual(sorted(note["category"] for note in store.for_month("2025-01")), ["Food", "Rent"])
+        self.assertEqual(store.replace_month("2025-01", generate_notifications({"Food": 7}, "2025-01")), 0)
+
+        self.assertEqual(store.replace_month("2025-02", []), 1)  # Fully resolved: the month goes away
+        reloaded = NotificationStore(self.path)
+        self.assertEqual([note["month"] for note in reloaded.recent()], ["2025-01", "2025-01"])
+
+    def test_max_months_is_read_when_the_store_is_created(self):
+        with patch.dict(os.environ, {"NOTIFICATION_MAX_MONTHS": "1"}):
+            store = NotificationStore(self.path)
+        self.assertEqual(store.max_months, 1)
+        self.assertEqual(NotificationStore(self.path, max_months=5).max_months, 5)
+
+    def test_retention_and_persistence(self):
+        store = NotificationStore(self.path, max_months=2)
+        for month in ["2025-01", "2025-03", "2025-02"]:
+            store.upsert_many(generate_notifications({"Travel": 1}, month))
+
+        reloaded = NotificationStore(self.path, max_months=2)
+        self.assertEqual([note["month"] for note in reloaded.recent()], ["2025-03", "2025-02"])
+        reloaded.clear("2025-03")
+        self.assertEqual([note["month"] for note in NotificationStore(self.path).recent()], ["2025-02"])
+
+
+class TestDetectRecurringTransactions(unittest.TestCase):
+    def test_detects_monthly_bill(self):
+        transactions = (
+            monthly("Netflix 123", 15.49, 5, [1, 2, 3], category=["Service", "Subscription"])
+            + monthly("NETFLIX", 15.49, 7, [4], fmt="%Y-%m-%d", category=["Entertainment"])
+            + monthly("Coffee", 4.5, 10, [1, 1, 1])  # three times, but one month only
+            + monthly("Gym", 30.0, 1, [1, 2, 3])[:2] + monthly("Gym", 30.0, 20, [3])  # billing day drifts
+            + [{"name": "Refund", "amount": -15.49, "date": "2025-01-05"}, {"name": None, "amount": 1, "date": "x"}]
+        )
+        self.assertEqual(detect_recurring_transactions(transactions), [{
+            "name": "NETFLIX",
+            "category": "Entertainment",
+            "amount": 15.49,
+            "next_due": date(2025, 5, 6),
+        }])
+
+    def test_matches_rowwise_reference(self):
+        """Randomized histories with messy rows give exactly the row-wise output."""
+        transactions = random_history()
+        expected = detect_recurring_transactions_rowwise(transactions)
+        self.assertGreater(len(expected), 20)
+        self.assertEqual(detect_recurring_transactions(transactions), expected)
+        self.assertEqual(detect_recurring_transactions(pd.DataFrame(transactions)), expected)
+
+    def test_empty_inputs(self):
+        self.assertEqual(detect_recurring_transactions([]), [])
+        self.assertEqual(detect_recurring_transactions([{"name": "Rent"}]), [])
+
+
+class TestClusterAmounts(unittest.TestCase):
+    def test_sort_and_sweep(self):
+        """Amounts cluster per merchant within ±tolerance; long drifting chains are split."""
+        names = np.array([0, 0, 0, 1, 0, 0, 0])
+        amounts = np.array([100.0, 95.0, 110.0, 100.0, 300.0, 124.0, 140.0])
+        labels = cluster_amounts(names, amounts, tolerance=0.1)
+        # 95..140 is one chain of small steps, but only 95/100/110 fit ±10% of a centre; 124/140 start anew
+        self.assertEqual(len({labels[0], labels[1], labels[2]}), 1)
+        self.assertNotEqual(labels[0], labels[3])  # different merchant
+        self.assertEqual(labels[5], labels[6])
+        self.assertEqual(len(set(labels[[0, 4, 5]])), 3)
+
+        self.assertEqual(len(set(cluster_amounts(np.zeros(50, dtype=int), np.linspace(100, 200, 50), 0.1))), 4)
+
+
+class TestDetectRecurringSeries(unittest.TestCase):
+    def test_variable_amounts_and_cadences(self):
+        transactions = (
+            [{"name": "PG&E", "amount": amount, "date": f"2025-{month:02d}-1{month % 3}", "category": ["Utilities"]}
+             for month, amount in enumerate([82.1, 90.4, 77.9, 85.0, 95.3], start=1)]
+            + [{"name": "Gym", "amount": 12, "date": (date(2025, 1, 3) + timedelta(days=7 * week)).isoformat()}
+               for week in range(6)]
+            + [{"name": "Payroll fee", "amount": 2, "date": (date(2025, 1, 3) + timedelta(days=14 * k)).isoformat()}
+               for k in range(4)]
+            + [{"name": "Prime", "amount": 139, "date": f"202{year}-02-29" if year == 4 else f"202{year}-03-01"}
+               for year in (3, 4)]
+            + [{"name": "PG&E", "amount": 400, "date": "2025-03-20"}, {"name": "Coffee", "amount": 4, "date": "2025-01-01"}]
+        )
+        found = {r["name"]: r for r in detect_recurring_series(transactions)}
+
+        self.assertEqual(set(found), {"PG&E", "Gym", "Payroll fee", "Prime"})
+        self.assertEqual(found["PG&E"]["cadence"], "monthly")
+        self.assertEqual(found["PG&E"]["occurrences"], 5)
+        self.assertEqual(found["PG&E"]["amount"], 86.14)
+        self.assertEqual(found["PG&E"]["category"], "Utilities")
+        self.assertEqual(found["PG&E"]["next_due"], date(2025, 6, 11))
+        self.assertEqual((found["Gym"]["cadence"], found["Gym"]["next_due"]), ("weekly", date(2025, 2, 14)))
+        self.assertEqual(found["Payroll fee"]["cadence"], "biweekly")
+        self.assertEqual((found["Prime"]["cadence"], found["Prime"]["next_due"]), ("annual", date(2025, 2, 28)))
+        self.assertEqual((found["PG&E"]["billing_day"], found["Prime"]["billing_day"]), (11, 29))
+
+        # The exact-amount detector misses the utility bill entirely
+        self.assertNotIn("PG&E", {r["name"] for r in detect_recurring_transactions(transactions)})
+
+    def test_irregular_gaps_are_not_recurring(self):
+        days = [0, 3, 40, 41, 90, 200]
+        transactions = [{"name": "Hardware", "amount": 50, "date": (date(2025, 1, 1) + timedelta(days=d)).isoformat()}
+                        for d in days]
+        self.assertEqual(detect_recurring_series(transactions), [])
+        self.assertEqual(detect_recurring_series([]), [])
+
+
+
+class TestReminderSchedule(unittest.TestCase):
+    def setUp(self):
+        self.schedule = ReminderSchedule([
+            {"name": "Rent", "category": "Rent", "amount": 1200, "next_due": date(2025, 1, 31)},
+            {"name": "Gym", "category": "Health", "amount": 12, "next_due": date(2025, 2, 3), "cadence": "weekly"},
+            {"name": "Prime", "category": "Shopping", "amount": 139, "next_due": date(2024, 2, 29), "cadence": "annual"},
+        ], as_of=date(2025, 1, 1))
+
+    def test_projects_by_cadence_with_month_end_clamping(self):
+        due = [(r["due_date"], r["name"]) for r in self.schedule.due_between(date(2025, 2, 20), date(2025, 3, 31))]
+        self.assertEqual(due, [
+            ("2025-02-24", "Gym"), ("2025-02-28", "Rent"), ("2025-02-28", "Prime"),
+            ("2025-03-03", "Gym"), ("2025-03-10", "Gym"), ("2025-03-17", "Gym"), ("2025-03-24", "Gym"),
+            ("2025-03-31", "Rent"), ("2025-03-31", "Gym"),
+        ])  # same-day bills keep candidate order
+
+    def test_month_end_bills_keep_their_billing_day(self):
+        """A bill on the 31st due Feb 28 comes back to the 31st (or the month's last day) afterwards."""
+        schedule = ReminderSchedule([
+            {"name": "Rent", "category": "Rent", "amount": 1200, "next_due": date(2025, 2, 28), "billing_day": 31},
+            {"name": "Loan", "category": "Loan", "amount": 300, "next_due": date(2025, 2, 28), "billing_day": 30},
+            {"name": "Phone", "category": "Service", "amount": 40, "next_due": date(2025, 2, 28)},  # No billing_day
+        ], as_of=date(2025, 2, 1))
+        due = [(r["due_date"], r["name"]) for r in schedule.due_between(date(2025, 2, 1), date(2025, 4, 30))]
+        self.assertEqual(due, [
+            ("2025-02-28", "Rent"), ("2025-02-28", "Loan"), ("2025-02-28", "Phone"),
+            ("2025-03-28", "Phone"), ("2025-03-30", "Loan"), ("2025-03-31", "Rent"),
+            ("2025-04-28", "Phone"), ("2025-04-30", "Rent"), ("2025-04-30", "Loan"),
+        ])
+
+    def test_lapsed_series_are_not_projected(self):
+        """A subscription last charged long ago was cancelled; one a few days overdue is still due."""
+        schedule = ReminderSchedule([
+            {"name": "Old streaming", "category": "Service", "amount": 9.99, "next_due": date(2024, 7, 5)},
+            {"name": "Old gym", "category": "Health", "amount": 12, "next_due": date(2025, 5, 20), "cadence": "weekly"},
+            {"name": "Late rent", "category": "Rent", "amount": 1200, "next_due": date(2025, 5, 25)},
+            {"name": "Prime", "category": "Shopping", "amount": 139, "next_due": date(2025, 2, 28), "cadence": "annual"},
+        ], as_of=date(2025, 6, 8))
+        self.assertEqual([item["name"] for item in schedule.series], ["Late rent", "Prime"])
+        names = set(schedule.due_frame(date(2025, 6, 8), date(2026, 12, 31))["name"])
+        self.assertEqual(names, {"Late rent", "Prime"})
+
+    def test_long_horizons_extend_the_index(self):
+        prime = self.schedule.due_frame(date(2026, 1, 1), date(2030, 12, 31))
+        prime = prime[prime["name"] == "Prime"]["due_date"].dt.strftime("%Y-%m-%d").tolist()
+        self.assertEqual(prime, ["2026-02-28", "2027-02-28", "2028-02-29", "2029-02-28", "2030-02-28"])
+        self.assertEqual(self.schedule.count_between(date(2025, 1, 1), date(2025, 12, 31)), 12 + 48 + 1)
+
+    def test_matches_generate_bill_reminders_for_next_due(self):
+        """Within one cycle the schedule gives exactly the single-window reminders."""
+        today = date.today()
+        candidates = [
+            {"name": f"Bill {i}", "category": "Service", "amount": 10.0 + i, "next_due": today + timedelta(days=i)}
+            for i in range(10)
+        ]
+        self.assertEqual(ReminderSchedule(candidates).due_between(today, today + timedelta(days=5)),
+                         generate_bill_reminders(candidates, days_ahead=5))
+        self.assertEqual(ReminderSchedule([]).due_between(today, today + timedelta(days=5)), [])
+
+
+def ai_reply(*names):
+    response = MagicMock()
+    response.choices[0].message.content = "\n".join(f"- {name}" for name in names)
+    return response
+
+
+@patch("backend.utils.notifications.Config.get_openai_api_key", return_value="fake-key")
+@patch("backend.utils.notifications.OpenAI")
+class TestFilterImportantRecurring(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = MerchantCache(Path(self.tmp.name) / "importance.json")
+        self.candidates = [
+            {"name": "Netflix", "amount": 15.49, "next_due": date(2025, 5, 5)},
+            {"name": "Starbucks", "amount": 4.5, "next_due": date(2025, 5, 6)},
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeat_visits_make_no_llm_calls(self, mock_openai, mock_key):
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = ai_reply("Netflix")
+
+        self.assertEqual(filter_important_recurring(self.candidates, self.cache), self.candidates[:1])
+        self.assertEqual(filter_important_recurring(self.candidates, self.cache), self.candidates[:1])
+        self.assertEqual(create.call_count, 1)
+
+    def test_cache_hits_do_not_rewrite_the_file(self, mock_openai, mock_key):
+        mock_openai.return_value.chat.completions.create.return_value = ai_reply("Netflix")
+        filter_important_recurring(self.candidates, self.cache)
+        with patch.object(self.cache, "_save") as save:
+            filter_important_recurring(self.candidates, self.cache)
+        save.assert_not_called()
+
+    def test_only_unseen_merchants_are_sent_in_one_prompt(self, mock_openai, mock_key):
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = ai_reply("Netflix")
+        filter_important_recurring(self.candidates, self.cache)
+
+        create.return_value = ai_reply("COMCAST")
+        more = self.candidates + [
+            {"name": "Comcast", "amount": 80, "next_due": date(2025, 5, 9)},
+            {"name": "NET-FLIX", "amount": 15.49, "next_due": date(2025, 5, 5)},  # same merchant key
+        ]
+        result = filter_important_recurring(more, self.cache)
+
+        self.assertEqual([r["name"] for r in result], ["Netflix", "Comcast", "NET-FLIX"])
+        prompt = create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("Comcast", prompt)
+        self.assertNotIn("Starbucks", prompt)
+
+    def test_failure_keeps_unseen_without_caching(self, mock_openai, mock_key):
+        create = mock_openai.return_value.chat.completions.create
+        create.side_effect = Exception("Boom")
+        with patch("builtins.print"):
+            self.assertEqual(filter_important_recurring(self.candidates, self.cache), self.candidates)
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
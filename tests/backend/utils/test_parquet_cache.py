@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+from backend.utils import parquet_cache
+
+
+class TestParquetCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patcher = patch("backend.utils.parquet_cache.Config.get_data_dir", return_value=Path(self.tmp_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        parquet_cache.write_transactions("user_1", [
+            {"transaction_id": "t1", "date": "Wed, 15 Jan 2025 00:00:00 GMT", "amount": 15.99,
+             "category": ["Service"], "account_id": "acc_1", "name": "Netflix", "source": "plaid"},
+            {"transaction_id": "t2", "date": "2025-02-03", "amount": 20.0,
+             "category": "Travel", "account_id": "acc_2", "name": "Uber", "source": "plaid"},
+            {"transaction_id": "t3", "date": "2025-02-20 12:00:00", "amount": 8.5,
+             "category": [], "account_id": "manual_upload", "name": "Cafe", "source": "manual_upload"},
+        ])
+
+    def test_partitions_by_month(self):
+        """Each month gets its own partition directory."""
+        self.assertEqual(parquet_cache.list_months("user_1"), ["2025-01", "2025-02"])
+        partition = Path(self.tmp_dir.name) / "parquet" / "user_1" / "year_month=2025-02" / "part-0.parquet"
+        self.assertTrue(partition.exists())
+
+    def test_reads_only_requested_columns_and_months(self):
+        """Column projection and month pruning are applied."""
+        df = parquet_cache.read_transactions("user_1", columns=["amount", "category"], months=["2025-02"])
+        self.assertEqual(list(df.columns), ["amount", "category"])
+        self.assertEqual(sorted(df["amount"].tolist()), [8.5, 20.0])
+        self.assertIn("Uncategorized", df["category"].tolist())
+
+    def test_filters_accounts(self):
+        """Account filtering works even when account_id is not a returned column."""
+        df = parquet_cache.read_transactions("user_1", columns=["amount"], account_ids=["acc_1", "manual_upload"])
+        self.assertEqual(list(df.columns), ["amount"])
+        self.assertEqual(sorted(df["amount"].tolist()), [8.5, 15.99])
+
+    def test_upsert_replaces_existing_rows(self):
+        """Writing an existing transaction_id replaces the cached row."""
+        parquet_cache.write_transactions("user_1", [
+            {"transaction_id": "t2", "date": "2025-02-03", "amount": 25.0, "account_id": "acc_2"}
+        ])
+        df = parquet_cache.read_transactions("user_1", columns=["amount"], account_ids=["acc_2"])
+        self.assertEqual(df["amount"].tolist(), [25.0])
+
+    def test_upsert_moves_rows_across_months(self):
+        """A transaction whose date moved to another month leaves no copy in the old partition."""
+        version = parquet_cache.cache_version("user_1")
+        parquet_cache.write_transactions("user_1", [
+            {"transaction_id": "t1", "date": "2025-02-01", "amount": 15.99, "account_id": "acc_1"}
+        ])
+        df = parquet_cache.read_transactions("user_1", columns=["transaction_id", "date"])
+        self.assertEqual(df["transaction_id"].tolist().count("t1"), 1)
+        self.assertEqual(parquet_cache.read_transactions("user_1", months=["2025-01"]).shape[0], 0)
+        self.assertNotEqual(parquet_cache.cache_version("user_1"), version)
+
+    def test_remove_transactions(self):
+        """Removed ids disappear from whichever partition held them."""
+        self.assertEqual(parquet_cache.remove_transactions("user_1", ["t1", {"transaction_id": "t3"}]), 2)
+        df = parquet_cache.read_transactions("user_1", columns=["amount"])
+        self.assertEqual(df["amount"].tolist(), [20.0])
+
+    def test_cache_version_moves_on_writes(self):
+        """Upserts and removals change the version; reads don't."""
+        version = parquet_cache.cache_version("user_1")
+        parquet_cache.read_transactions("user_1")
+        self.assertEqual(parquet_cache.cache_version("user_1"), version)
+
+        parquet_cache.write_transactions("user_1", [
+            {"transaction_id": "t2", "date": "2025-02-03", "amount": 25.0, "account_id": "acc_2"}
+        ])
+        updated = parquet_cache.cache_version("user_1")
+        self.assertNotEqual(updated, version)
+        parquet_cache.remove_transactions("user_1", ["t1"])
+        self.assertNotEqual(parquet_cache.cache_version("user_1"), updated)
+        self.assertEqual(parquet_cache.cache_version("nobody"), ())
+
+    def test_unknown_user_is_empty(self):
+        """Reading a user with no cache returns an empty frame with the requested columns."""
+        df = parquet_cache.read_transactions("nobody", columns=["date", "amount"])
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), ["date", "amount"])
+
+
+if __name__ == "__main__":
+    unittest.main()
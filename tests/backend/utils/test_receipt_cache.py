@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from pathlib import Path
+from PIL import Image
+from backend.utils.receipt_cache import ReceiptCache, receipt_key
+
+
+def image_bytes(color, fmt="PNG", size=(40, 60)):
+    buf = BytesIO()
+    Image.new("RGB", size, color=color).save(buf, format=fmt)
+    buf.seek(0)
+    return buf
+
+
+def result(vendor, text_size=0):
+    return {"text": "x" * text_size, "vendor": vendor, "amount": 1.0, "date": "2025-04-10", "category": "Food"}
+
+
+def directory_size(directory):
+    return sum(path.stat().st_size for path in directory.glob("*.json"))
+
+
+class TestReceiptKey(unittest.TestCase):
+    def test_same_pixels_same_key(self):
+        png = image_bytes("white", "PNG")
+        bmp = image_bytes("white", "BMP")
+        self.assertEqual(receipt_key(png), receipt_key(bmp))
+        self.assertNotEqual(receipt_key(image_bytes("white")), receipt_key(image_bytes("black")))
+        self.assertNotEqual(receipt_key(image_bytes("white", size=(60, 40))), receipt_key(image_bytes("white")))
+
+    def test_rewinds_file_objects(self):
+        buf = image_bytes("white")
+        receipt_key(buf)
+        self.assertEqual(buf.tell(), 0)
+        Image.open(buf).load()  # Still readable by the pipeline
+
+
+class TestReceiptCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name) / "receipts"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_persists_and_counts_hits(self):
+        cache = ReceiptCache(self.directory)
+        cache.set("abc", result("Cafe"))
+
+        reloaded = ReceiptCache(self.directory)
+        self.assertEqual(reloaded.get("abc"), result("Cafe"))
+        self.assertIsNone(reloaded.get("def"))
+        self.assertEqual(reloaded.stats()["hits"], 1)
+        self.assertEqual(reloaded.stats()["misses"], 1)
+        self.assertEqual(reloaded.stats()["entries"], 1)
+
+    def test_size_based_lru_eviction(self):
+        entry_size = len(json.dumps(result("a", 100)).encode())
+        cache = ReceiptCache(self.directory, max_bytes=entry_size * 2)
+        cache.set("a", result("a", 100))
+        cache.set("b", result("b", 100))
+        cache.get("a")
+        cache.set("c", result("c", 100))
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertFalse((self.directory / "b.json").exists())
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes)
+
+    def test_reload_keeps_lru_order(self):
+        cache = ReceiptCache(self.directory)
+        cache.set("old", result("old"))
+        cache.set("new", result("new"))
+        os.utime(self.directory / "old.json", (1_000, 1_000))
+        os.utime(self.directory / "new.json", (2_000, 2_000))
+
+        reloaded = ReceiptCache(self.directory, max_bytes=directory_size(self.directory))
+        reloaded.set("newest", result("newest"))
+        self.assertNotIn("old", reloaded)
+        self.assertIn("newest", reloaded)
+
+    def test_overwrite_updates_size(self):
+        cache = ReceiptCache(self.directory)
+        cache.set("a", result("a", 500))
+        cache.set("a", result("a"))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.total_bytes, (self.directory / "a.json").stat().st_size)
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = ReceiptCache(self.directory)
+        cache.set("a", result("a"))
+        (self.directory / "a.json").write_text("{not json")
+        self.assertIsNone(cache.get("a"))
+        self.assertNotIn("a", cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,24 +7,43 @@ from backend.utils.receipt_parser import (
     extract_receipt_fields,
     categorize_transaction,
     add_transaction_to_state,
+    process_receipt,
+    process_receipts,
 )
+from backend.utils.receipt_cache import ReceiptCache, receipt_key
+from PIL import Image
+import tempfile
+import threading
+import time
+
+
+def receipt_image(color, fmt="PNG"):
+    buf = BytesIO()
+    Image.new("RGB", (40, 60), color=color).save(buf, format=fmt)
+    buf.seek(0)
+    return buf
+
 
 class TestReceiptParser(unittest.TestCase):
     @patch("backend.utils.receipt_parser.OpenAI")
-    @patch("backend.utils.receipt_parser.Image.open")
-    def test_extract_text_from_image(self, mock_image_open, mock_openai):
+    @patch("backend.utils.receipt_parser.preprocess_receipt")
+    def test_extract_text_from_image(self, mock_preprocess, mock_openai):
         """Test extracting text from an image."""
-        mock_image = MagicMock()
-        mock_image_open.return_value = mock_image
+        mock_preprocess.return_value = (b"jpeg-bytes", "image/jpeg", {"output_bytes": 10})
         mock_openai.return_value.chat.completions.create.return_value.choices = [
             MagicMock(message=MagicMock(content="Mocked Store\nTotal: $20.00\nDate: 2025-04-10"))
         ]
 
-        with patch("backend.utils.receipt_parser.BytesIO", return_value=BytesIO()):
-            result = extract_text_from_image("mock_image_path")
-            self.assertIn("Mocked Store", result)
-            self.assertIn("Total: $20.00", result)
-            self.assertIn("Date: 2025-04-10", result)
+        stats = {}
+        result = extract_text_from_image("mock_image_path", stats=stats)
+        self.assertIn("Mocked Store", result)
+        self.assertIn("Total: $20.00", result)
+        self.assertIn("Date: 2025-04-10", result)
+
+        # The preprocessed payload is what gets sent, with its own mime type
+        content = mock_openai.return_value.chat.completions.create.call_args.kwargs["messages"][0]["content"]
+        self.assertTrue(content[1]["image_url"]["url"].startswith("data:image/jpeg;base64,"))
+        self.assertEqual(stats, {"output_bytes": 10})
 
     def test_extract_receipt_fields(self):
         """Test extracting fields from receipt text."""
@@ -64,5 +83,105 @@ class TestReceiptParser(unittest.TestCase):
         self.assertEqual(transaction["amount"], amount)
         self.assertEqual(transaction["transaction_id"], transaction_id)
 
+class TestProcessReceipts(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def fake_process(self, image):
+        """Stand-in for process_receipt that records how many calls overlap."""
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        if image == "bad":
+            raise ValueError("unreadable image")
+        return {"vendor": image}
+
+    @patch("backend.utils.receipt_parser.categorize_transaction", return_value="Food")
+    @patch("backend.utils.receipt_parser.extract_receipt_fields", return_value=("Cafe", 4.5, "2025-04-10"))
+    @patch("backend.utils.receipt_parser.extract_text_from_image", return_value="Cafe\nTotal: $4.50")
+    def test_process_receipt(self, mock_text, mock_fields, mock_categorize):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ReceiptCache(tmp)
+            result = process_receipt(receipt_image("white"), cache=cache)
+            self.assertEqual(result, {
+                "text": "Cafe\nTotal: $4.50", "vendor": "Cafe", "amount": 4.5, "date": "2025-04-10", "category": "Food"
+            })
+            mock_categorize.assert_called_once_with("Cafe", "Cafe\nTotal: $4.50")
+
+            # Same pixels again: served from the cache without another vision call
+            self.assertEqual(process_receipt(receipt_image("white"), cache=cache), result)
+            self.assertEqual(mock_text.call_count, 1)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    @patch("backend.utils.receipt_parser.categorize_transaction", return_value="Food")
+    @patch("backend.utils.receipt_parser.extract_text_from_image", return_value="Cafe\nTotal: $4.50")
+    def test_category_and_fallback_date_are_not_cached(self, mock_text, mock_categorize):
+        """A corrected category and today's date apply to a cached receipt on the next upload."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ReceiptCache(tmp)
+            with patch("backend.utils.receipt_parser.datetime") as mock_datetime:
+                mock_datetime.now.return_value = datetime(2025, 4, 10, 9, 30)
+                first = process_receipt(receipt_image("white"), cache=cache)
+
+                mock_categorize.return_value = "Coffee"  # e.g. after the user corrected it
+                mock_datetime.now.return_value = datetime(2025, 4, 12, 8, 0)
+                second = process_receipt(receipt_image("white"), cache=cache)
+
+            self.assertEqual(mock_text.call_count, 1)
+            self.assertEqual((first["category"], second["category"]), ("Food", "Coffee"))
+            self.assertEqual(first["date"], "Thu, 10 Apr 2025 09:30:00 GMT")
+            self.assertEqual(second["date"], "Sat, 12 Apr 2025 08:00:00 GMT")
+            self.assertEqual(cache.get(receipt_key(receipt_image("white"))), {
+                "text": "Cafe\nTotal: $4.50", "vendor": "Cafe", "amount": 4.5, "date": None
+            })
+
+    @patch("backend.utils.receipt_parser.categorize_transaction", return_value="Uncategorized")
+    @patch("backend.utils.receipt_parser.extract_text_from_image", return_value="Error with OpenAI Vision API: timeout")
+    def test_vision_errors_are_not_cached(self, mock_text, mock_categorize):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ReceiptCache(tmp)
+            process_receipt(receipt_image("white"), cache=cache)
+            process_receipt(receipt_image("white"), cache=cache)
+            self.assertEqual(mock_text.call_count, 2)
+            self.assertEqual(len(cache), 0)
+
+    def test_results_keep_input_order(self):
+        images = [f"receipt-{i}" for i in range(10)]
+        with patch("backend.utils.receipt_parser.process_receipt", side_effect=self.fake_process):
+            results = process_receipts(images, max_workers=4)
+        self.assertEqual([r["vendor"] for r in results], images)
+
+    def test_worker_limit(self):
+        with patch("backend.utils.receipt_parser.process_receipt", side_effect=self.fake_process):
+            process_receipts([f"receipt-{i}" for i in range(12)], max_workers=3)
+        self.assertGreater(self.peak, 1)
+        self.assertLessEqual(self.peak, 3)
+
+    def test_failure_is_isolated(self):
+        with patch("backend.utils.receipt_parser.process_receipt", side_effect=self.fake_process):
+            results = process_receipts(["a", "bad", "c"], max_workers=2)
+        self.assertEqual(results[0], {"vendor": "a"})
+        self.assertEqual(results[1], {"error": "unreadable image"})
+        self.assertEqual(results[2], {"vendor": "c"})
+
+    def test_progress_callback(self):
+        calls = []
+        caller = threading.get_ident()
+        progress = lambda done, total, index, result: calls.append((done, total, index, threading.get_ident()))
+        with patch("backend.utils.receipt_parser.process_receipt", side_effect=self.fake_process):
+            process_receipts(["a", "b", "c", "d"], max_workers=2, on_progress=progress)
+        self.assertEqual([c[0] for c in calls], [1, 2, 3, 4])
+        self.assertTrue(all(c[1] == 4 for c in calls))
+        self.assertEqual(sorted(c[2] for c in calls), [0, 1, 2, 3])
+        self.assertTrue(all(c[3] == caller for c in calls))
+
+    def test_empty_batch(self):
+        self.assertEqual(process_receipts([]), [])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
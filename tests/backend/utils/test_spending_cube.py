@@ -0,0 +1,125 @@
+import random
+import unittest
+import pandas as pd
+from backend.utils.budget import aggregate_monthly_expenses
+from backend.utils.spending_cube import SpendingCube, get_spending_cube
+from backend.utils.transaction_sync import mark_transactions_changed
+
+
+def tx(transaction_id, date, amount, category="Food and Drink", account_id="acc_1", source="plaid"):
+    return {"transaction_id": transaction_id, "date": date, "amount": amount, "category": [category],
+            "account_id": account_id, "source": source}
+
+
+def random_history(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        tx(f"t{i}", f"Mon, {rng.randint(1, 28):02d} {rng.choice(['Jan', 'Feb', 'Mar'])} 2024 00:00:00 GMT",
+           round(rng.uniform(-50, 200), 2), rng.choice(["Food and Drink", "Travel", "Shops"]),
+           rng.choice(["acc_1", "acc_2", "acc_3"]))
+        for i in range(n)
+    ]
+
+
+class TestSpendingCube(unittest.TestCase):
+    def test_rollups_match_groupby(self):
+        history = random_history(2000)
+        cube = SpendingCube()
+        cube.add(history)
+        self.assertLess(cube.n_cells, len(history))
+
+        df = pd.DataFrame(history)
+        df["category"] = df["category"].str[0]
+        df["date"] = pd.to_datetime(df["date"], format="%a, %d %b %Y %H:%M:%S GMT")
+        selected = df[df["account_id"].isin(["acc_1", "acc_2"])]
+
+        by_category = cube.rollup("category", account_ids=["acc_1", "acc_2"])
+        expected = selected.groupby("category")["amount"].sum()
+        pd.testing.assert_series_equal(by_category.set_index("category")["amount"], expected, check_exact=False)
+
+        by_day = cube.rollup("date", account_ids=["acc_1", "acc_2"])
+        expected = selected.groupby("date")["amount"].sum()
+        pd.testing.assert_series_equal(by_day.set_index("date")["amount"], expected, check_exact=False, check_index_type=False)
+
+    def test_monthly_abs_matches_budget_aggregation(self):
+        history = random_history(500)
+        cube = SpendingCube()
+        cube.add(history)
+        rolled = {(row.month, row.category): row.abs_amount
+                  for row in cube.rollup(["month", "category"]).itertuples()}
+        expected = {(month, category): total for month, category, total in aggregate_monthly_expenses(history)}
+        self.assertEqual(rolled.keys(), expected.keys())
+        for cell, total in expected.items():
+            self.assertAlmostEqual(rolled[cell], total, places=6)
+
+    def test_updates_and_removals(self):
+        cube = SpendingCube()
+        cube.add([tx("t1", "2024-01-05", 10.0), tx("t2", "2024-01-05", 2.5)])
+        cube.add([tx("t1", "2024-01-05", 4.0, category="Travel")])  # Modified: moves to another cell
+        cube.remove([{"transaction_id": "t2"}, "missing"])
+        totals = cube.rollup("category")
+        self.assertEqual(totals.to_dict(orient="records"),
+                         [{"category": "Travel", "amount": 4.0, "abs_amount": 4.0, "count": 1}])
+        self.assertEqual(len(cube), 1)
+
+    def test_filters(self):
+        cube = SpendingCube()
+        cube.add([
+            tx("t1", "2024-01-05", 10.0, account_id="acc_1"),
+            tx("t2", "2024-01-20", 5.0, account_id="manual_upload", source="manual_upload"),
+            tx("t3", "2024-02-01", 7.0, account_id="acc_2"),
+            {"transaction_id": "t4", "date": None, "amount": 1.0},  # No date: not counted
+        ])
+        self.assertEqual(cube.rollup("source", account_ids=["acc_1"], sources=["manual_upload"])["amount"].sum(), 15.0)
+        self.assertEqual(cube.rollup("month", start="2024-01-10", end="2024-02-01")["amount"].tolist(), [5.0, 7.0])
+        self.assertTrue(cube.rollup("category", account_ids=["nobody"]).empty)
+        with self.assertRaises(ValueError):
+            cube.rollup("weekday")
+
+    def test_sync_only_touches_changes(self):
+        history = random_history(300)
+        cube = SpendingCube()
+        self.assertEqual(cube.sync(history), 300)
+        changed = history[:-1] + [dict(history[0], transaction_id="new")]
+        changed[1] = dict(changed[1], amount=1.0)
+        self.assertEqual(cube.sync(changed), 2)
+
+        fresh = SpendingCube()
+        fresh.add(changed)
+        pd.testing.assert_frame_equal(cube.rollup(["date", "category", "account_id"]),
+                                      fresh.rollup(["date", "category", "account_id"]))
+
+    def test_sync_sees_in_place_edits(self):
+        history = random_history(50)
+        cube = SpendingCube()
+        cube.sync(history)
+        history[3]["amount"] += 100.0  # Same object, same length: only the content changed
+        history[4]["category"] = ["Rent"]
+        self.assertEqual(cube.sync(history), 2)
+        fresh = SpendingCube()
+        fresh.add(history)
+        pd.testing.assert_frame_equal(cube.rollup("category"), fresh.rollup("category"))
+
+    def test_get_spending_cube_follows_the_change_log(self):
+        state = {"transactions": [tx("t1", "2024-01-05", 10.0)]}
+        mark_transactions_changed(state, reset=True)
+        cube = get_spending_cube(state, state["transactions"])
+        self.assertIs(get_spending_cube(state, state["transactions"]), cube)
+
+        # Deltas logged at the mutation sites are replayed, not resynced from the list
+        added = tx("t2", "2024-01-06", 5.0)
+        state["transactions"].append(added)
+        mark_transactions_changed(state, upserted=[added])
+        self.assertEqual(get_spending_cube(state, state["transactions"]).rollup("category")["amount"].tolist(), [15.0])
+
+        state["transactions"] = [tx("t2", "2024-01-06", 7.0)]  # Same length, new contents
+        mark_transactions_changed(state, upserted=state["transactions"], removed=["t1"])
+        self.assertEqual(get_spending_cube(state, state["transactions"]).rollup("category")["amount"].tolist(), [7.0])
+
+        state["transactions"] = [tx("t3", "2024-02-01", 1.0)]
+        mark_transactions_changed(state, reset=True)
+        totals = get_spending_cube(state, state["transactions"]).rollup("month")
+        self.assertEqual(totals[["month", "amount"]].values.tolist(), [["2024-02", 1.0]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from datetime import date
+from backend.utils.transaction import Transaction, to_cents, to_day, to_transactions
+
+
+def plaid_tx(**overrides):
+    tx = {
+        "transaction_id": "t1", "account_id": "acc_1", "date": date(2025, 1, 15), "name": "NETFLIX.COM",
+        "merchant_name": "Netflix", "amount": 15.99, "category": ["Service", "Subscription"],
+        "pending": False, "iso_currency_code": "USD", "location": {"city": None}, "payment_channel": "online",
+    }
+    tx.update(overrides)
+    return tx
+
+
+class TestConverters(unittest.TestCase):
+    def test_from_plaid(self):
+        record = Transaction.from_plaid(plaid_tx())
+        self.assertEqual(record.transaction_id, "t1")
+        self.assertEqual(record.amount_cents, 1599)
+        self.assertEqual(record.amount, 15.99)
+        self.assertEqual(record.date, date(2025, 1, 15))
+        self.assertEqual(record.category, "Service")
+        self.assertEqual((record.name, record.merchant, record.source), ("NETFLIX.COM", "Netflix", "plaid"))
+
+    def test_plaid_json_round_trip(self):
+        # After Flask's jsonify the date arrives as an RFC 1123 string
+        record = Transaction.from_plaid(plaid_tx(date="Wed, 15 Jan 2025 00:00:00 GMT", amount="15.99"))
+        self.assertEqual(record, Transaction.from_plaid(plaid_tx()))
+
+    def test_from_receipt(self):
+        tx = {"transaction_id": "r1", "date": "2025-02-20 12:00:00", "name": "Corner Cafe", "merchant_name": "Corner Cafe",
+              "amount": 8.5, "category": ["Food and Drink"], "source": "manual_upload", "account_id": "manual_upload",
+              "account_name": "Receipt Transactions"}
+        record = Transaction.from_dict(tx)
+        self.assertEqual((record.day, record.amount_cents, record.category), (date(2025, 2, 20).toordinal(), 850, "Food and Drink"))
+        self.assertEqual(record.to_dict(), {**tx, "date": "2025-02-20"})
+
+    def test_missing_fields(self):
+        record = Transaction.from_dict({"name": "Cash", "amount": "n/a", "category": []})
+        self.assertEqual((record.transaction_id, record.day, record.amount_cents, record.category), (None, None, 0, None))
+        self.assertEqual(record.to_dict()["category"], ["Uncategorized"])
+
+    def test_strings_are_interned(self):
+        a, b = to_transactions([plaid_tx(account_id="".join(["acc", "_1"])), plaid_tx(transaction_id="t2")])
+        self.assertIs(a.account_id, b.account_id)
+        self.assertIs(a.category, b.category)
+        self.assertIs(to_transactions([a])[0], a)  # Records pass through unchanged
+
+    def test_hashable(self):
+        """Equal records hash alike, so they can go in sets and dict keys."""
+        a, b = Transaction.from_plaid(plaid_tx()), Transaction.from_plaid(plaid_tx(date="2025-01-15"))
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(len({a, b, Transaction.from_plaid(plaid_tx(amount=1.0))}), 2)
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            Transaction.from_plaid(plaid_tx()).extra = 1
+
+
+class TestHelpers(unittest.TestCase):
+    def test_to_cents_rounds(self):
+        self.assertEqual([to_cents(v) for v in (0.1 + 0.2, "12.345", -3, None)], [30, 1234, -300, 0])
+
+    def test_to_day_formats(self):
+        expected = date(2024, 3, 5).toordinal()
+        for value in ("Tue, 05 Mar 2024 00:00:00 GMT", "2024-03-05", "2024-03-05 18:00:00", "March 5, 2024", date(2024, 3, 5)):
+            self.assertEqual(to_day(value), expected, value)
+        self.assertIsNone(to_day("soon"))
+        self.assertIsNone(to_day(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
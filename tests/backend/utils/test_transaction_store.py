@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import date
+from backend.utils.transaction_store import TransactionStore, to_iso_date
+
+
+class TestTransactionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "transactions.db")
+        self.store = TransactionStore(self.path)
+        self.store.upsert([
+            {"transaction_id": "t1", "account_id": "acc_1", "date": "Wed, 15 Jan 2025 00:00:00 GMT",
+             "name": "Netflix", "amount": 15.99, "category": ["Service"], "source": "plaid"},
+            {"transaction_id": "t2", "account_id": "acc_1", "date": date(2025, 2, 3),
+             "name": "Uber", "amount": 20.0, "category": ["Travel"], "source": "plaid"},
+            {"transaction_id": "t3", "account_id": "acc_2", "date": "2025-02-20",
+             "name": "Shell", "amount": 40.0, "category": ["Travel"], "source": "plaid"},
+            {"transaction_id": "r1", "account_id": "manual_upload", "date": "2025-02-10 12:30:00",
+             "name": "Corner Cafe", "amount": 8.5, "category": ["Food and Drink"], "source": "manual_upload"},
+        ])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_uses_wal_and_indexes(self):
+        """The database runs in WAL mode with the expected indexes."""
+        conn = sqlite3.connect(self.path)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_transactions_account_date", indexes)
+        self.assertIn("idx_transactions_merchant_amount", indexes)
+        conn.close()
+
+    def test_query_by_account_and_date_range(self):
+        """Only the requested slice comes back, newest first."""
+        rows = self.store.query(account_ids=["acc_1"], start_date="2025-02-01", end_date="2025-02-28")
+        self.assertEqual([tx["transaction_id"] for tx in rows], ["t2"])
+
+    def test_query_includes_sources(self):
+        """Receipt transactions can be pulled in alongside selected accounts."""
+        rows = self.store.query(account_ids=["acc_2"], sources=["manual_upload"])
+        self.assertEqual([tx["transaction_id"] for tx in rows], ["t3", "r1"])
+
+    def test_payload_round_trips(self):
+        """Stored payloads keep their original fields, with dates serialized like the API."""
+        row = self.store.query(account_ids=["acc_1"], start_date="2025-02-03", end_date="2025-02-03")[0]
+        self.assertEqual(row["date"], "Mon, 03 Feb 2025 00:00:00 GMT")
+        self.assertEqual(row["category"], ["Travel"])
+
+    def test_upsert_replaces_and_delete_removes(self):
+        """Upserting an existing id replaces it and delete accepts Plaid's removed dicts."""
+        self.store.upsert([{"transaction_id": "t1", "account_id": "acc_1", "date": "2025-01-15", "amount": 17.99}])
+        self.store.delete([{"transaction_id": "t3"}])
+        rows = {tx["transaction_id"]: tx for tx in self.store.query()}
+        self.assertEqual(rows["t1"]["amount"], 17.99)
+        self.assertNotIn("t3", rows)
+        self.assertEqual(self.store.count(), 3)
+
+    def test_data_survives_reopen(self):
+        """A new store on the same file sees previously written rows."""
+        self.assertEqual(TransactionStore(self.path).count(), 4)
+
+    def test_writes_from_other_threads(self):
+        """Each thread gets its own connection."""
+        def write():
+            self.store.upsert([{"transaction_id": "t_thread", "account_id": "acc_3", "date": "2025-03-01", "amount": 1}])
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(self.store.query(account_ids=["acc_3"])), 1)
+
+    def test_to_iso_date_formats(self):
+        """Known date formats normalize to ISO dates."""
+        self.assertEqual(to_iso_date("Wed, 15 Jan 2025 00:00:00 GMT"), "2025-01-15")
+        self.assertEqual(to_iso_date("2025-01-15 08:00:00"), "2025-01-15")
+        self.assertIsNone(to_iso_date("not a date"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from backend.utils.transaction_sync import (
+    CHANGE_LOG_LIMIT, CursorStore, apply_transaction_changes, mark_transactions_changed, transaction_changes_since,
+)
+
+
+class TestCursorStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cursors.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_cursor_persists_across_instances(self):
+        """A saved cursor is visible to a fresh store reading the same file."""
+        CursorStore(self.path).set("user_1", "ins_1", "cursor_abc")
+        self.assertEqual(CursorStore(self.path).get("user_1", "ins_1"), "cursor_abc")
+
+    def test_missing_cursor_is_none(self):
+        """Unknown users and items have no cursor."""
+        store = CursorStore(self.path)
+        self.assertIsNone(store.get("user_1", "ins_1"))
+
+    def test_reset_single_item(self):
+        """Resetting one item leaves the user's other cursors alone."""
+        store = CursorStore(self.path)
+        store.set("user_1", "ins_1", "a")
+        store.set("user_1", "ins_2", "b")
+        store.reset("user_1", "ins_1")
+        self.assertIsNone(store.get("user_1", "ins_1"))
+        self.assertEqual(store.get("user_1", "ins_2"), "b")
+
+    def test_corrupt_file_starts_empty(self):
+        """A corrupt store file is ignored rather than crashing the backend."""
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        self.assertIsNone(CursorStore(self.path).get("user_1", "ins_1"))
+
+
+class TestApplyTransactionChanges(unittest.TestCase):
+    def test_added_modified_and_removed(self):
+        """Deltas are upserted by transaction_id and removals are dropped."""
+        existing = [
+            {"transaction_id": "t1", "amount": 10},
+            {"transaction_id": "t2", "amount": 20},
+            {"name": "CSV row without id", "amount": 5},
+        ]
+        result = apply_transaction_changes(
+            existing,
+            added=[{"transaction_id": "t3", "amount": 30}],
+            modified=[{"transaction_id": "t1", "amount": 11}],
+            removed=["t2"]
+        )
+        self.assertEqual(
+            [(tx.get("transaction_id"), tx["amount"]) for tx in result],
+            [("t1", 11), (None, 5), ("t3", 30)]
+        )
+
+    def test_removed_accepts_plaid_dicts(self):
+        """Removed entries may be Plaid's {'transaction_id': ...} dicts."""
+        result = apply_transaction_changes(
+            [{"transaction_id": "t1"}],
+            removed=[{"transaction_id": "t1", "account_id": "acc"}]
+        )
+        self.assertEqual(result, [])
+
+    def test_does_not_mutate_input(self):
+        """The original list is left untouched."""
+        existing = [{"transaction_id": "t1"}]
+        apply_transaction_changes(existing, removed=["t1"])
+        self.assertEqual(existing, [{"transaction_id": "t1"}])
+
+
+class TestTransactionChangeLog(unittest.TestCase):
+    def test_deltas_since_version(self):
+        state = {}
+        self.assertEqual(transaction_changes_since(state, 0), [])
+        mark_transactions_changed(state, upserted=[{"transaction_id": "t1"}])
+        version = mark_transactions_changed(state, removed=["t1"])
+        self.assertEqual(version, 2)
+        self.assertEqual(transaction_changes_since(state, 0), [([{"transaction_id": "t1"}], []), ([], ["t1"])])
+        self.assertEqual(transaction_changes_since(state, 1), [([], ["t1"])])
+        self.assertEqual(transaction_changes_since(state, 2), [])
+
+    def test_reset_and_trimmed_log_cannot_be_replayed(self):
+        state = {}
+        mark_transactions_changed(state, upserted=[{"transaction_id": "t1"}])
+        mark_transactions_changed(state, reset=True)
+        mark_transactions_changed(state, removed=["t1"])
+        self.assertIsNone(transaction_changes_since(state, 1))
+        self.assertEqual(transaction_changes_since(state, 2), [([], ["t1"])])
+
+        for _ in range(CHANGE_LOG_LIMIT):
+            mark_transactions_changed(state, removed=["t1"])
+        self.assertIsNone(transaction_changes_since(state, 2))
+        self.assertIsNone(transaction_changes_since(state, 99999))  # Version from another session
+
+
+if __name__ == "__main__":
+    unittest.main()
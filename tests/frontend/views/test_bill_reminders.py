@@ -0,0 +1,86 @@
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from frontend.views import BillReminders as br
+from backend.utils.notifications import detect_recurring_series
+
+
+class FixedDate(date):
+    @classmethod
+    def today(cls):
+        return cls(2025, 6, 8)
+
+
+def utility_and_gym_history():
+    # A utility bill whose amount changes every month, and a weekly gym fee
+    utility = [
+        {"transaction_id": f"pge{month}", "name": "PG&E", "amount": amount, "date": f"2025-{month:02d}-10",
+         "category": ["Utilities"]}
+        for month, amount in enumerate([82.1, 90.4, 77.9, 85.0, 95.3], start=1)
+    ]
+    gym = [
+        {"transaction_id": f"gym{week}", "name": "Gym", "amount": 12, "category": ["Health"],
+         "date": (date(2025, 4, 25) + timedelta(days=7 * week)).isoformat()}
+        for week in range(7)
+    ]
+    return utility + gym
+
+
+@patch("frontend.views.BillReminders.date", FixedDate)
+@patch("frontend.views.BillReminders.filter_important_recurring", side_effect=lambda candidates: candidates)
+@patch("frontend.views.BillReminders.get_notification_store")
+@patch("frontend.views.BillReminders.st")
+class TestShowBillReminders(unittest.TestCase):
+    def setUp(self):
+        self.session_state = {"transactions": utility_and_gym_history(), "transactions_version": 1}
+
+    def run_view(self, mock_st, mock_store):
+        mock_store.return_value.recent.return_value = []
+        mock_st.session_state = self.session_state
+        mock_st.slider.return_value = 14
+        mock_st.selectbox.return_value = "Next 90 days"
+        br.show_bill_reminders()
+        return [call.args[0] for call in mock_st.info.call_args_list]
+
+    def test_variable_amount_bill_gets_a_reminder(self, mock_st, mock_store, mock_filter):
+        messages = self.run_view(mock_st, mock_store)
+
+        utility = [m for m in messages if "PG&E" in m]
+        self.assertEqual(len(utility), 1)
+        self.assertIn("$86.14", utility[0])  # The mean of the varying amounts
+        self.assertIn("2025-06-10", utility[0])
+
+    def test_weekly_cadence_reaches_the_schedule(self, mock_st, mock_store, mock_filter):
+        messages = self.run_view(mock_st, mock_store)
+
+        gym_dates = [m.rsplit(" ", 1)[-1].rstrip(".") for m in messages if "Gym" in m]
+        self.assertEqual(gym_dates, ["2025-06-13", "2025-06-20"])
+        calendar = mock_st.dataframe.call_args.args[0]
+        self.assertEqual((calendar["name"] == "Gym").sum(), 13)  # Weekly over the 90-day calendar
+
+    def test_cancelled_subscription_is_not_projected(self, mock_st, mock_store, mock_filter):
+        self.session_state["transactions"] += [
+            {"transaction_id": f"hulu{month}", "name": "Hulu", "amount": 7.99, "date": f"2024-{month:02d}-05",
+             "category": ["Entertainment"]}
+            for month in range(1, 7)
+        ]
+        messages = self.run_view(mock_st, mock_store)
+
+        self.assertFalse([m for m in messages if "Hulu" in m])
+        calendar = mock_st.dataframe.call_args.args[0]
+        self.assertNotIn("Hulu", set(calendar["name"]))
+
+    def test_detection_reruns_only_when_transactions_change(self, mock_st, mock_store, mock_filter):
+        with patch("frontend.views.BillReminders.detect_recurring_series", wraps=detect_recurring_series) as detect:
+            self.run_view(mock_st, mock_store)
+            self.run_view(mock_st, mock_store)
+            self.assertEqual(detect.call_count, 1)
+
+            self.session_state["transactions_version"] = 2
+            self.run_view(mock_st, mock_store)
+            self.assertEqual(detect.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
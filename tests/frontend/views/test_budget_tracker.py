@@ -1,3 +1,4 @@
+import json
 import unittest
 from unittest.mock import patch, MagicMock
 import sys
@@ -7,6 +8,8 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
 from frontend.views import BudgetTracker as bt
+from backend.utils.budget import BudgetTracker
+from backend.utils.transaction_sync import mark_transactions_changed
 
 
 class TestCategorizeTransactions(unittest.TestCase):
@@ -17,27 +20,129 @@ class TestCategorizeTransactions(unittest.TestCase):
         mock_client = MagicMock()
         mock_openai.return_value = mock_client
         mock_client.chat.completions.create.return_value.choices = [
-            MagicMock(message=MagicMock(content='''{
-                "categories": {
-                    "Food": {
-                        "transactions": [
-                            {"name": "Starbucks", "amount": 10.0, "date": "2023-07-01"}
-                        ],
-                        "suggested_budget": 50,
-                        "description": "Covers small food purchases"
-                    }
-                }
-            }'''))
+            MagicMock(message=MagicMock(content='{"Joe\'s Place": "Food"}'))
         ]
 
+        # A merchant the local categorizer doesn't know, so it goes to the LLM
         transactions = [
-            {"name": "Starbucks", "amount": "10.0", "date": "2023-07-01", "category": ["Coffee"]}
+            {"name": "Joe's Place", "amount": "10.0", "date": "2023-07-01", "category": ["Coffee"]}
         ]
 
         result = bt.categorize_transactions(transactions)
         self.assertIn("Food", result)
-        self.assertEqual(result["Food"]["suggested_budget"], 50)
-        self.assertEqual(result["Food"]["transactions"][0]["name"], "Starbucks")
+        # Budgets are computed locally: $10 plus headroom, rounded up to $5
+        self.assertEqual(result["Food"]["suggested_budget"], 15)
+        self.assertEqual(result["Food"]["transactions"][0]["name"], "Joe's Place")
+
+    @patch("frontend.views.BudgetTracker.OpenAI")
+    @patch("frontend.views.BudgetTracker.st")
+    def test_known_merchants_skip_llm(self, mock_st, mock_openai):
+        transactions = [
+            {"name": "Starbucks #12", "amount": "4.50", "date": "2023-07-01"},
+            {"name": "Starbucks #12", "amount": "5.50", "date": "2023-07-03"},
+            {"name": "Lyft Ride", "amount": "-80", "date": "2023-07-02"},
+        ]
+        stats = []
+        result = bt.categorize_transactions(transactions, stats=stats)
+        mock_openai.assert_not_called()
+        self.assertEqual(stats, [])
+        self.assertEqual(len(result["Food and Drink"]["transactions"]), 2)
+        self.assertEqual(result["Food and Drink"]["suggested_budget"], 15)
+        self.assertEqual(result["Transportation"]["suggested_budget"], 100)
+
+    @patch("frontend.views.BudgetTracker.CHUNK_TOKEN_BUDGET", 40)
+    @patch("frontend.views.BudgetTracker.OpenAI")
+    @patch("frontend.views.BudgetTracker.st")
+    def test_chunked_and_merged(self, mock_st, mock_openai):
+        names = [f"Local Shop {letter}" for letter in "ABCDEF"]
+
+        def reply(model, messages):
+            # Each chunk answers only for its own merchants, with inconsistent spelling
+            prompt = messages[-1]["content"]
+            mapping = {name: ("food & drink" if name.endswith(("A", "B", "C")) else "Home Goods") for name in names if name in prompt}
+            response = MagicMock()
+            response.choices = [MagicMock(message=MagicMock(content=json.dumps(mapping)))]
+            response.usage.prompt_tokens = 100
+            response.usage.completion_tokens = 20
+            return response
+
+        mock_openai.return_value.chat.completions.create.side_effect = reply
+        transactions = [{"name": name, "amount": "10", "date": "2023-07-01"} for name in names] * 2
+        stats = []
+        result = bt.categorize_transactions(transactions, stats=stats)
+
+        self.assertGreater(len(stats), 1)
+        self.assertEqual(mock_openai.return_value.chat.completions.create.call_count, len(stats))
+        self.assertEqual(sum(s["merchants"] for s in stats), 6)
+        self.assertTrue(all(s["prompt_tokens"] == 100 and s["seconds"] >= 0 for s in stats))
+        # "food & drink" matches the local "Food and Drink" category rather than forming a new one
+        self.assertEqual(sorted(result), ["Food and Drink", "Home Goods"])
+        self.assertEqual(len(result["Food and Drink"]["transactions"]), 6)
+        self.assertEqual(result["Home Goods"]["suggested_budget"], 70)
+        mock_st.warning.assert_not_called()
+
+    @patch("frontend.views.BudgetTracker.OpenAI")
+    @patch("frontend.views.BudgetTracker.st")
+    def test_unanswered_merchants_are_uncategorized(self, mock_st, mock_openai):
+        mock_openai.return_value.chat.completions.create.return_value.choices = [
+            MagicMock(message=MagicMock(content='{"Shop A": "Gifts"}'))
+        ]
+        result = bt.categorize_transactions([
+            {"name": "Shop A", "amount": "10", "date": "2023-07-01"},
+            {"name": "Shop B", "amount": "10", "date": "2023-07-01"},
+        ])
+        self.assertEqual(sorted(result), ["Gifts", "Uncategorized"])
+        mock_st.warning.assert_called_once()
+
+    @patch("frontend.views.BudgetTracker.CHUNK_TOKEN_BUDGET", 1)  # One merchant per chunk
+    @patch("frontend.views.BudgetTracker.OpenAI")
+    @patch("frontend.views.BudgetTracker.st")
+    def test_partial_chunk_failure_keeps_the_other_chunks(self, mock_st, mock_openai):
+        names = ["Shop A", "Shop B", "Shop C"]
+        attempts = {}
+
+        def reply(model, messages):
+            prompt = messages[-1]["content"]
+            name = next(name for name in names if name in prompt)
+            attempts[name] = attempts.get(name, 0) + 1
+            if name == "Shop B":
+                raise Exception("timeout")  # Fails on the retry too
+            if name == "Shop C" and attempts[name] == 1:
+                raise Exception("rate limited")  # Recovers on the retry
+            response = MagicMock()
+            response.choices = [MagicMock(message=MagicMock(content=json.dumps({name: "Gifts"})))]
+            return response
+
+        mock_openai.return_value.chat.completions.create.side_effect = reply
+        transactions = [{"name": name, "amount": "10", "date": "2023-07-01"} for name in names]
+        result = bt.categorize_transactions(transactions)
+
+        self.assertEqual(attempts, {"Shop A": 1, "Shop B": 2, "Shop C": 2})
+        self.assertEqual({tx["name"] for tx in result["Gifts"]["transactions"]}, {"Shop A", "Shop C"})
+        self.assertEqual([tx["name"] for tx in result["Uncategorized"]["transactions"]], ["Shop B"])
+        mock_st.error.assert_called_once()
+        mock_st.warning.assert_not_called()
+
+    @patch("frontend.views.BudgetTracker.OpenAI", side_effect=Exception("The api_key client option must be set"))
+    @patch("frontend.views.BudgetTracker.st")
+    def test_client_failure_keeps_local_results(self, mock_st, mock_openai):
+        """Without an API key the confidently categorized merchants are still returned."""
+        result = bt.categorize_transactions([
+            {"name": "Starbucks #12", "amount": "4.50", "date": "2023-07-01"},
+            {"name": "Joe's Place", "amount": "10", "date": "2023-07-01"},
+        ])
+        self.assertEqual(sorted(result), ["Food and Drink", "Uncategorized"])
+        self.assertEqual([tx["name"] for tx in result["Uncategorized"]["transactions"]], ["Joe's Place"])
+        mock_st.error.assert_called_once()
+        mock_st.warning.assert_not_called()
+
+        # Nothing needs the LLM, so the client isn't even built
+        mock_openai.reset_mock()
+        mock_st.reset_mock()
+        result = bt.categorize_transactions([{"name": "Starbucks #12", "amount": "4.50", "date": "2023-07-01"}])
+        self.assertEqual(sorted(result), ["Food and Drink"])
+        mock_openai.assert_not_called()
+        mock_st.error.assert_not_called()
 
     @patch("frontend.views.BudgetTracker.Config.get_openai_api_key", return_value="fake-key")
     @patch("frontend.views.BudgetTracker.OpenAI")
@@ -97,6 +202,77 @@ class TestAnalyzeTransactionsForBudgets(unittest.TestCase):
         self.assertEqual(result, {})
         mock_st.error.assert_called_once()
 
+class TestCategorizedRecords(unittest.TestCase):
+    def test_ids_ignore_category_and_count_duplicates(self):
+        coffee = {"name": "Coffee", "amount": 4.5, "date": "2023-08-01"}
+        first = bt.categorized_records({"Food": {"transactions": [coffee, dict(coffee)]}, "note": "skip me"})
+        recategorized = bt.categorized_records({"Drinks": {"transactions": [coffee]}, "Food": {"transactions": [coffee]}})
+
+        self.assertEqual([r["transaction_id"] for r in first], ["Coffee|2023-08-01|4.5|1", "Coffee|2023-08-01|4.5|2"])
+        self.assertEqual({r["transaction_id"] for r in recategorized}, {r["transaction_id"] for r in first})
+        self.assertEqual(recategorized[0]["category"], "Drinks")
+
+    def test_real_transaction_ids_are_kept(self):
+        """Identical same-day purchases stay two rows, and categorization carries the ids through."""
+        coffee = {"name": "Coffee", "amount": 4.5, "date": "2023-08-01"}
+        records = bt.categorized_records({"Food": {"transactions": [dict(coffee, transaction_id="a"),
+                                                                    dict(coffee, transaction_id="b")]}})
+        self.assertEqual([r["transaction_id"] for r in records], ["a", "b"])
+
+        summarized = bt.summarize_merchants([dict(coffee, transaction_id="a"), dict(coffee, transaction_id="b")])
+        self.assertEqual([tx["transaction_id"] for tx in summarized[0]["transactions"]], ["a", "b"])
+
+
+class TestSyncBudgetMonth(unittest.TestCase):
+    def setUp(self):
+        self.tracker = BudgetTracker()
+        coffee = {"name": "Coffee", "amount": 4.5, "date": "2023-08-01", "account_id": "acc_1"}
+        self.state = {
+            "transactions_version": 3,
+            "categorized_transactions": {"2023-08": {
+                "Food": {"transactions": [dict(coffee, transaction_id="a"), dict(coffee, transaction_id="b")]},
+                "Travel": {"transactions": [{"transaction_id": "c", "name": "Uber", "amount": 20.0,
+                                             "date": "2023-08-02", "account_id": "acc_1"}]},
+            }},
+        }
+
+    def sync(self):
+        return bt.sync_budget_month(self.state, self.tracker, "2023-08", ["acc_1"])
+
+    def test_replays_only_logged_changes(self):
+        self.assertEqual(self.sync(), 3)
+        self.assertEqual(self.tracker.monthly_expenses["2023-08"]["Food"], 9.0)
+        self.assertEqual(self.sync(), 0)  # Nothing changed since
+
+        mark_transactions_changed(self.state, upserted=[
+            {"transaction_id": "d", "name": "Coffee", "amount": 3.0, "date": "2023-08-05", "account_id": "acc_1"},
+            {"transaction_id": "b", "name": "COFFEE CO", "amount": 4.5, "date": "2023-08-01", "account_id": "acc_1"},
+            {"transaction_id": "c", "name": "Uber", "amount": 20.0, "date": "2023-09-01", "account_id": "acc_1"},
+            {"transaction_id": "e", "name": "Coffee", "amount": 9.0, "date": "2023-08-05", "account_id": "acc_2"},
+        ], removed=["a"])
+        with patch.object(self.tracker, "sync_month", wraps=self.tracker.sync_month) as sync_month:
+            self.sync()
+            sync_month.assert_not_called()
+
+        expenses = self.tracker.monthly_expenses["2023-08"]
+        self.assertEqual(expenses["Food"], 3.0)  # a removed, b renamed out of Food, d added
+        self.assertEqual(expenses["Uncategorized"], 4.5)  # The renamed merchant, moved rather than added
+        self.assertEqual(expenses["Travel"], 0.0)  # c moved to September
+        self.assertEqual(self.tracker.ingested_ids("2023-08"), {"b", "d"})  # e is on an unselected account
+
+    def test_reset_or_recategorization_rebuilds_the_month(self):
+        self.sync()
+        mark_transactions_changed(self.state, reset=True)
+        with patch.object(self.tracker, "sync_month", wraps=self.tracker.sync_month) as sync_month:
+            self.sync()
+            sync_month.assert_called_once()
+
+            self.state["budget_synced_versions"].pop("2023-08")
+            self.sync()
+            self.assertEqual(sync_month.call_count, 2)
+        self.assertEqual(self.tracker.monthly_expenses["2023-08"]["Food"], 9.0)
+
+
 class TestShowBudgetTracker(unittest.TestCase):
     @patch("frontend.views.BudgetTracker.show_account_selector", return_value=[])
     @patch("frontend.views.BudgetTracker.st")
@@ -2,11 +2,22 @@ import unittest
 from unittest.mock import patch, MagicMock
 import numpy as np
 import streamlit as st
-from frontend.views.ReceiptParser import show_receipt_parser
+from frontend.views.ReceiptParser import category_corrections, show_receipt_parser
 from io import BytesIO
 from PIL import Image
 import io
 
+class TestCategoryCorrections(unittest.TestCase):
+    def test_only_changed_categories_are_corrections(self):
+        receipts = [
+            {"vendor": "Joe's Place", "category": "Food", "suggested_category": "Uncategorized"},
+            {"vendor": "Corner Store", "category": "Shopping", "suggested_category": "Shopping"},
+            {"vendor": "Blank", "category": "", "suggested_category": "Travel"},
+            {"vendor": "Older Receipt", "category": "Travel"},  # Added before suggestions were recorded
+        ]
+        self.assertEqual(category_corrections(receipts), {"Joe's Place": "Food"})
+
+
 class TestReceiptParser(unittest.TestCase):
     def create_mock_image(self):
         # Create a valid in-memory image
@@ -96,9 +107,10 @@ class TestReceiptParser(unittest.TestCase):
         mock_columns.return_value = []
         show_receipt_parser()  # Ensure no exception is raised
 
-    @patch("frontend.views.ReceiptParser.extract_text_from_image")
-    @patch("frontend.views.ReceiptParser.extract_receipt_fields")
-    @patch("frontend.views.ReceiptParser.categorize_transaction")
+    # Uploads are processed in a batch through backend process_receipt, so patch the stages there
+    @patch("backend.utils.receipt_parser.extract_text_from_image")
+    @patch("backend.utils.receipt_parser.extract_receipt_fields")
+    @patch("backend.utils.receipt_parser.categorize_transaction")
     def test_file_upload_workflow(self, mock_categorize, mock_extract_fields, mock_extract_text):
         # Mock the receipt processing functions
         mock_extract_text.return_value = "Sample receipt text"